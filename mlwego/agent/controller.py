@@ -3,24 +3,78 @@
 from __future__ import annotations
 
 import json
+import shutil
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
-from typing import List
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from mlwego.evaluation.evaluator import EvalResult, evaluate_solution, run_predict
-from mlwego.search.generator import CandidateEdit, baseline_candidates
+import numpy as np
+
+from mlwego.agent.pipeline import Pipeline, PipelineStats
+from mlwego.evaluation.early_stop import FoldMonitor, ReferenceBoard
+from mlwego.evaluation.evaluator import EvalResult, TrainingError, evaluate_solution, run_predict
+from mlwego.evaluation.result_cache import ResultCache
+from mlwego.evaluation.scoring import BootstrapResult, bootstrap_compare, metrics_for, score_batch
+from mlwego.execution.resources import ResourceGrant, ResourceManager
+from mlwego.execution.sandbox import ExecutionResult
+from mlwego.search.generator import CandidateEdit, baseline_candidates, random_candidates
+from mlwego.search.halving import fidelity_levels, fidelity_updates, promote
+from mlwego.search.llm_generator import LLMGenerator
 from mlwego.search.policy import SearchPolicy
 from mlwego.search.solution_tree import SolutionNode, SolutionTree
+from mlwego.search.space import DEFAULT_ESTIMATOR, search_space
+from mlwego.search.tpe import TPE
+from mlwego.workspace.artifacts import MODEL_FILE, archive_model
+from mlwego.workspace.data_cache import data_fingerprint
 from mlwego.workspace.file_ops import read_text, write_text
-from mlwego.workspace.snapshot import hash_src, snapshot_src
+from mlwego.workspace.isolation import collect_artifacts, create_workspace, remove_workspace
+from mlwego.workspace.run_store import RunStore, run_id_for, task_name
+from mlwego.workspace.snapshot import blob_store, hash_src, snapshot_src
+
+
+PREDICTION_ARTIFACTS = ["oof.npy", "oof_target.npy", "oof_proba.npy", "test_pred.npy", "test_proba.npy", "metrics.json"]
+# A candidate edit and the config.json it applies to.
+PipelineItem = Tuple[CandidateEdit, str]
 
 
 @dataclass
 class RunSummary:
     node_id: str
-    score: float
+    score: Optional[float]
     metric: str
+    fidelity: float = 1.0
+
+
+@dataclass
+class EvalContext:
+    timeout: int
+    jobs: int = 1
+    cache: Optional[ResultCache] = None
+    early_abort: bool = True
+    logs_dir: Optional[Path] = None
+    board: ReferenceBoard = field(default_factory=ReferenceBoard)
+    resources: Optional[ResourceManager] = None
+    store: Optional[RunStore] = None
+    completed: Dict[str, SolutionNode] = field(default_factory=dict)
+
+    def reserve(self) -> ContextManager[Optional[ResourceGrant]]:
+        """Block until this run's share of the CPU and memory budget is free."""
+        if self.resources is None:
+            return nullcontext()
+        return self.resources.acquire(*self.resources.share(self.jobs))
+
+
+@dataclass
+class CandidateOutcome:
+    node_id: str
+    diff: str
+    eval_result: EvalResult
+    workspace: Path
+    resumed: bool = False
 
 
 def apply_candidate(config_path: Path, candidate: CandidateEdit) -> str:
@@ -30,57 +84,493 @@ def apply_candidate(config_path: Path, candidate: CandidateEdit) -> str:
     return json.dumps(candidate.updates)
 
 
-def run_search(run_dir: Path, policy: SearchPolicy, timeout: int) -> tuple[SolutionTree, List[RunSummary]]:
-    tree = SolutionTree()
+def run_search(
+    run_dir: Path,
+    policy: SearchPolicy,
+    timeout: int,
+    jobs: int = 1,
+    use_cache: bool = True,
+    resources: Optional[ResourceManager] = None,
+    store: Optional[RunStore] = None,
+    resume: bool = False,
+    generator: Optional[LLMGenerator] = None,
+) -> tuple[SolutionTree, List[RunSummary]]:
+    cache = ResultCache(run_dir / "cache" / "results") if use_cache else None
     summaries: List[RunSummary] = []
     logs_dir = run_dir / "logs"
     logs_dir.mkdir(parents=True, exist_ok=True)
-    metrics_path = logs_dir / "metrics.jsonl"
-    config_path = run_dir / "src" / "config.json"
-    baseline_config = read_text(config_path)
-    eval_result = evaluate_solution(run_dir, timeout=timeout)
-    root_hash = hash_src(run_dir / "src")
-    _append_metrics(metrics_path, root_hash, eval_result)
-    tree.add_node(
-        SolutionNode(
-            node_id=root_hash,
-            parent_id=None,
-            score=eval_result.score,
-            score_std=eval_result.score_std,
-            diff="baseline",
-        )
+    journal = logs_dir / "tree.jsonl"
+    if resume:
+        tree = SolutionTree.load(journal)
+    else:
+        journal.unlink(missing_ok=True)
+        tree = SolutionTree(journal=journal)
+    context = EvalContext(
+        timeout=timeout,
+        jobs=jobs,
+        cache=cache,
+        early_abort=policy.early_abort,
+        logs_dir=logs_dir,
+        resources=resources,
+        store=store,
+        completed=dict(tree.nodes),
     )
-    summaries.append(RunSummary(node_id=root_hash, score=eval_result.score, metric=eval_result.metric))
-    candidates = baseline_candidates()
-    max_candidates = min(policy.budget, policy.branch_factor, len(candidates))
-    for candidate in candidates[:max_candidates]:
-        write_text(config_path, baseline_config)
-        diff = apply_candidate(config_path, candidate)
-        eval_result = evaluate_solution(run_dir, timeout=timeout)
-        node_hash = hash_src(run_dir / "src")
-        _append_metrics(metrics_path, node_hash, eval_result)
+    for node in tree.nodes.values():
+        if node.status == "ok":
+            context.board.offer(node.fidelity, node.score, node.fold_scores)
+    if store is not None:
+        store.record_run(run_dir, task_name(run_dir))
+    root = tree.root()
+    if root is not None:
+        # The root snapshot holds the baseline; run_dir/src may still carry the last candidate's config.
+        root_hash = root.node_id
+        baseline_config = read_text(run_dir / "artifacts" / root_hash / "src" / "config.json")
+        summaries.append(RunSummary(node_id=root_hash, score=root.score, metric=root.metric))
+    else:
+        baseline_config = read_text(run_dir / "src" / "config.json")
+        root_hash = hash_src(run_dir / "src")
+        eval_result = _evaluate(run_dir, root_hash, context, fidelity=1.0)
+        _append_metrics(logs_dir / "metrics.jsonl", root_hash, eval_result)
+        _store_node(context.store, run_dir, root_hash, None, "baseline", eval_result)
+        snapshot_src(run_dir / "src", run_dir / "artifacts" / root_hash, store=blob_store(run_dir))
+        _archive_predictions(run_dir, root_hash, eval_result)
+        archive_model(run_dir / "artifacts" / MODEL_FILE, run_dir, root_hash)
         tree.add_node(
             SolutionNode(
-                node_id=node_hash,
-                parent_id=root_hash,
+                node_id=root_hash,
+                parent_id=None,
                 score=eval_result.score,
                 score_std=eval_result.score_std,
-                diff=diff,
+                diff="baseline",
+                fold_scores=eval_result.fold_scores,
+                metric=eval_result.metric,
+                **_cost_fields(eval_result),
             )
         )
-        summaries.append(RunSummary(node_id=node_hash, score=eval_result.score, metric=eval_result.metric))
-        snapshot_src(run_dir / "src", run_dir / "artifacts" / node_hash)
+        summaries.append(RunSummary(node_id=root_hash, score=eval_result.score, metric=eval_result.metric))
+    try:
+        if policy.mode == "halving":
+            _run_halving(run_dir, policy, tree, summaries, root_hash, baseline_config, context)
+        elif policy.mode == "llm":
+            if generator is None:
+                raise ValueError("Search mode 'llm' needs an LLM generator")
+            stats = _run_llm(run_dir, policy, tree, summaries, context, generator)
+            write_text(logs_dir / "pipeline.json", json.dumps(asdict(stats), indent=2))
+        elif policy.mode == "tpe":
+            stats = _run_tpe(run_dir, policy, tree, summaries, root_hash, baseline_config, context)
+            write_text(logs_dir / "pipeline.json", json.dumps(asdict(stats), indent=2))
+        else:
+            candidates = baseline_candidates(json.loads(baseline_config).get("model", DEFAULT_ESTIMATOR))
+            max_candidates = min(policy.budget, policy.branch_factor, len(candidates))
+            selected = candidates[:max_candidates]
+            for outcome in _evaluate_all(run_dir, baseline_config, selected, context, fidelity=1.0):
+                _record_outcome(run_dir, tree, summaries, outcome, parent_id=root_hash, store=context.store)
+    finally:
+        # Sequential candidates train in run_dir/src; restoring the baseline keeps a rerun on the same root.
+        write_text(run_dir / "src" / "config.json", baseline_config)
+    score_tree(run_dir, tree)
     return tree, summaries
 
 
+def score_tree(run_dir: Path, tree: SolutionTree) -> Optional[BootstrapResult]:
+    """Re-score full-fidelity nodes from their OOF predictions with bootstrap intervals and paired tests."""
+    nodes, preds, probas, y_true, task_type, classes = [], [], [], None, "", None
+    for node in tree.nodes.values():
+        node_dir = run_dir / "artifacts" / node.node_id
+        if node.status != "ok" or node.fidelity < 1.0 or not (node_dir / "oof_target.npy").exists():
+            continue
+        target = np.load(node_dir / "oof_target.npy", allow_pickle=False)
+        if y_true is not None and not np.array_equal(target, y_true):
+            continue
+        y_true = target
+        nodes.append(node)
+        preds.append(np.load(node_dir / "oof.npy", allow_pickle=False))
+        proba_path = node_dir / "oof_proba.npy"
+        probas.append(np.load(proba_path, allow_pickle=False) if proba_path.exists() else None)
+        node_metrics = json.loads(read_text(node_dir / "metrics.json"))
+        task_type = task_type or node_metrics.get("task_type", "")
+        classes = classes if classes is not None else node_metrics.get("classes")
+    if y_true is None or not nodes[0].metric:
+        return None
+    matrix = np.vstack(preds)
+    proba_names = metrics_for(task_type, "proba")
+    batch = score_batch(y_true, matrix, [name for name in metrics_for(task_type) if name not in proba_names])
+    if proba_names and classes is not None and len(classes) == 2 and all(p is not None for p in probas):
+        # train.py orders probability columns like np.unique, so the second column is the positive class.
+        positive = (y_true == np.asarray(classes)[1]).astype(float)
+        batch.update(score_batch(positive, np.vstack([proba[:, 1] for proba in probas]), proba_names))
+    result = bootstrap_compare(y_true, matrix, nodes[0].metric)
+    for idx, node in enumerate(nodes):
+        tree.add_node(
+            replace(
+                node,
+                metrics={name: float(values[idx]) for name, values in batch.items()},
+                ci_low=float(result.ci_low[idx]),
+                ci_high=float(result.ci_high[idx]),
+                p_vs_best=float(result.p_vs_best[idx]),
+            )
+        )
+    return result
+
+
 def finalize_best(run_dir: Path, tree: SolutionTree) -> None:
     best = tree.best_node()
     if not best:
         return
-    run_predict(run_dir)
+    run_predict(run_dir, node_id=best.node_id)
+
+
+def _run_halving(
+    run_dir: Path,
+    policy: SearchPolicy,
+    tree: SolutionTree,
+    summaries: List[RunSummary],
+    root_hash: str,
+    baseline_config: str,
+    context: EvalContext,
+) -> None:
+    baseline = json.loads(baseline_config)
+    n_splits = baseline.get("n_splits", 5)
+    model = baseline.get("model", DEFAULT_ESTIMATOR)
+    pool = baseline_candidates(model) + random_candidates(policy.budget, seed=baseline.get("seed", 42), model=model)
+    survivors = pool[: policy.budget]
+    parents = [root_hash] * len(survivors)
+    for fidelity in fidelity_levels(policy):
+        rung = [
+            CandidateEdit(description=candidate.description, updates={**candidate.updates, **fidelity_updates(fidelity, n_splits)})
+            for candidate in survivors
+        ]
+        outcomes = []
+        for outcome, parent_id in zip(_evaluate_all(run_dir, baseline_config, rung, context, fidelity), parents):
+            _record_outcome(
+                run_dir, tree, summaries, outcome, parent_id=parent_id, fidelity=fidelity, store=context.store
+            )
+            outcomes.append(outcome)
+        scores = [o.eval_result.score if o.eval_result.status == "ok" else float("-inf") for o in outcomes]
+        keep = promote(scores, policy.eta)
+        survivors = [survivors[idx] for idx in keep]
+        parents = [outcomes[idx].node_id for idx in keep]
+
+
+def _run_llm(
+    run_dir: Path,
+    policy: SearchPolicy,
+    tree: SolutionTree,
+    summaries: List[RunSummary],
+    context: EvalContext,
+    generator: LLMGenerator,
+) -> PipelineStats:
+    """The LLM proposes edits of the frontier node while earlier proposals train, through a bounded queue."""
+    lock = threading.Lock()
+
+    def propose(count: int, pending: List[PipelineItem]) -> List[PipelineItem]:
+        with lock:
+            nodes = list(tree.nodes.values())
+            parent = next(iter(tree.frontier(1)), None) or tree.root()
+        assert parent is not None
+        parent_config = read_text(run_dir / "artifacts" / parent.node_id / "src" / "config.json")
+        edits = generator.propose(nodes, parent, parent_config, count, [edit for edit, _ in pending])
+        return [(edit, parent_config) for edit in edits]
+
+    return _run_pipeline(run_dir, policy, tree, summaries, context, propose, lock)
+
+
+def _run_tpe(
+    run_dir: Path,
+    policy: SearchPolicy,
+    tree: SolutionTree,
+    summaries: List[RunSummary],
+    root_hash: str,
+    baseline_config: str,
+    context: EvalContext,
+) -> PipelineStats:
+    """TPE suggestions for the root's ``model_params``, warm-started from every full-fidelity node so far."""
+    baseline = json.loads(baseline_config)
+    space = search_space(baseline)
+    tuner = TPE(space, seed=baseline.get("seed", 42))
+    for node in tree.nodes.values():
+        config_path = run_dir / "artifacts" / node.node_id / "src" / "config.json"
+        if node.fidelity >= 1.0 and node.status in ("ok", "error", "oom", "aborted") and config_path.exists():
+            config = json.loads(read_text(config_path))
+            if config.get("model") == baseline.get("model"):
+                tuner.observe(config.get("model_params", {}), node.score if node.status == "ok" else None)
+    lock = threading.Lock()
+
+    def propose(count: int, pending: List[PipelineItem]) -> List[PipelineItem]:
+        with lock:
+            suggestions = [tuner.suggest() for _ in range(count)]
+        return [
+            (CandidateEdit("TPE suggestion", {"model_params": params}, parent_id=root_hash), baseline_config)
+            for params in suggestions
+        ]
+
+    def observe(edit: CandidateEdit, outcome: CandidateOutcome) -> None:
+        result = outcome.eval_result
+        tuner.observe(edit.updates["model_params"], result.score if result.status == "ok" else None)
+
+    return _run_pipeline(run_dir, policy, tree, summaries, context, propose, lock, observe)
+
+
+def _run_pipeline(
+    run_dir: Path,
+    policy: SearchPolicy,
+    tree: SolutionTree,
+    summaries: List[RunSummary],
+    context: EvalContext,
+    propose: Callable[[int, List[PipelineItem]], List[PipelineItem]],
+    lock: threading.Lock,
+    observe: Optional[Callable[[CandidateEdit, CandidateOutcome], None]] = None,
+) -> PipelineStats:
+    # ``propose`` runs on its own thread and should hold ``lock`` while reading state that recording changes.
+    def evaluate(worker: int, item: PipelineItem) -> CandidateOutcome:
+        edit, parent_config = item
+        if context.jobs == 1:
+            return _evaluate_candidate(run_dir, parent_config, edit, context, fidelity=1.0)
+        workspace = create_workspace(run_dir, run_dir / "workspaces" / f"pipeline_{worker:03d}")
+        return _evaluate_isolated(workspace, parent_config, edit, context, fidelity=1.0)
+
+    def record(item: PipelineItem, outcome: CandidateOutcome) -> None:
+        edit = item[0]
+        _record_outcome(run_dir, tree, summaries, outcome, parent_id=edit.parent_id or "", store=context.store)
+        if observe is not None:
+            observe(edit, outcome)
+
+    pipeline: Pipeline[PipelineItem, CandidateOutcome] = Pipeline(
+        propose,
+        evaluate,
+        record,
+        key=lambda item: f"{item[0].parent_id}:{json.dumps(item[0].updates, sort_keys=True)}",
+        workers=context.jobs,
+        queue_size=policy.queue_size,
+        lock=lock,
+    )
+    return pipeline.run(policy.budget, batch_size=policy.branch_factor)
+
+
+def _record_outcome(
+    run_dir: Path,
+    tree: SolutionTree,
+    summaries: List[RunSummary],
+    outcome: CandidateOutcome,
+    parent_id: str,
+    fidelity: float = 1.0,
+    store: Optional[RunStore] = None,
+) -> None:
+    eval_result = outcome.eval_result
+    summaries.append(
+        RunSummary(node_id=outcome.node_id, score=eval_result.score, metric=eval_result.metric, fidelity=fidelity)
+    )
+    if outcome.resumed:
+        if outcome.workspace != run_dir:
+            remove_workspace(outcome.workspace)
+        return
+    _append_metrics(run_dir / "logs" / "metrics.jsonl", outcome.node_id, eval_result, fidelity)
+    tree.add_node(
+        SolutionNode(
+            node_id=outcome.node_id,
+            parent_id=parent_id,
+            score=eval_result.score,
+            score_std=eval_result.score_std,
+            diff=outcome.diff,
+            fidelity=fidelity,
+            fold_scores=eval_result.fold_scores,
+            status=eval_result.status,
+            metric=eval_result.metric,
+            **_cost_fields(eval_result),
+        )
+    )
+    # A candidate that hashes to an existing node keeps that node's parent.
+    node_parent = tree.nodes[outcome.node_id].parent_id
+    _store_node(store, run_dir, outcome.node_id, node_parent, outcome.diff, eval_result, fidelity)
+    snapshot_src(outcome.workspace / "src", run_dir / "artifacts" / outcome.node_id, store=blob_store(run_dir))
+    if outcome.workspace != run_dir:
+        node_dir = collect_artifacts(outcome.workspace, run_dir / "artifacts" / outcome.node_id)
+        remove_workspace(outcome.workspace)
+        archive_model(node_dir / MODEL_FILE, run_dir, outcome.node_id)
+    else:
+        _archive_predictions(run_dir, outcome.node_id, eval_result)
+        archive_model(run_dir / "artifacts" / MODEL_FILE, run_dir, outcome.node_id)
+
+
+def _archive_predictions(run_dir: Path, node_id: str, result: EvalResult) -> None:
+    # Candidates evaluated in run_dir overwrite each other's artifacts, so keep a per-node copy of their predictions.
+    if result.status != "ok":
+        return
+    for name in PREDICTION_ARTIFACTS:
+        if (run_dir / "artifacts" / name).exists():
+            shutil.copy2(run_dir / "artifacts" / name, run_dir / "artifacts" / node_id / name)
+
+
+def _evaluate_all(
+    run_dir: Path,
+    baseline_config: str,
+    candidates: Sequence[CandidateEdit],
+    context: EvalContext,
+    fidelity: float,
+) -> Iterator[CandidateOutcome]:
+    if context.jobs > 1:
+        return iter(_evaluate_parallel(run_dir, baseline_config, candidates, context, fidelity))
+    # Candidates share run_dir, so each outcome must be recorded before the next one overwrites its artifacts.
+    return (_evaluate_candidate(run_dir, baseline_config, candidate, context, fidelity) for candidate in candidates)
+
+
+def _evaluate_candidate(
+    workspace: Path,
+    baseline_config: str,
+    candidate: CandidateEdit,
+    context: EvalContext,
+    fidelity: float,
+) -> CandidateOutcome:
+    config_path = workspace / "src" / "config.json"
+    write_text(config_path, baseline_config)
+    diff = apply_candidate(config_path, candidate)
+    node_hash = hash_src(workspace / "src")
+    completed = context.completed.get(node_hash)
+    if completed is not None:
+        eval_result = _completed_result(completed, workspace)
+        return CandidateOutcome(node_id=node_hash, diff=diff, eval_result=eval_result, workspace=workspace, resumed=True)
+    try:
+        eval_result = _evaluate(workspace, node_hash, context, fidelity)
+    except TrainingError as exc:
+        # A broken or out-of-memory candidate is recorded as a failed node with no score, rather than ending the search.
+        eval_result = EvalResult(score=None, score_std=0.0, metric="", train_result=exc.result, failure=exc.kind)
+    return CandidateOutcome(node_id=node_hash, diff=diff, eval_result=eval_result, workspace=workspace)
+
+
+def _evaluate_parallel(
+    run_dir: Path,
+    baseline_config: str,
+    candidates: Sequence[CandidateEdit],
+    context: EvalContext,
+    fidelity: float,
+) -> List[CandidateOutcome]:
+    # Each candidate trains in its own subprocess, so threads are enough to keep the pool busy.
+    def evaluate(idx: int, candidate: CandidateEdit) -> CandidateOutcome:
+        workspace = create_workspace(run_dir, run_dir / "workspaces" / f"candidate_{idx:03d}")
+        return _evaluate_isolated(workspace, baseline_config, candidate, context, fidelity)
+
+    with ThreadPoolExecutor(max_workers=context.jobs) as executor:
+        futures = [executor.submit(evaluate, idx, candidate) for idx, candidate in enumerate(candidates)]
+    outcomes = [future.result() for future in futures if future.exception() is None]
+    error = next((future.exception() for future in futures if future.exception() is not None), None)
+    if error is not None:
+        # Outcomes are recorded (and their workspaces removed) by the caller, which never sees them now.
+        for outcome in outcomes:
+            remove_workspace(outcome.workspace)
+        raise error
+    return outcomes
+
+
+def _evaluate_isolated(
+    workspace: Path,
+    baseline_config: str,
+    candidate: CandidateEdit,
+    context: EvalContext,
+    fidelity: float,
+) -> CandidateOutcome:
+    """_evaluate_candidate in a workspace of its own, which is removed if evaluation raises."""
+    try:
+        return _evaluate_candidate(workspace, baseline_config, candidate, context, fidelity)
+    except BaseException:
+        remove_workspace(workspace)
+        raise
+
+
+def _evaluate(workspace: Path, node_hash: str, context: EvalContext, fidelity: float) -> EvalResult:
+    monitor = None
+    if context.early_abort:
+        config = json.loads(read_text(workspace / "src" / "config.json"))
+        monitor = FoldMonitor(lambda: context.board.scores(fidelity), n_folds=_fold_count(config))
+    cache = context.cache
+    cached = None
+    if cache is not None:
+        key = cache.key(node_hash, data_fingerprint(workspace / "data"))
+        cached = cache.get(key, workspace / "artifacts")
+    log_path = context.logs_dir / f"{node_hash}.log" if context.logs_dir else None
+    eval_result = cached
+    if eval_result is None:
+        with context.reserve() as grant:
+            eval_result = evaluate_solution(
+                workspace, timeout=context.timeout, monitor=monitor, log_path=log_path, grant=grant
+            )
+    if not eval_result.aborted:
+        context.board.offer(fidelity, eval_result.score, eval_result.fold_scores)
+        if cache is not None and cached is None:
+            cache.put(key, eval_result, workspace / "artifacts")
+    return eval_result
+
+
+def _fold_count(config: dict) -> int:
+    # Mirrors fold_count in the generated train.py.
+    return config.get("fidelity", {}).get("n_splits") or config.get("n_splits", 5)
+
+
+def _completed_result(node: SolutionNode, workspace: Path) -> EvalResult:
+    train_result = ExecutionResult(
+        exit_code=0,
+        runtime=node.runtime,
+        stdout="",
+        stderr="",
+        command=[],
+        cwd=str(workspace),
+        user_time=node.cpu_time,
+        peak_rss_mb=node.peak_rss_mb,
+    )
+    return EvalResult(
+        score=node.score,
+        score_std=node.score_std,
+        metric=node.metric,
+        train_result=train_result,
+        cached=True,
+        fold_scores=node.fold_scores,
+        aborted=node.status == "aborted",
+        failure=None if node.status in ("ok", "aborted") else node.status,
+    )
+
+
+def _cost_fields(result: EvalResult) -> dict:
+    train_result = result.train_result
+    return {
+        "runtime": train_result.runtime,
+        "cpu_time": train_result.cpu_time,
+        "peak_rss_mb": train_result.peak_rss_mb,
+    }
+
+
+def _store_node(
+    store: Optional[RunStore],
+    run_dir: Path,
+    node_id: str,
+    parent_id: Optional[str],
+    diff: str,
+    result: EvalResult,
+    fidelity: float = 1.0,
+) -> None:
+    if store is None:
+        return
+    artifacts_dir = run_dir.resolve() / "artifacts"
+    log_path = result.train_result.log_path
+    store.record_node(
+        {
+            "run_id": run_id_for(run_dir),
+            "node_id": node_id,
+            "parent_id": parent_id,
+            "score": result.score,
+            "score_std": result.score_std,
+            "metric": result.metric,
+            "fidelity": fidelity,
+            "status": result.status,
+            "cached": result.cached,
+            "diff": diff,
+            "artifact_dir": str(artifacts_dir / node_id),
+            "log_path": str(Path(log_path).resolve()) if log_path else None,
+            **_cost_fields(result),
+        },
+        result.fold_scores,
+    )
 
 
-def _append_metrics(path: Path, node_id: str, result: EvalResult) -> None:
+def _append_metrics(path: Path, node_id: str, result: EvalResult, fidelity: float = 1.0) -> None:
     payload = {
         "node_id": node_id,
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
@@ -88,6 +578,11 @@ def _append_metrics(path: Path, node_id: str, result: EvalResult) -> None:
         "score_std": result.score_std,
         "metric_name": result.metric,
         "cv": "default",
+        "cached": result.cached,
+        "fidelity": fidelity,
+        "fold_scores": result.fold_scores,
+        "status": result.status,
+        **_cost_fields(result),
     }
     with path.open("a", encoding="utf-8") as handle:
         handle.write(json.dumps(payload) + "\n")
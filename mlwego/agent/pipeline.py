@@ -0,0 +1,168 @@
+"""Producer/consumer pipeline that overlaps candidate proposal with candidate evaluation."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, List, Optional, Set, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class PipelineStats:
+    proposed: int = 0
+    evaluated: int = 0
+    duplicates: int = 0
+    # Time the producer spent blocked on a full queue, and evaluators spent waiting on an empty one.
+    producer_blocked: float = 0.0
+    evaluator_idle: float = 0.0
+
+
+class _Stop(Exception):
+    pass
+
+
+class Pipeline(Generic[T, R]):
+    """``propose(count, pending)`` runs on a producer thread and feeds a bounded queue drained by ``workers`` evaluators.
+
+    The producer is never more than ``queue_size`` items ahead of the evaluators, so proposals are made from a
+    recent view of the results; ``pending`` lists the items queued or being evaluated, so they can be avoided.
+    ``record`` is called on the evaluating thread while holding ``lock``; ``propose`` should take the same lock
+    to read state that ``record`` changes. A round of nothing but duplicates waits for the next result instead of
+    counting as idle, since a deterministic proposer repeats itself until the state it reads changes.
+    """
+
+    def __init__(
+        self,
+        propose: Callable[[int, List[T]], List[T]],
+        evaluate: Callable[[int, T], R],
+        record: Callable[[T, R], None],
+        key: Callable[[T], str] = str,
+        workers: int = 1,
+        queue_size: int = 2,
+        max_idle_rounds: int = 3,
+        lock: Optional[threading.Lock] = None,
+    ) -> None:
+        self.propose = propose
+        self.evaluate = evaluate
+        self.record = record
+        self.key = key
+        self.workers = workers
+        self.max_idle_rounds = max_idle_rounds
+        self.stats = PipelineStats()
+        self._queue: "queue.Queue[Optional[T]]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self.lock = lock or threading.Lock()
+        self._recorded = threading.Condition(self.lock)
+        self._pending: Dict[str, T] = {}
+        self._stats_lock = threading.Lock()
+
+    def run(self, budget: int, batch_size: int = 2) -> PipelineStats:
+        with ThreadPoolExecutor(max_workers=self.workers + 1, thread_name_prefix="pipeline") as pool:
+            futures = [pool.submit(self._produce, budget, batch_size)]
+            futures += [pool.submit(self._consume, worker) for worker in range(self.workers)]
+            try:
+                for future in futures:
+                    future.result()
+            finally:
+                self._stop.set()
+        return self.stats
+
+    def _produce(self, budget: int, batch_size: int) -> None:
+        seen: Set[str] = set()
+        idle_rounds = 0
+        try:
+            while self.stats.proposed < budget and idle_rounds < self.max_idle_rounds and not self._stop.is_set():
+                with self.lock:
+                    evaluated = self.stats.evaluated
+                    pending = list(self._pending.values())
+                fresh = 0
+                for item in self.propose(min(batch_size, budget - self.stats.proposed), pending):
+                    item_key = self.key(item)
+                    if item_key in seen:
+                        self.stats.duplicates += 1
+                        continue
+                    seen.add(item_key)
+                    with self.lock:
+                        self._pending[item_key] = item
+                    self._put(item)
+                    self.stats.proposed += 1
+                    fresh += 1
+                    if self.stats.proposed >= budget:
+                        break
+                if fresh or self._wait_for_record(evaluated):
+                    idle_rounds = 0
+                else:
+                    idle_rounds += 1
+        except _Stop:
+            return
+        except BaseException:
+            self._stop.set()
+            raise
+        for _ in range(self.workers):
+            try:
+                self._put(None)
+            except _Stop:
+                return
+
+    def _wait_for_record(self, evaluated: int) -> bool:
+        """Block until a result beyond the first ``evaluated`` is recorded; False when none is in flight."""
+        with self._recorded:
+            while self.stats.evaluated == evaluated:
+                if not self._pending:
+                    return False
+                if self._stop.is_set():
+                    raise _Stop()
+                self._recorded.wait(POLL_INTERVAL)
+        return True
+
+    def _consume(self, worker: int) -> None:
+        try:
+            while True:
+                item = self._get()
+                if item is None:
+                    return
+                result = self.evaluate(worker, item)
+                with self._recorded:
+                    self.record(item, result)
+                    self._pending.pop(self.key(item), None)
+                    self.stats.evaluated += 1
+                    self._recorded.notify_all()
+        except _Stop:
+            return
+        except BaseException:
+            self._stop.set()
+            raise
+
+    def _put(self, item: Optional[T]) -> None:
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _Stop()
+            try:
+                self._queue.put(item, timeout=POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+        self.stats.producer_blocked += time.perf_counter() - start
+
+    def _get(self) -> Optional[T]:
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _Stop()
+            try:
+                item = self._queue.get(timeout=POLL_INTERVAL)
+                break
+            except queue.Empty:
+                continue
+        with self._stats_lock:
+            self.stats.evaluator_idle += time.perf_counter() - start
+        return item
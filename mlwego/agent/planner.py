@@ -4,8 +4,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 from mlwego.evaluation.infer_task import TaskInfo, infer_task
+from mlwego.workspace.profiler import load_profile
 
 
 @dataclass
@@ -14,7 +16,7 @@ class Plan:
     baseline: str
 
 
-def build_plan(data_dir: str, task_description: str) -> Plan:
-    info = infer_task(Path(data_dir), task_description)
+def build_plan(data_dir: str, task_description: str, cache_root: Optional[Path] = None) -> Plan:
+    info = infer_task(Path(data_dir), task_description, profile=load_profile(Path(data_dir), cache_root))
     baseline = "RandomForest with numeric/categorical preprocessing"
     return Plan(task_info=info, baseline=baseline)
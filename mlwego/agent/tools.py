@@ -3,18 +3,19 @@
 from __future__ import annotations
 
 import json
+from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Dict, List
-
-import pandas as pd
+from typing import Any, Dict, List, Optional
 
 from mlwego.execution.sandbox import run_python
 from mlwego.workspace.file_ops import read_text, safe_path, write_text
+from mlwego.workspace.profiler import TableProfile, load_profile, profile_path, profile_table
 
 
 class ToolContext:
-    def __init__(self, root: Path) -> None:
+    def __init__(self, root: Path, cache_root: Optional[Path] = None) -> None:
         self.root = root.resolve()
+        self.cache_root = cache_root
 
     def read_file(self, rel_path: str) -> str:
         path = safe_path(self.root, self.root / rel_path)
@@ -39,9 +40,19 @@ class ToolContext:
         }
 
     def parse_csv_schema(self, rel_path: str) -> Dict[str, str]:
+        return self._table_profile(rel_path).dtypes()
+
+    def describe_csv(self, rel_path: str) -> Dict[str, Any]:
+        return asdict(self._table_profile(rel_path))
+
+    def _table_profile(self, rel_path: str) -> TableProfile:
         path = safe_path(self.root, self.root / rel_path)
-        df = pd.read_csv(path, nrows=5)
-        return {col: str(dtype) for col, dtype in df.dtypes.items()}
+        # Dtypes come from the whole file: the init-time profile when it covers this CSV, else a streaming pass.
+        if self.cache_root is not None and profile_path(path.parent, self.cache_root).exists():
+            table = load_profile(path.parent, self.cache_root).tables.get(path.stem)
+            if table is not None:
+                return table
+        return profile_table(path)
 
     def apply_patch(self, rel_path: str, new_content: str) -> str:
         path = safe_path(self.root, self.root / rel_path)
@@ -0,0 +1,74 @@
+"""Early abort of candidates from streamed fold scores."""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+FOLD_PREFIX = "MLWEGO_FOLD "
+
+# One-sided 95% Student-t quantiles by degrees of freedom.
+T_QUANTILES = {1: 6.314, 2: 2.920, 3: 2.353, 4: 2.132, 5: 2.015, 6: 1.943, 7: 1.895, 8: 1.860, 9: 1.833}
+
+
+class ReferenceBoard:
+    """Best fold scores seen so far per fidelity, shared by concurrent evaluations."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._best: Dict[float, Tuple[float, List[float]]] = {}
+
+    def offer(self, fidelity: float, score: float, fold_scores: Sequence[float]) -> None:
+        if not fold_scores:
+            return
+        with self._lock:
+            current = self._best.get(fidelity)
+            if current is None or score > current[0]:
+                self._best[fidelity] = (score, list(fold_scores))
+
+    def scores(self, fidelity: float) -> List[float]:
+        with self._lock:
+            current = self._best.get(fidelity)
+        return list(current[1]) if current else []
+
+
+class FoldMonitor:
+    def __init__(
+        self, reference: Callable[[], Sequence[float]], min_folds: int = 2, n_folds: Optional[int] = None
+    ) -> None:
+        self.reference = reference
+        self.min_folds = min_folds
+        # Once every fold has reported the CV is done; aborting then would only discard the finished result.
+        self.n_folds = n_folds
+        self.fold_scores: Dict[int, float] = {}
+        self.metric: Optional[str] = None
+
+    def __call__(self, line: str) -> bool:
+        if not line.startswith(FOLD_PREFIX):
+            return False
+        payload = json.loads(line[len(FOLD_PREFIX):])
+        self.fold_scores[int(payload["fold"])] = float(payload["score"])
+        self.metric = payload.get("metric", self.metric)
+        return self.should_abort()
+
+    @property
+    def scores(self) -> list[float]:
+        return [self.fold_scores[fold] for fold in sorted(self.fold_scores)]
+
+    def should_abort(self) -> bool:
+        if self.n_folds is not None and len(self.fold_scores) >= self.n_folds:
+            return False
+        reference = self.reference()
+        diffs = [
+            score - reference[fold]
+            for fold, score in self.fold_scores.items()
+            if fold < len(reference)
+        ]
+        if len(diffs) < self.min_folds:
+            return False
+        mean = sum(diffs) / len(diffs)
+        variance = sum((diff - mean) ** 2 for diff in diffs) / (len(diffs) - 1)
+        quantile = T_QUANTILES.get(len(diffs) - 1, 1.645)
+        return mean + quantile * math.sqrt(variance / len(diffs)) < 0.0
@@ -0,0 +1,132 @@
+"""Caruana ensemble selection over archived out-of-fold predictions."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mlwego.evaluation.scoring import BATCH_METRICS, MAX_CHUNK_ELEMENTS
+from mlwego.workspace.file_ops import ensure_dir, write_text
+
+
+@dataclass
+class PredictionMatrix:
+    """Memory-mapped (nodes, rows, k) OOF and test predictions; k is the class count or 1 for regression."""
+
+    node_ids: List[str]
+    oof: np.ndarray
+    test: np.ndarray
+    y_true: np.ndarray
+    metric: str
+    classes: Optional[np.ndarray] = None
+
+    @classmethod
+    def build(cls, run_dir: Path, node_ids: Sequence[str], dest: Path) -> "PredictionMatrix":
+        artifacts = run_dir / "artifacts"
+        eligible: List[Tuple[str, Path, Path]] = []
+        y_true: Optional[np.ndarray] = None
+        metrics: Dict[str, object] = {}
+        for node_id in node_ids:
+            node_dir = artifacts / node_id
+            if not (node_dir / "metrics.json").exists() or not (node_dir / "oof_target.npy").exists():
+                continue
+            node_metrics = json.loads((node_dir / "metrics.json").read_text(encoding="utf-8"))
+            proba = node_metrics.get("classes") is not None
+            oof_path = node_dir / ("oof_proba.npy" if proba else "oof.npy")
+            test_path = node_dir / ("test_proba.npy" if proba else "test_pred.npy")
+            if not oof_path.exists() or not test_path.exists():
+                continue
+            target = np.load(node_dir / "oof_target.npy", allow_pickle=False)
+            if y_true is None:
+                y_true, metrics = target, node_metrics
+            elif not np.array_equal(target, y_true) or node_metrics.get("classes") != metrics.get("classes"):
+                continue
+            eligible.append((node_id, oof_path, test_path))
+        if y_true is None or not eligible:
+            raise ValueError("No full-fidelity nodes with archived OOF and test predictions")
+        first_test = np.load(eligible[0][2], mmap_mode="r")
+        classes = np.asarray(metrics["classes"]) if metrics.get("classes") is not None else None
+        width = len(classes) if classes is not None else 1
+        ensure_dir(dest)
+        oof = np.lib.format.open_memmap(
+            dest / "oof.npy", mode="w+", dtype=np.float32, shape=(len(eligible), len(y_true), width)
+        )
+        test = np.lib.format.open_memmap(
+            dest / "test.npy", mode="w+", dtype=np.float32, shape=(len(eligible), first_test.shape[0], width)
+        )
+        for idx, (_, oof_path, test_path) in enumerate(eligible):
+            oof[idx] = np.load(oof_path, mmap_mode="r").reshape(len(y_true), width)
+            test[idx] = np.load(test_path, mmap_mode="r").reshape(first_test.shape[0], width)
+        oof.flush()
+        test.flush()
+        del oof, test
+        write_text(dest / "nodes.json", json.dumps([node_id for node_id, _, _ in eligible], indent=2))
+        return cls(
+            node_ids=[node_id for node_id, _, _ in eligible],
+            oof=np.load(dest / "oof.npy", mmap_mode="r"),
+            test=np.load(dest / "test.npy", mmap_mode="r"),
+            y_true=y_true,
+            metric=str(metrics["metric"]),
+            classes=classes,
+        )
+
+    def score(self, blends: np.ndarray) -> np.ndarray:
+        """Score (m, rows, k) blended predictions with the run metric, larger is better."""
+        values = self.classes[blends.argmax(axis=-1)] if self.classes is not None else blends[..., 0]
+        return BATCH_METRICS[self.metric][0](self.y_true[None, :], values)
+
+    def blend_test(self, weights: np.ndarray) -> np.ndarray:
+        blend = np.tensordot(weights, self.test, axes=1)
+        return self.classes[blend.argmax(axis=-1)] if self.classes is not None else blend[:, 0]
+
+
+@dataclass
+class EnsembleResult:
+    weights: np.ndarray
+    score: float
+    single_scores: np.ndarray
+
+
+def caruana_select(matrix: PredictionMatrix, rounds: int = 50) -> EnsembleResult:
+    """Greedy forward selection with replacement; every round scores adding each node in one batched pass."""
+    n_nodes, n_rows, width = matrix.oof.shape
+    chunk = max(1, MAX_CHUNK_ELEMENTS // (n_rows * width))
+    single = _score_chunks(matrix, np.zeros((n_rows, width)), 0, chunk)
+    first = int(np.argmax(single))
+    counts = np.zeros(n_nodes)
+    counts[first] = 1
+    running = np.asarray(matrix.oof[first], dtype=np.float64)
+    best_score, best_counts = float(single[first]), counts.copy()
+    for size in range(1, rounds):
+        scores = _score_chunks(matrix, running, size, chunk)
+        pick = int(np.argmax(scores))
+        counts[pick] += 1
+        running += matrix.oof[pick]
+        if scores[pick] > best_score:
+            best_score, best_counts = float(scores[pick]), counts.copy()
+    return EnsembleResult(weights=best_counts / best_counts.sum(), score=best_score, single_scores=single)
+
+
+def _score_chunks(matrix: PredictionMatrix, running: np.ndarray, size: int, chunk: int) -> np.ndarray:
+    scores = []
+    for start in range(0, matrix.oof.shape[0], chunk):
+        candidates = (running[None] + matrix.oof[start : start + chunk]) / (size + 1)
+        scores.append(matrix.score(candidates))
+    return np.concatenate(scores)
+
+
+def write_submission(data_dir: Path, preds: np.ndarray, output_path: Path) -> Path:
+    sample_path = data_dir / "sample_submission.csv"
+    if sample_path.exists():
+        submission = pd.read_csv(sample_path)
+        submission[submission.columns[1]] = preds
+    else:
+        submission = pd.DataFrame({"prediction": preds})
+    ensure_dir(output_path.parent)
+    submission.to_csv(output_path, index=False)
+    return output_path
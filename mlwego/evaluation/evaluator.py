@@ -3,30 +3,77 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
+from mlwego.evaluation.early_stop import FoldMonitor
+from mlwego.execution.resources import ResourceGrant
 from mlwego.execution.sandbox import ExecutionResult, run_python
 from mlwego.execution.timeouts import PREDICT_TIMEOUT, TRAIN_TIMEOUT
+from mlwego.workspace.artifacts import node_model_path
 
 
 @dataclass
 class EvalResult:
-    score: float
+    # None for runs that failed before producing a score.
+    score: Optional[float]
     score_std: float
     metric: str
     train_result: ExecutionResult
+    cached: bool = False
+    fold_scores: List[float] = field(default_factory=list)
+    aborted: bool = False
+    failure: Optional[str] = None
 
+    @property
+    def status(self) -> str:
+        if self.aborted:
+            return "aborted"
+        return self.failure or "ok"
 
-def evaluate_solution(run_dir: Path, timeout: int = TRAIN_TIMEOUT) -> EvalResult:
+
+class TrainingError(RuntimeError):
+    kind = "error"
+
+    def __init__(self, message: str, result: ExecutionResult) -> None:
+        super().__init__(message)
+        self.result = result
+
+
+class OutOfMemoryError(TrainingError):
+    kind = "oom"
+
+
+def evaluate_solution(
+    run_dir: Path,
+    timeout: int = TRAIN_TIMEOUT,
+    monitor: Optional[FoldMonitor] = None,
+    log_path: Optional[Path] = None,
+    grant: Optional[ResourceGrant] = None,
+) -> EvalResult:
     src_dir = run_dir / "src"
     train_script = src_dir / "train.py"
-    result = run_python(train_script, cwd=src_dir, timeout=timeout)
+    result = run_python(
+        train_script, cwd=src_dir, timeout=timeout, on_stdout=monitor, log_path=log_path, grant=grant
+    )
+    if result.aborted and monitor is not None:
+        scores = monitor.scores
+        mean = sum(scores) / len(scores)
+        return EvalResult(
+            score=mean,
+            score_std=(sum((score - mean) ** 2 for score in scores) / len(scores)) ** 0.5,
+            metric=monitor.metric or "",
+            train_result=result,
+            fold_scores=scores,
+            aborted=True,
+        )
     if result.exit_code != 0:
-        raise RuntimeError(
+        error = OutOfMemoryError if result.failure == "oom" else TrainingError
+        raise error(
             "Training failed with exit code "
-            f"{result.exit_code}.\nSTDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}"
+            f"{result.exit_code}.\nSTDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}",
+            result,
         )
     metrics_path = run_dir / "artifacts" / "metrics.json"
     if not metrics_path.exists():
@@ -40,13 +87,26 @@ def evaluate_solution(run_dir: Path, timeout: int = TRAIN_TIMEOUT) -> EvalResult
         score_std=float(metrics.get("score_std", 0.0)),
         metric=str(metrics["metric"]),
         train_result=result,
+        fold_scores=[float(score) for score in metrics.get("fold_scores", [])],
     )
 
 
-def run_predict(run_dir: Path, timeout: int = PREDICT_TIMEOUT) -> ExecutionResult:
-    src_dir = run_dir / "src"
-    predict_script = src_dir / "predict.py"
-    return run_python(predict_script, cwd=src_dir, timeout=timeout)
+def run_predict(run_dir: Path, timeout: int = PREDICT_TIMEOUT, node_id: Optional[str] = None) -> ExecutionResult:
+    """Write ``artifacts/submission.csv``; with ``node_id``, from that node's snapshot and stored model."""
+    if node_id is None:
+        src_dir = run_dir / "src"
+        return run_python(src_dir / "predict.py", cwd=src_dir, timeout=timeout)
+    model_path = node_model_path(run_dir, node_id)
+    if model_path is None:
+        raise FileNotFoundError(f"No stored model for node {node_id}; only completed training runs keep one")
+    src_dir = run_dir / "artifacts" / node_id / "src"
+    env = {
+        "MLWEGO_RUN_ROOT": str(run_dir.resolve()),
+        "MLWEGO_MODEL_PATH": str(model_path.resolve()),
+        # Snapshots are shared, read-only blobs; keep bytecode caches out of them.
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    return run_python(src_dir / "predict.py", cwd=src_dir, timeout=timeout, env=env)
 
 
 def validate_submission(run_dir: Path) -> Optional[str]:
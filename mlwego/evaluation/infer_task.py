@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional
 
-import pandas as pd
+from mlwego.workspace.profiler import DatasetProfile, TableProfile, load_profile
 
 
 @dataclass
@@ -18,14 +18,19 @@ class TaskInfo:
     target_columns: List[str]
 
 
-def infer_task(data_dir: Path, description: str = "") -> TaskInfo:
-    train = pd.read_csv(data_dir / "train.csv")
-    test = pd.read_csv(data_dir / "test.csv")
-    sample_path = data_dir / "sample_submission.csv"
-    target = _infer_target(train, test)
-    task_type = "classification" if train[target].nunique() <= 20 else "regression"
+def infer_task(data_dir: Path, description: str = "", profile: Optional[DatasetProfile] = None) -> TaskInfo:
+    """Infer the task from the dataset profile; without one the tables are profiled in a single streaming pass."""
+    profile = profile or load_profile(data_dir)
+    train = profile.tables.get("train")
+    if train is None or not train.names:
+        raise ValueError(f"No train.csv with columns in {data_dir}; the task is inferred from it")
+    target = _infer_target(train, profile.tables.get("test"))
+    target_profile = train.column(target)
+    if target_profile is None:
+        raise ValueError(f"Target column {target!r} not found in train.csv")
+    task_type = "classification" if target_profile.cardinality <= 20 else "regression"
     metric = _infer_metric(description, task_type)
-    id_column, target_columns = _infer_submission(sample_path)
+    id_column, target_columns = _infer_submission(profile.tables.get("sample_submission"))
     return TaskInfo(
         target=target,
         metric=metric,
@@ -35,11 +40,11 @@ def infer_task(data_dir: Path, description: str = "") -> TaskInfo:
     )
 
 
-def _infer_target(train: pd.DataFrame, test: pd.DataFrame) -> str:
-    candidates = [c for c in train.columns if c not in test.columns]
+def _infer_target(train: TableProfile, test: Optional[TableProfile]) -> str:
+    candidates = [c for c in train.names if c not in test.names] if test is not None else []
     if candidates:
         return candidates[0]
-    return train.columns[-1]
+    return train.names[-1]
 
 
 def _infer_metric(description: str, task_type: str) -> str:
@@ -55,10 +60,9 @@ def _infer_metric(description: str, task_type: str) -> str:
     return "accuracy" if task_type == "classification" else "rmse"
 
 
-def _infer_submission(sample_path: Path) -> tuple[Optional[str], List[str]]:
-    if not sample_path.exists():
+def _infer_submission(sample: Optional[TableProfile]) -> tuple[Optional[str], List[str]]:
+    if sample is None or not sample.names:
         return None, []
-    submission = pd.read_csv(sample_path)
-    id_column = submission.columns[0] if submission.columns.size > 0 else None
-    target_columns = [c for c in submission.columns if c != id_column]
+    id_column = sample.names[0]
+    target_columns = [c for c in sample.names if c != id_column]
     return id_column, target_columns
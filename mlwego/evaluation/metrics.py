@@ -16,7 +16,7 @@ def metric_registry() -> Dict[str, Tuple[MetricFn, str]]:
         "accuracy": (lambda y_true, y_pred: accuracy_score(y_true, y_pred), "max"),
         "roc_auc": (lambda y_true, y_pred: roc_auc_score(y_true, y_pred), "max"),
         "log_loss": (lambda y_true, y_pred: -log_loss(y_true, y_pred), "max"),
-        "rmse": (lambda y_true, y_pred: -mean_squared_error(y_true, y_pred, squared=False), "max"),
+        "rmse": (lambda y_true, y_pred: -float(np.sqrt(mean_squared_error(y_true, y_pred))), "max"),
         "mae": (lambda y_true, y_pred: -mean_absolute_error(y_true, y_pred), "max"),
     }
 
@@ -0,0 +1,130 @@
+"""Content-addressed cache of evaluation results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict
+from importlib import metadata
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+from mlwego.evaluation.evaluator import EvalResult
+from mlwego.execution.sandbox import ExecutionResult
+from mlwego.workspace.file_ops import ensure_dir, write_text
+
+CACHED_ARTIFACTS = [
+    "metrics.json",
+    "oof.npy",
+    "oof_target.npy",
+    "oof_proba.npy",
+    "test_pred.npy",
+    "test_proba.npy",
+    "model.joblib",
+]
+ENV_PACKAGES = ["numpy", "pandas", "scikit-learn", "joblib"]
+
+
+def environment_fingerprint() -> str:
+    parts = [platform.python_version()]
+    for name in ENV_PACKAGES:
+        try:
+            parts.append(f"{name}=={metadata.version(name)}")
+        except metadata.PackageNotFoundError:
+            parts.append(f"{name}==missing")
+    return ";".join(parts)
+
+
+class ResultCache:
+    def __init__(self, root: Path, max_entries: int = 512, max_bytes: int = 2 * 1024**3) -> None:
+        self.root = root
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.environment = environment_fingerprint()
+        self._lock = threading.Lock()
+
+    def key(self, src_hash: str, data_fingerprint: str) -> str:
+        payload = f"{src_hash}:{data_fingerprint}:{self.environment}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, artifacts_dir: Path) -> Optional[EvalResult]:
+        entry = self._entry_dir(key)
+        result_path = entry / "result.json"
+        if not result_path.exists():
+            return None
+        ensure_dir(artifacts_dir)
+        try:
+            data = json.loads(result_path.read_text(encoding="utf-8"))
+            for name in CACHED_ARTIFACTS:
+                if (entry / name).exists():
+                    shutil.copy2(entry / name, artifacts_dir / name)
+            os.utime(entry)
+        except FileNotFoundError:
+            # Evicted or replaced by another writer while we read it.
+            return None
+        train_result = ExecutionResult(**data.pop("train_result"))
+        return EvalResult(train_result=train_result, cached=True, **data)
+
+    def put(self, key: str, result: EvalResult, artifacts_dir: Path) -> None:
+        entry = self._entry_dir(key)
+        ensure_dir(entry.parent)
+        # Concurrent writers of the same key each stage into their own directory; the lock serialises the swap.
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}.", suffix=".tmp", dir=entry.parent))
+        try:
+            for name in CACHED_ARTIFACTS:
+                if (artifacts_dir / name).exists():
+                    shutil.copy2(artifacts_dir / name, staging / name)
+            data = asdict(result)
+            data.pop("cached")
+            write_text(staging / "result.json", json.dumps(data))
+            with self._locked():
+                if entry.exists():
+                    shutil.rmtree(entry)
+                staging.replace(entry)
+                self._evict()
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def evict(self) -> List[str]:
+        with self._locked():
+            return self._evict()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Held by one thread of one process at a time; other processes sharing the cache take the file lock."""
+        ensure_dir(self.root)
+        with self._lock, open(self.root / ".lock", "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+
+    def _evict(self) -> List[str]:
+        entries: List[Tuple[float, int, Path]] = []
+        for entry in self.root.glob("*/*"):
+            if entry.is_dir() and not entry.name.endswith(".tmp"):
+                size = sum(path.stat().st_size for path in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed: List[str] = []
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, entry = entries.pop(0)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed.append(entry.name)
+        return removed
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
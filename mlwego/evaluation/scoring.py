@@ -0,0 +1,113 @@
+"""Batched scoring, bootstrap intervals and paired tests over out-of-fold predictions."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+N_BOOTSTRAP = 2000
+ALPHA = 0.05
+# Upper bound on elements gathered per bootstrap chunk (nodes x resamples x rows).
+MAX_CHUNK_ELEMENTS = 1 << 24
+
+BatchMetricFn = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+def _accuracy(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    return (y_pred == y_true).mean(axis=-1)
+
+
+def _rmse(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    return -np.sqrt(((y_pred - y_true) ** 2).mean(axis=-1))
+
+
+def _mae(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    return -np.abs(y_pred - y_true).mean(axis=-1)
+
+
+def _log_loss(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    proba = np.clip(y_pred, 1e-15, 1 - 1e-15)
+    return (y_true * np.log(proba) + (1 - y_true) * np.log(1 - proba)).mean(axis=-1)
+
+
+def _roc_auc(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    from scipy.stats import rankdata
+
+    ranks = rankdata(y_pred, axis=-1)
+    positive = np.broadcast_to(y_true, y_pred.shape).astype(bool)
+    n_pos = positive.sum(axis=-1)
+    n_neg = y_pred.shape[-1] - n_pos
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (np.where(positive, ranks, 0.0).sum(axis=-1) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+# Every metric is oriented so that larger is better, like metrics.metric_registry.
+BATCH_METRICS: Dict[str, Tuple[BatchMetricFn, str]] = {
+    "accuracy": (_accuracy, "label"),
+    "roc_auc": (_roc_auc, "proba"),
+    "log_loss": (_log_loss, "proba"),
+    "rmse": (_rmse, "regression"),
+    "mae": (_mae, "regression"),
+}
+# "proba" metrics score the positive-class probability of a binary task, read from oof_proba.npy.
+TASK_KINDS = {"classification": ["label", "proba"], "regression": ["regression"]}
+
+
+def metrics_for(task_type: str, kind: Optional[str] = None) -> List[str]:
+    kinds = TASK_KINDS.get(task_type, [])
+    return [
+        name for name, (_, metric_kind) in BATCH_METRICS.items() if metric_kind in kinds and kind in (None, metric_kind)
+    ]
+
+
+def score_batch(y_true: np.ndarray, preds: np.ndarray, names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Score a (nodes, rows) prediction matrix against one target vector for every metric in one pass each."""
+    return {name: BATCH_METRICS[name][0](y_true[None, :], preds) for name in names}
+
+
+@dataclass
+class BootstrapResult:
+    metric: str
+    scores: np.ndarray
+    ci_low: np.ndarray
+    ci_high: np.ndarray
+    p_vs_best: np.ndarray
+    best_index: int
+
+
+def bootstrap_compare(
+    y_true: np.ndarray,
+    preds: np.ndarray,
+    metric: str,
+    n_boot: int = N_BOOTSTRAP,
+    alpha: float = ALPHA,
+    seed: int = 0,
+) -> BootstrapResult:
+    """Percentile intervals for every node and a paired one-sided test of each node against the best.
+
+    All nodes are scored on the same resampled rows, so ``p_vs_best`` is the share of resamples on which a node
+    does at least as well as the best one (with add-one smoothing).
+    """
+    fn = BATCH_METRICS[metric][0]
+    n_nodes, n_rows = preds.shape
+    scores = fn(y_true[None, :], preds)
+    best = int(np.nanargmax(scores))
+    rng = np.random.default_rng(seed)
+    chunk = max(1, MAX_CHUNK_ELEMENTS // max(n_nodes * n_rows, 1))
+    boot = np.empty((n_nodes, n_boot))
+    for start in range(0, n_boot, chunk):
+        size = min(chunk, n_boot - start)
+        idx = rng.integers(0, n_rows, size=(size, n_rows))
+        boot[:, start : start + size] = fn(y_true[idx], preds[:, idx])
+    low, high = np.nanpercentile(boot, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=1)
+    wins = np.sum(boot - boot[best] >= 0, axis=1)
+    return BootstrapResult(
+        metric=metric,
+        scores=scores,
+        ci_low=low,
+        ci_high=high,
+        p_vs_best=(wins + 1) / (n_boot + 1),
+        best_index=best,
+    )
@@ -0,0 +1,106 @@
+"""Bounded output capture with full logs spilled to disk."""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Deque, Dict, Optional
+
+HEAD_CHARS = 32_000
+TAIL_CHARS = 32_000
+
+
+class LogSink:
+    def __init__(self, path: Optional[Path]) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._handle: Optional[IO[str]] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = path.open("w", encoding="utf-8", errors="replace")
+
+    def write(self, text: str) -> None:
+        if self._handle is None:
+            return
+        with self._lock:
+            self._handle.write(text)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class BoundedCapture:
+    """Keep the head and tail of a stream in memory; everything else only reaches the log."""
+
+    def __init__(self, sink: Optional[LogSink] = None, head_chars: int = HEAD_CHARS, tail_chars: int = TAIL_CHARS) -> None:
+        self.sink = sink
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.total_chars = 0
+        self._head: list[str] = []
+        self._head_size = 0
+        self._tail: Deque[str] = deque()
+        self._tail_size = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_chars > self.head_chars + self.tail_chars
+
+    def write(self, text: str) -> None:
+        if self.sink is not None:
+            self.sink.write(text)
+        self.total_chars += len(text)
+        if self._head_size < self.head_chars:
+            room = self.head_chars - self._head_size
+            self._head.append(text[:room])
+            self._head_size += min(room, len(text))
+            text = text[room:]
+        if not text:
+            return
+        self._tail.append(text)
+        self._tail_size += len(text)
+        while self._tail_size > self.tail_chars:
+            excess = self._tail_size - self.tail_chars
+            first = self._tail[0]
+            if len(first) <= excess:
+                self._tail.popleft()
+                self._tail_size -= len(first)
+            else:
+                self._tail[0] = first[excess:]
+                self._tail_size -= excess
+
+    def text(self) -> str:
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        skipped = self.total_chars - len(head) - len(tail)
+        if skipped <= 0:
+            return head + tail
+        return f"{head}\n... [{skipped} characters truncated, see log] ...\n{tail}"
+
+
+@dataclass
+class CapturedRun:
+    exit_code: int
+    stdout: BoundedCapture = field(default_factory=BoundedCapture)
+    stderr: BoundedCapture = field(default_factory=BoundedCapture)
+    aborted: bool = False
+    # Killed by our memory watch for passing the grant's memory budget.
+    oom_killed: bool = False
+    peak_rss_mb: float = 0.0
+    user_time: float = 0.0
+    system_time: float = 0.0
+
+
+def rusage_fields(usage: Any) -> Dict[str, float]:
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "peak_rss_mb": usage.ru_maxrss / scale,
+        "user_time": usage.ru_utime,
+        "system_time": usage.ru_stime,
+    }
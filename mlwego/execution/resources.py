@@ -0,0 +1,168 @@
+"""CPU and memory budgets for concurrent script runs."""
+
+from __future__ import annotations
+
+import os
+import signal
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+PROC = Path("/proc")
+# Pins itself to the CPUs in argv[1] and execs the rest of argv. preexec_fn would do the same without the extra
+# exec, but it is unsafe to fork-and-run Python code from a parent with threads running.
+PIN_SCRIPT = (
+    "import os, sys; os.sched_setaffinity(0, map(int, sys.argv[1].split(','))); os.execvp(sys.argv[2], sys.argv[2:])"
+)
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+]
+
+
+def available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def total_memory_mb() -> Optional[int]:
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / (1024 * 1024))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+@dataclass
+class ResourceGrant:
+    cpus: List[int]
+    memory_mb: Optional[int] = None
+
+    def thread_env(self) -> Dict[str, str]:
+        threads = str(max(len(self.cpus), 1))
+        env = {name: threads for name in THREAD_ENV_VARS}
+        env["MLWEGO_CPUS"] = ",".join(str(cpu) for cpu in self.cpus)
+        if self.memory_mb:
+            env["MLWEGO_MEMORY_MB"] = str(self.memory_mb)
+        return env
+
+
+def pin_command(cmd: List[str], cpus: List[int]) -> List[str]:
+    """``cmd`` behind a wrapper that pins it to ``cpus`` before exec."""
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return cmd
+    return [sys.executable, "-c", PIN_SCRIPT, ",".join(str(cpu) for cpu in cpus), *cmd]
+
+
+def pin_cpus(cpus: List[int]) -> None:
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+
+def process_tree(pid: int) -> List[int]:
+    """``pid`` and its live descendants, read from /proc; just ``[pid]`` where /proc is unavailable."""
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = [entry for entry in os.listdir(PROC) if entry.isdigit()]
+    except OSError:
+        return [pid]
+    for entry in entries:
+        try:
+            stat = (PROC / entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name is parenthesised and may contain spaces; ppid is the second field after it.
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    tree, todo = [], [pid]
+    while todo:
+        current = todo.pop()
+        tree.append(current)
+        todo.extend(children.get(current, []))
+    return tree
+
+
+def rss_mb(pids: List[int]) -> float:
+    """Resident memory of ``pids`` in MB, from /proc/<pid>/statm."""
+    total = 0
+    for pid in pids:
+        try:
+            total += int((PROC / str(pid) / "statm").read_text().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024) if total else 0.0
+
+
+def oom_kills() -> Optional[int]:
+    """Processes the kernel OOM killer has killed since boot, or None where the kernel does not say."""
+    try:
+        for line in (PROC / "vmstat").read_text().splitlines():
+            if line.startswith("oom_kill "):
+                return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class MemoryWatch:
+    """Kills a process tree whose resident memory passes ``memory_mb``.
+
+    An address-space cap would also count virtual reservations (thread stacks, BLAS and allocator arenas),
+    which kills healthy runs, so the resident set is polled instead.
+    """
+
+    def __init__(self, pid: int, memory_mb: Optional[int]) -> None:
+        self.pid = pid
+        self.memory_mb = memory_mb
+        self.killed = False
+
+    def check(self) -> bool:
+        if not self.memory_mb or self.killed:
+            return self.killed
+        pids = process_tree(self.pid)
+        if rss_mb(pids) > self.memory_mb:
+            self.killed = True
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        return self.killed
+
+
+class ResourceManager:
+    def __init__(self, cpus: Optional[List[int]] = None, memory_mb: Optional[int] = None) -> None:
+        self.cpus = list(cpus) if cpus else available_cpus()
+        self.memory_mb = memory_mb if memory_mb is not None else total_memory_mb()
+        self._free_cpus = list(self.cpus)
+        self._free_memory = self.memory_mb or 0
+        self._cond = threading.Condition()
+
+    def share(self, jobs: int) -> tuple[int, Optional[int]]:
+        jobs = max(jobs, 1)
+        cpus = max(len(self.cpus) // jobs, 1)
+        memory = self.memory_mb // jobs if self.memory_mb else None
+        return cpus, memory
+
+    @contextmanager
+    def acquire(self, cpus: int, memory_mb: Optional[int] = None) -> Iterator[ResourceGrant]:
+        cpus = min(max(cpus, 1), len(self.cpus))
+        memory = min(memory_mb, self.memory_mb) if memory_mb and self.memory_mb else 0
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._free_cpus) >= cpus and self._free_memory >= memory)
+            granted = self._free_cpus[:cpus]
+            del self._free_cpus[:cpus]
+            self._free_memory -= memory
+        try:
+            yield ResourceGrant(cpus=granted, memory_mb=memory or None)
+        finally:
+            with self._cond:
+                self._free_cpus = sorted(self._free_cpus + granted)
+                self._free_memory += memory
+                self._cond.notify_all()
@@ -2,12 +2,24 @@
 
 from __future__ import annotations
 
+import atexit
 import os
+import signal
 import subprocess
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import IO, Callable, Dict, List, Optional
+
+from mlwego.execution.capture import BoundedCapture, CapturedRun, LogSink, rusage_fields
+from mlwego.execution.resources import MemoryWatch, ResourceGrant, oom_kills, pin_command
+from mlwego.execution.warm_pool import WarmPool, warm_supported
+
+POLL_INTERVAL = 0.05
+OOM_MARKERS = ["MemoryError", "Unable to allocate", "std::bad_alloc", "Cannot allocate memory"]
+
+_WARM_POOL: Optional[WarmPool] = None
 
 
 @dataclass
@@ -18,6 +30,34 @@ class ExecutionResult:
     stderr: str
     command: List[str]
     cwd: str
+    aborted: bool = False
+    peak_rss_mb: float = 0.0
+    user_time: float = 0.0
+    system_time: float = 0.0
+    signal: Optional[int] = None
+    log_path: Optional[str] = None
+    truncated: bool = False
+    failure: Optional[str] = None
+
+    @property
+    def cpu_time(self) -> float:
+        return self.user_time + self.system_time
+
+
+LineCallback = Callable[[str], bool]
+
+
+def configure_warm_pool(size: int) -> bool:
+    """Route run_python through a warm worker pool; a size of 0 restores cold subprocesses."""
+    global _WARM_POOL
+    if _WARM_POOL is not None:
+        _WARM_POOL.close()
+        _WARM_POOL = None
+    if size <= 0 or not warm_supported():
+        return False
+    _WARM_POOL = WarmPool(size)
+    atexit.register(_WARM_POOL.close)
+    return True
 
 
 def run_python(
@@ -25,27 +65,135 @@ def run_python(
     cwd: Path,
     timeout: int,
     env: Optional[Dict[str, str]] = None,
+    on_stdout: Optional[LineCallback] = None,
+    log_path: Optional[Path] = None,
+    grant: Optional[ResourceGrant] = None,
 ) -> ExecutionResult:
+    """Run a script; ``on_stdout`` sees each stdout line as it arrives and returns True to abort the run.
+
+    With a ``grant`` the child is pinned to the granted CPUs, killed if its resident memory passes the
+    granted budget, and the BLAS/OpenMP thread counts are set to match.
+    """
     start = time.time()
     resolved_script = script_path.resolve()
     cmd = ["python", str(resolved_script)]
     merged_env = os.environ.copy()
     if env:
         merged_env.update(env)
-    proc = subprocess.run(
-        cmd,
-        cwd=str(cwd),
-        env=merged_env,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-    )
+    if grant is not None:
+        merged_env.update(grant.thread_env())
+    kills_before = oom_kills()
+    if _WARM_POOL is not None:
+        run = _WARM_POOL.run(
+            resolved_script, cwd.resolve(), merged_env, timeout, on_stdout=on_stdout, log_path=log_path, grant=grant
+        )
+    else:
+        run = _run_cold(cmd, cwd, merged_env, timeout, on_stdout, log_path, grant)
     runtime = time.time() - start
+    stderr = run.stderr.text()
+    kills_after = oom_kills()
+    # A SIGKILL only means out-of-memory if the kernel OOM killer fired during the run.
+    kernel_oom = (
+        run.exit_code == -signal.SIGKILL
+        and not run.aborted
+        and kills_before is not None
+        and kills_after is not None
+        and kills_after > kills_before
+    )
     return ExecutionResult(
-        exit_code=proc.returncode,
+        exit_code=run.exit_code,
         runtime=runtime,
-        stdout=proc.stdout,
-        stderr=proc.stderr,
+        stdout=run.stdout.text(),
+        stderr=stderr,
         command=cmd,
         cwd=str(cwd),
+        aborted=run.aborted,
+        peak_rss_mb=run.peak_rss_mb,
+        user_time=run.user_time,
+        system_time=run.system_time,
+        signal=-run.exit_code if run.exit_code < 0 else None,
+        log_path=str(log_path) if log_path else None,
+        truncated=run.stdout.truncated or run.stderr.truncated,
+        failure=classify_failure(run.exit_code, stderr, run.aborted, oom_killed=run.oom_killed or kernel_oom),
     )
+
+
+def classify_failure(exit_code: int, stderr: str, aborted: bool = False, oom_killed: bool = False) -> Optional[str]:
+    """Return None for a clean exit, "oom" for memory exhaustion, "error" for anything else.
+
+    ``oom_killed`` says the run was killed for its memory use; other SIGKILLs (timeouts, a user's kill) are errors.
+    """
+    if exit_code == 0 or aborted:
+        return None
+    if oom_killed or any(marker in stderr for marker in OOM_MARKERS):
+        return "oom"
+    return "error"
+
+
+def _run_cold(
+    cmd: List[str],
+    cwd: Path,
+    env: Dict[str, str],
+    timeout: int,
+    on_stdout: Optional[LineCallback],
+    log_path: Optional[Path],
+    grant: Optional[ResourceGrant] = None,
+) -> CapturedRun:
+    proc = subprocess.Popen(
+        pin_command(cmd, grant.cpus) if grant else cmd,
+        cwd=str(cwd),
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    watch = MemoryWatch(proc.pid, grant.memory_mb if grant else None)
+    sink = LogSink(log_path)
+    run = CapturedRun(exit_code=0, stdout=BoundedCapture(sink), stderr=BoundedCapture(sink))
+    aborted = threading.Event()
+
+    def pump(stream: IO[str], capture: BoundedCapture, callback: Optional[LineCallback]) -> None:
+        for line in stream:
+            capture.write(line)
+            if callback is not None and not aborted.is_set() and callback(line):
+                aborted.set()
+                proc.kill()
+
+    readers = [
+        threading.Thread(target=pump, args=(proc.stdout, run.stdout, on_stdout), daemon=True),
+        threading.Thread(target=pump, args=(proc.stderr, run.stderr, None), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        _wait(proc, timeout, run, watch)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        for reader in readers:
+            reader.join()
+        sink.close()
+    run.aborted = aborted.is_set()
+    run.oom_killed = watch.killed
+    return run
+
+
+def _wait(proc: subprocess.Popen, timeout: int, run: CapturedRun, watch: MemoryWatch) -> None:
+    if not hasattr(os, "wait4"):
+        run.exit_code = proc.wait(timeout=timeout)
+        return
+    deadline = time.time() + timeout
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            proc.returncode = run.exit_code = os.waitstatus_to_exitcode(status)
+            for name, value in rusage_fields(usage).items():
+                setattr(run, name, value)
+            return
+        if time.time() >= deadline:
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+        watch.check()
+        time.sleep(POLL_INTERVAL)
@@ -0,0 +1,315 @@
+"""Warm worker pool that runs scripts in forked, pre-imported interpreters."""
+
+from __future__ import annotations
+
+import codecs
+import importlib
+import json
+import os
+import queue
+import runpy
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from mlwego.execution.capture import BoundedCapture, CapturedRun, LogSink, rusage_fields
+from mlwego.execution.resources import MemoryWatch, ResourceGrant, pin_cpus
+
+POLL_INTERVAL = 0.2
+
+PRELOAD_MODULES = [
+    "numpy",
+    "pandas",
+    "joblib",
+    "sklearn",
+    "sklearn.compose",
+    "sklearn.ensemble",
+    "sklearn.impute",
+    "sklearn.metrics",
+    "sklearn.model_selection",
+    "sklearn.pipeline",
+    "sklearn.preprocessing",
+    "threadpoolctl",
+]
+
+
+def warm_supported() -> bool:
+    return hasattr(os, "fork") and hasattr(os, "setsid") and hasattr(os, "wait4")
+
+
+class WarmWorker:
+    def __init__(self, python: str = sys.executable) -> None:
+        self.proc = subprocess.Popen(
+            [python, "-m", "mlwego.execution.warm_pool"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._buffer = b""
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def execute(
+        self,
+        script_path: Path,
+        cwd: Path,
+        env: Dict[str, str],
+        timeout: int,
+        stdout: BoundedCapture,
+        stderr: BoundedCapture,
+        on_stdout: Optional[Callable[[str], bool]] = None,
+        grant: Optional[ResourceGrant] = None,
+    ) -> Tuple[Dict[str, Any], bool, bool]:
+        """Returns the worker's reply, whether ``on_stdout`` aborted the run and whether it ran out of memory."""
+        with tempfile.TemporaryDirectory(prefix="mlwego_warm_") as tmp:
+            out, err = _Fifo(Path(tmp) / "stdout", stdout), _Fifo(Path(tmp) / "stderr", stderr)
+            try:
+                request = {
+                    "script": str(script_path),
+                    "cwd": str(cwd),
+                    "env": env,
+                    "stdout": str(out.path),
+                    "stderr": str(err.path),
+                    "cpus": grant.cpus if grant else [],
+                }
+                assert self.proc.stdin is not None
+                self.proc.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+                self.proc.stdin.flush()
+                pid = int(self._read_message(None)["pid"])
+                deadline = time.time() + timeout
+                watch = MemoryWatch(pid, grant.memory_mb if grant else None)
+                aborted = False
+                while True:
+                    wait = min(deadline, time.time() + POLL_INTERVAL) if watch.memory_mb else deadline
+                    reply = self._read_message(wait, [out.fd, err.fd])
+                    err.read()
+                    for line in out.read(final=reply is not None):
+                        if on_stdout is not None and not aborted and on_stdout(line):
+                            aborted = True
+                            _kill_group(pid)
+                    if reply is not None:
+                        return reply, aborted, watch.killed
+                    watch.check()
+                    if time.time() >= deadline:
+                        _kill_group(pid)
+                        self._read_message(None)
+                        raise subprocess.TimeoutExpired(["python", str(script_path)], timeout)
+            finally:
+                out.close()
+                err.close()
+
+    def close(self) -> None:
+        if self.proc.stdin:
+            self.proc.stdin.close()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+    def _read_message(self, deadline: Optional[float], streams: Sequence[int] = ()) -> Optional[Dict[str, Any]]:
+        """Next reply from the worker, or None at the deadline or as soon as one of ``streams`` has output."""
+        assert self.proc.stdout is not None
+        fd = self.proc.stdout.fileno()
+        while b"\n" not in self._buffer:
+            wait = None if deadline is None else max(deadline - time.time(), 0.0)
+            ready, _, _ = select.select([fd, *streams], [], [], wait)
+            if fd not in ready:
+                return None
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise RuntimeError("Warm worker exited unexpectedly")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line.decode("utf-8"))
+
+
+class WarmPool:
+    def __init__(self, size: int = 1, python: str = sys.executable) -> None:
+        self.size = max(size, 1)
+        self.python = python
+        self._idle: "queue.Queue[WarmWorker]" = queue.Queue()
+        self._workers: List[WarmWorker] = []
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        script_path: Path,
+        cwd: Path,
+        env: Dict[str, str],
+        timeout: int,
+        on_stdout: Optional[Callable[[str], bool]] = None,
+        log_path: Optional[Path] = None,
+        grant: Optional[ResourceGrant] = None,
+    ) -> CapturedRun:
+        worker = self._acquire()
+        sink = LogSink(log_path)
+        try:
+            stdout, stderr = BoundedCapture(sink), BoundedCapture(sink)
+            reply, aborted, oom_killed = worker.execute(
+                script_path, cwd, env, timeout, stdout, stderr, on_stdout=on_stdout, grant=grant
+            )
+            return CapturedRun(
+                exit_code=int(reply["exit_code"]),
+                stdout=stdout,
+                stderr=stderr,
+                aborted=aborted,
+                oom_killed=oom_killed,
+                peak_rss_mb=reply.get("peak_rss_mb", 0.0),
+                user_time=reply.get("user_time", 0.0),
+                system_time=reply.get("system_time", 0.0),
+            )
+        finally:
+            sink.close()
+            self._release(worker)
+
+    def close(self) -> None:
+        with self._lock:
+            for worker in self._workers:
+                worker.close()
+            self._workers = []
+
+    def _acquire(self) -> WarmWorker:
+        with self._lock:
+            if self._idle.empty() and len(self._workers) < self.size:
+                worker = WarmWorker(self.python)
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def _release(self, worker: WarmWorker) -> None:
+        if not worker.alive():
+            with self._lock:
+                self._workers.remove(worker)
+            worker.close()
+            return
+        self._idle.put(worker)
+
+
+class _Fifo:
+    """A named pipe the child writes one stream to; its output goes straight into a bounded capture."""
+
+    def __init__(self, path: Path, capture: BoundedCapture) -> None:
+        self.path = path
+        self.capture = capture
+        os.mkfifo(path, 0o600)
+        self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        # Holding a write end stops the pipe reading as closed before the child opens it.
+        self._writer = os.open(path, os.O_WRONLY)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    def read(self, final: bool = False) -> List[str]:
+        """Drain what the child has written so far and return the complete lines."""
+        text = ""
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            text += self._decoder.decode(chunk)
+        if final:
+            text += self._decoder.decode(b"", final=True)
+        if text:
+            self.capture.write(text)
+        *lines, self._partial = (self._partial + text).split("\n")
+        if final and self._partial:
+            lines.append(self._partial)
+            self._partial = ""
+        return [line + "\n" for line in lines]
+
+    def close(self) -> None:
+        os.close(self._writer)
+        os.close(self.fd)
+
+
+def _kill_group(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def serve() -> None:
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    for line in sys.stdin:
+        request = json.loads(line)
+        pid = os.fork()
+        if pid == 0:
+            _run_child(request)
+        channel.write(json.dumps({"pid": pid}) + "\n")
+        channel.flush()
+        _, status, usage = os.wait4(pid, 0)
+        reply = {"exit_code": os.waitstatus_to_exitcode(status), **rusage_fields(usage)}
+        channel.write(json.dumps(reply) + "\n")
+        channel.flush()
+
+
+def _run_child(request: Dict[str, Any]) -> None:
+    code = 1
+    try:
+        os.setsid()
+        for fd, key in ((1, "stdout"), (2, "stderr")):
+            target = os.open(request[key], os.O_WRONLY)
+            os.dup2(target, fd)
+            os.close(target)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        _limit_child(request.get("cpus") or [])
+        script = request["script"]
+        sys.argv = [script]
+        sys.path[0] = os.path.dirname(script)
+        runpy.run_path(script, run_name="__main__")
+        code = 0
+    except SystemExit as exc:
+        if exc.code is None:
+            code = 0
+        elif isinstance(exc.code, int):
+            code = exc.code
+        else:
+            print(exc.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _limit_child(cpus: List[int]) -> None:
+    pin_cpus(cpus)
+    if not cpus:
+        return
+    # BLAS and OpenMP pools were sized when the worker preloaded them, so env vars alone are too late.
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(len(cpus))
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,49 +1,309 @@
-"""Ollama client wrapper."""
+"""Ollama client wrapper with pooled keep-alive connections, streaming and an asyncio API."""
 
 from __future__ import annotations
 
+import asyncio
+import http.client
 import json
 import os
-import urllib.request
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional
+
+from mlwego.llm.response_cache import ResponseCache, is_deterministic, request_key
+
+TokenCallback = Callable[[str], None]
+# Errors that mean an idle keep-alive connection was closed by the server before it saw our request.
+STALE_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError, http.client.CannotSendRequest)
+
+
+@dataclass
+class ChatMetrics:
+    ttft: float
+    total: float
+    chunks: int
+    eval_count: Optional[int] = None
+    tokens_per_s: Optional[float] = None
 
 
 @dataclass
 class OllamaResponse:
     message: Dict[str, Any]
     raw: Dict[str, Any]
+    metrics: Optional[ChatMetrics] = None
+    cached: bool = False
+
+
+class ConnectionPool:
+    """At most ``size`` keep-alive connections to one host; callers block while all of them are busy."""
+
+    def __init__(self, host: str, timeout: float, size: int = 4) -> None:
+        parsed = urllib.parse.urlsplit(host if "://" in host else f"http://{host}")
+        self.scheme = parsed.scheme
+        self.netloc = parsed.netloc
+        self.base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.size = size
+        self.opened = 0
+        self._idle: List[http.client.HTTPConnection] = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def acquire(self) -> http.client.HTTPConnection:
+        self._slots.acquire()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def release(self, conn: http.client.HTTPConnection, reuse: bool = True) -> None:
+        if reuse:
+            with self._lock:
+                self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def replace(self, conn: http.client.HTTPConnection) -> http.client.HTTPConnection:
+        conn.close()
+        return self._connect()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        with self._lock:
+            self.opened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+
+class ChatStream:
+    """Iterate over content deltas as they arrive; ``response`` holds the merged message once exhausted."""
+
+    def __init__(self, pool: ConnectionPool, payload: Dict[str, Any]) -> None:
+        self._pool = pool
+        self.response: Optional[OllamaResponse] = None
+        self._started = time.perf_counter()
+        self._conn = pool.acquire()
+        try:
+            self._http = self._send(payload)
+        except BaseException:
+            pool.release(self._conn, reuse=False)
+            raise
+        self._done = False
+        self._tokens = self._read()
+
+    def __iter__(self) -> Iterator[str]:
+        return self._tokens
+
+    def _read(self) -> Iterator[str]:
+        content: List[str] = []
+        tool_calls: List[Dict[str, Any]] = []
+        message: Dict[str, Any] = {"role": "assistant"}
+        ttft: Optional[float] = None
+        chunks = 0
+        final: Dict[str, Any] = {}
+        try:
+            for line in self._http:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if "error" in data:
+                    raise RuntimeError(f"Ollama error: {data['error']}")
+                part = data.get("message", {})
+                message["role"] = part.get("role", message["role"])
+                tool_calls.extend(part.get("tool_calls", []))
+                delta = part.get("content", "")
+                if delta or part.get("tool_calls"):
+                    chunks += 1
+                    if ttft is None:
+                        ttft = time.perf_counter() - self._started
+                if delta:
+                    content.append(delta)
+                    yield delta
+                if data.get("done"):
+                    final = data
+                    break
+        finally:
+            # A stream abandoned part-way leaves unread bytes on the socket, so that connection cannot be reused.
+            reusable = bool(final) and not self._http.will_close
+            if reusable:
+                self._http.read()
+            self._pool.release(self._conn, reuse=reusable)
+            self._done = True
+        total = time.perf_counter() - self._started
+        message["content"] = "".join(content)
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        eval_count = final.get("eval_count")
+        eval_seconds = final.get("eval_duration", 0) / 1e9
+        metrics = ChatMetrics(
+            ttft=ttft if ttft is not None else total,
+            total=total,
+            chunks=chunks,
+            eval_count=eval_count,
+            tokens_per_s=eval_count / eval_seconds if eval_count and eval_seconds else None,
+        )
+        self.response = OllamaResponse(message=message, raw={**final, "message": message}, metrics=metrics)
+
+    def close(self) -> None:
+        # Closing a started generator runs its cleanup; one that never started still holds the connection.
+        self._tokens.close()
+        if not self._done:
+            self._done = True
+            self._pool.release(self._conn, reuse=False)
+
+    def __enter__(self) -> "ChatStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _send(self, payload: Dict[str, Any]) -> http.client.HTTPResponse:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        path = f"{self._pool.base_path}/api/chat"
+        for attempt in range(2):
+            try:
+                self._conn.request("POST", path, body=body, headers=headers)
+                resp = self._conn.getresponse()
+            except STALE_ERRORS:
+                if attempt:
+                    raise
+                self._conn = self._pool.replace(self._conn)
+                continue
+            if resp.status != 200:
+                detail = resp.read().decode("utf-8", errors="replace")
+                raise RuntimeError(f"Ollama returned HTTP {resp.status}: {detail}")
+            return resp
+        raise AssertionError("unreachable")
 
 
 class OllamaClient:
-    def __init__(self, host: Optional[str] = None, timeout: int = 60) -> None:
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        timeout: int = 60,
+        pool_size: int = 4,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
         self.host = host or os.environ.get("OLLAMA_HOST", "http://localhost:11434")
         self.timeout = timeout
+        self.pool = ConnectionPool(self.host, timeout, pool_size)
+        self.cache = cache
+        self._executor: Optional[ThreadPoolExecutor] = None
 
-    def chat(
+    def payload(
         self,
         model: str,
         messages: List[Dict[str, Any]],
         tools: Optional[List[Dict[str, Any]]] = None,
         temperature: float = 0.0,
-    ) -> OllamaResponse:
+    ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
             "model": model,
             "messages": messages,
-            "stream": False,
+            "stream": True,
             "options": {"temperature": temperature},
         }
         if tools:
             payload["tools"] = tools
-        req = urllib.request.Request(
-            f"{self.host.rstrip('/')}/api/chat",
-            data=json.dumps(payload).encode("utf-8"),
-            headers={"Content-Type": "application/json"},
-            method="POST",
+        return payload
+
+    def stream(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.0,
+    ) -> ChatStream:
+        """Stream one chat from the server; this always bypasses the response cache."""
+        return ChatStream(self.pool, self.payload(model, messages, tools, temperature))
+
+    def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.0,
+        on_token: Optional[TokenCallback] = None,
+    ) -> OllamaResponse:
+        """Streamed chat; with a cache, temperature-0 requests are answered from disk when seen before."""
+        payload = self.payload(model, messages, tools, temperature)
+        key = None
+        if self.cache is not None:
+            if not is_deterministic(payload):
+                self.cache.record_bypass()
+            else:
+                key = request_key(payload)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    if on_token is not None and cached["message"].get("content"):
+                        on_token(cached["message"]["content"])
+                    return OllamaResponse(message=cached["message"], raw=cached, cached=True)
+        with ChatStream(self.pool, payload) as chat_stream:
+            for token in chat_stream:
+                if on_token is not None:
+                    on_token(token)
+        response = chat_stream.response
+        assert response is not None
+        if self.cache is not None and key is not None:
+            self.cache.put(key, model, response.raw)
+        return response
+
+    async def achat(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.0,
+        on_token: Optional[TokenCallback] = None,
+    ) -> OllamaResponse:
+        """Run ``chat`` on the client's worker threads; ``on_token`` is called on the event loop."""
+        loop = asyncio.get_running_loop()
+        callback = None
+        if on_token is not None:
+            callback = lambda token: loop.call_soon_threadsafe(on_token, token)  # noqa: E731
+        return await loop.run_in_executor(
+            self._workers(), lambda: self.chat(model, messages, tools, temperature, on_token=callback)
         )
-        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-        return OllamaResponse(message=data.get("message", {}), raw=data)
+
+    async def astream(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.0,
+    ) -> AsyncIterator[str]:
+        tokens: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(self.achat(model, messages, tools, temperature, on_token=tokens.put_nowait))
+        task.add_done_callback(lambda _: loop.call_soon(tokens.put_nowait, None))
+        while True:
+            token = await tokens.get()
+            if token is None:
+                break
+            yield token
+        await task
+
+    def close(self) -> None:
+        self.pool.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _workers(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix="ollama")
+        return self._executor
 
     @staticmethod
     def format_tool_calls(response: OllamaResponse) -> Iterable[Dict[str, Any]]:
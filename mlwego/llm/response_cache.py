@@ -0,0 +1,123 @@
+"""On-disk LRU cache of deterministic (temperature 0) LLM responses."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CACHE_NAME = "llm_cache.sqlite"
+KEY_FIELDS = ["model", "messages", "tools", "options"]
+STAT_NAMES = ["hits", "misses", "bypassed", "evicted"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def default_cache_path(run_dir: Optional[Path] = None) -> Path:
+    """``$MLWEGO_LLM_CACHE`` if set, else a cache shared by all runs next to ``run_dir``."""
+    env_path = os.environ.get("MLWEGO_LLM_CACHE")
+    if env_path:
+        return Path(env_path)
+    parent = run_dir.resolve().parent if run_dir is not None else Path("runs")
+    return parent / CACHE_NAME
+
+
+def request_key(payload: Dict[str, Any]) -> str:
+    """Hash of the fields that determine a response; ``stream`` and other transport fields are ignored."""
+    canonical = json.dumps({name: payload.get(name) for name in KEY_FIELDS}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_deterministic(payload: Dict[str, Any]) -> bool:
+    # Ollama samples at its own default temperature when none is given, so only an explicit 0 is cacheable.
+    return (payload.get("options") or {}).get("temperature") == 0
+
+
+class ResponseCache:
+    def __init__(self, path: Path, max_entries: int = 20_000, max_bytes: int = 256 * 1024**2) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._count("hits")
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, key: str, model: str, response: Dict[str, Any]) -> None:
+        body = zlib.compress(json.dumps(response, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, body, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, body, len(body), now, now),
+            )
+            self._evict()
+
+    def record_bypass(self) -> None:
+        with self._lock, self._conn:
+            self._count("bypassed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        stats: Dict[str, Any] = {name: counts.get(name, 0) for name in STAT_NAMES}
+        lookups = stats["hits"] + stats["misses"]
+        stats.update(entries=entries, bytes=size, hit_rate=stats["hits"] / lookups if lookups else 0.0)
+        return stats
+
+    def _evict(self) -> None:
+        entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        evicted = 0
+        # Walk the LRU index from the oldest entry until both bounds hold.
+        for key, entry_size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if entries <= self.max_entries and size <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            entries, size, evicted = entries - 1, size - entry_size, evicted + 1
+        if evicted:
+            self._count("evicted", evicted)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        self._conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+            (name, amount, amount),
+        )
@@ -1,20 +1,270 @@
-"""Token budget utilities."""
+"""Token budget utilities: token counting, log compaction and per-section prompt budgets."""
 
 from __future__ import annotations
 
-from typing import Iterable, List
+import math
+import re
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
+TokenCounter = Callable[[str], int]
 
-def truncate_logs(logs: Iterable[str], max_chars: int = 8000) -> List[str]:
-    collected: List[str] = []
-    total = 0
-    for entry in logs:
-        if total + len(entry) > max_chars:
-            remaining = max_chars - total
-            if remaining <= 0:
+_PIECES = re.compile(r"\w+|[^\w\s]")
+_PROGRESS = re.compile(
+    r"\d+%\|.*\||\[\s*\d+/\d+\b|^\s*\d+/\d+\s*\[|^\s*(epoch|iter(ation)?|step)\s*\d+\s*/\s*\d+", re.IGNORECASE
+)
+_EXCEPTION_START = re.compile(r"^Traceback \(most recent call last\):|^Fatal Python error")
+_EXCEPTION_LINE = re.compile(r"^[\w.]*(Error|Exception|Interrupt|Exit)\b.*|^Killed\b")
+DEFAULT_SHARES = {"task": 0.15, "profile": 0.2, "code": 0.35, "logs": 0.3}
+# Share of a section that DEFAULT_SHARES (or the caller's shares) does not name.
+OTHER_SHARE = 0.1
+# Room set aside for the "[... N lines omitted ...]" markers; _fit_gaps trims further if they need more.
+GAP_RESERVE = 24
+# Of the lines that fit beside the exception blocks, this share goes to the head of the log, the rest to the tail.
+HEAD_SHARE = 0.3
+
+
+def approx_tokens(text: str) -> int:
+    """Rough BPE-style count: one token per punctuation mark and per four characters of a word."""
+    return sum(math.ceil(len(piece) / 4) for piece in _PIECES.findall(text)) + text.count("\n")
+
+
+class TokenCache:
+    """Line-level memo over any tokenizer, so re-budgeting a growing log only counts the new lines."""
+
+    def __init__(self, counter: TokenCounter = approx_tokens, max_entries: int = 65_536) -> None:
+        self.counter = counter
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+
+    def count_line(self, line: str) -> int:
+        cached = self._counts.get(line)
+        if cached is not None:
+            self._counts.move_to_end(line)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        value = self.counter(line)
+        self._counts[line] = value
+        if len(self._counts) > self.max_entries:
+            self._counts.popitem(last=False)
+        return value
+
+    def count(self, text: str) -> int:
+        return sum(self.count_line(line) for line in text.splitlines(keepends=True))
+
+
+def normalize_lines(text: str) -> List[str]:
+    """Resolve carriage-return redraws, collapse progress bars and runs of identical lines."""
+    lines = [line.rsplit("\r", 1)[-1] for line in text.replace("\r\n", "\n").split("\n")]
+    out: List[str] = []
+    idx = 0
+    while idx < len(lines):
+        line = lines[idx]
+        end = idx + 1
+        if _PROGRESS.search(line):
+            while end < len(lines) and _PROGRESS.search(lines[end]):
+                end += 1
+            if end - idx > 1:
+                out.append(f"[... {end - idx - 1} progress lines collapsed ...]")
+            out.append(lines[end - 1])
+        else:
+            while end < len(lines) and lines[end] == line:
+                end += 1
+            out.append(line if end - idx == 1 else f"{line} [repeated {end - idx}x]")
+        idx = end
+    return out
+
+
+def exception_spans(lines: Sequence[str]) -> List[Tuple[int, int]]:
+    """Half-open line ranges of tracebacks, each ending with its ``SomeError: message`` line."""
+    spans: List[Tuple[int, int]] = []
+    idx = 0
+    while idx < len(lines):
+        if _EXCEPTION_START.match(lines[idx]):
+            end = idx + 1
+            while end < len(lines) and (lines[end].startswith((" ", "\t")) or not lines[end].strip()):
+                end += 1
+            while end < len(lines) and _EXCEPTION_LINE.match(lines[end]):
+                end += 1
+            spans.append((idx, max(end, idx + 1)))
+            idx = end
+        elif _EXCEPTION_LINE.match(lines[idx]):
+            spans.append((idx, idx + 1))
+            idx += 1
+        else:
+            idx += 1
+    return spans
+
+
+def compact_log(text: str, max_tokens: int, tokens: Optional[TokenCache] = None) -> str:
+    """Fit a log into ``max_tokens``: dedupe and collapse it, then keep exception blocks, the tail and the head.
+
+    Exception blocks win over everything else; if they alone overflow, the latest lines of the latest blocks
+    are kept, since the final ``Error:`` line is what explains a failure.
+    """
+    tokens = tokens or TokenCache()
+    lines = _dedupe(normalize_lines(text))
+    if tokens.count("\n".join(lines)) <= max_tokens:
+        return "\n".join(lines)
+    costs = [tokens.count_line(line + "\n") for line in lines]
+    keep = [False] * len(lines)
+    budget = max_tokens - min(GAP_RESERVE, max_tokens // 4)
+    protected = [idx for start, end in exception_spans(lines) for idx in range(start, end)]
+    for idx in reversed(protected):
+        if costs[idx] > budget:
+            break
+        keep[idx] = True
+        budget -= costs[idx]
+    head_budget = int(budget * HEAD_SHARE)
+    budget -= _take(range(len(lines) - 1, -1, -1), keep, costs, budget - head_budget)
+    _take(range(len(lines)), keep, costs, budget)
+    # Head and tail lines go first, from the middle of the log outwards; then exception blocks, oldest first.
+    protected_set = set(protected)
+    context = _middle_out([idx for idx in range(len(lines)) if idx not in protected_set], len(lines))
+    return _fit_gaps(lines, keep, context + sorted(protected_set), max_tokens, tokens)
+
+
+def truncate_logs(logs: Iterable[str], max_tokens: int = 2000, tokens: Optional[TokenCache] = None) -> List[str]:
+    """Compact log entries into a shared budget, giving the latest entries first claim on it."""
+    tokens = tokens or TokenCache()
+    entries = list(logs)
+    kept: List[str] = []
+    remaining = max_tokens
+    for entry in reversed(entries):
+        if remaining <= 0:
+            break
+        compacted = compact_log(entry, remaining, tokens)
+        remaining -= tokens.count(compacted)
+        kept.append(compacted)
+    return kept[::-1]
+
+
+def truncate_text(text: str, max_tokens: int, tokens: Optional[TokenCache] = None, keep_tail: bool = False) -> str:
+    """Keep whole lines from the start (or from both ends with ``keep_tail``) within ``max_tokens``."""
+    tokens = tokens or TokenCache()
+    if tokens.count(text) <= max_tokens:
+        return text
+    lines = text.split("\n")
+    costs = [tokens.count_line(line + "\n") for line in lines]
+    keep = [False] * len(lines)
+    budget = max_tokens - min(GAP_RESERVE, max_tokens // 4)
+    if keep_tail:
+        budget -= _take(range(len(lines) - 1, -1, -1), keep, costs, budget // 2)
+    _take(range(len(lines)), keep, costs, budget)
+    return _fit_gaps(lines, keep, _middle_out(range(len(lines)), len(lines)), max_tokens, tokens)
+
+
+class PromptBudget:
+    """Split ``max_tokens`` between prompt sections; what one section leaves unused goes to the others."""
+
+    def __init__(
+        self,
+        max_tokens: int = 6000,
+        shares: Optional[Dict[str, float]] = None,
+        tokens: Optional[TokenCache] = None,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.shares = dict(shares or DEFAULT_SHARES)
+        self.tokens = tokens or TokenCache()
+
+    def allocate(self, sections: Dict[str, str]) -> Dict[str, int]:
+        need = {name: self.tokens.count(text) for name, text in sections.items()}
+        weights = {name: self.shares.get(name, OTHER_SHARE) for name in sections}
+        allocation: Dict[str, int] = {}
+        remaining = self.max_tokens
+        # Sections that fit in their share are settled first; the rest split what is left by share.
+        pending = dict(need)
+        while pending:
+            total = sum(weights[name] for name in pending)
+            fits = {name: size for name, size in pending.items() if size <= remaining * weights[name] / total}
+            if not fits:
+                for name in pending:
+                    allocation[name] = int(remaining * weights[name] / total)
                 break
-            collected.append(entry[:remaining])
+            for name, size in fits.items():
+                allocation[name] = size
+                remaining -= size
+                del pending[name]
+        return allocation
+
+    def fit(self, sections: Dict[str, str]) -> Dict[str, str]:
+        allocation = self.allocate(sections)
+        fitted: Dict[str, str] = {}
+        for name, text in sections.items():
+            limit = allocation[name]
+            if name == "logs":
+                fitted[name] = compact_log(text, limit, self.tokens)
+            else:
+                fitted[name] = truncate_text(text, limit, self.tokens, keep_tail=name == "code")
+        return fitted
+
+
+def _dedupe(lines: List[str]) -> List[str]:
+    # Repeats of a line seen earlier (a warning raised every fold) are dropped; tracebacks are kept verbatim.
+    protected = {idx for start, end in exception_spans(lines) for idx in range(start, end)}
+    counts: Dict[str, int] = {}
+    for idx, line in enumerate(lines):
+        if line.strip() and idx not in protected:
+            counts[line] = counts.get(line, 0) + 1
+    seen = set()
+    out: List[str] = []
+    for idx, line in enumerate(lines):
+        if idx in protected or not line.strip() or counts[line] == 1:
+            out.append(line)
+        elif line not in seen:
+            seen.add(line)
+            out.append(f"{line} [seen {counts[line]}x]")
+    return out
+
+
+def _take(order: Iterable[int], keep: List[bool], costs: List[int], budget: int) -> int:
+    used = 0
+    for idx in order:
+        if keep[idx]:
+            continue
+        if used + costs[idx] > budget:
             break
-        collected.append(entry)
-        total += len(entry)
-    return collected
+        keep[idx] = True
+        used += costs[idx]
+    return used
+
+
+def _middle_out(indices: Iterable[int], count: int) -> List[int]:
+    return sorted(indices, key=lambda idx: abs(2 * idx - count))
+
+
+def _fit_gaps(
+    lines: Sequence[str], keep: List[bool], drop_order: Sequence[int], max_tokens: int, tokens: TokenCache
+) -> str:
+    """Join the kept lines with gap markers, dropping lines in ``drop_order`` until the result fits.
+
+    Lines are chosen before the markers between them are known, and many small gaps can outgrow GAP_RESERVE.
+    """
+    order = iter(drop_order)
+    while True:
+        text = "\n".join(_with_gaps(lines, keep))
+        if tokens.count(text) <= max_tokens:
+            return text
+        idx = next((idx for idx in order if keep[idx]), None)
+        if idx is None:
+            return ""
+        keep[idx] = False
+
+
+def _with_gaps(lines: Sequence[str], keep: Sequence[bool]) -> List[str]:
+    out: List[str] = []
+    skipped = 0
+    for line, kept in zip(lines, keep):
+        if kept:
+            if skipped:
+                out.append(f"[... {skipped} lines omitted ...]")
+                skipped = 0
+            out.append(line)
+        else:
+            skipped += 1
+    if skipped:
+        out.append(f"[... {skipped} lines omitted ...]")
+    return out
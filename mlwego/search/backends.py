@@ -0,0 +1,59 @@
+"""Pick the model backend train.py fits from the size and shape of the training table."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from mlwego.workspace.profiler import TableProfile
+
+BACKENDS = ["random_forest", "hist_gradient_boosting", "sgd"]
+# Histogram boosting bins every feature once, so it stays fast where exact-split forests take hours.
+LARGE_ROWS = 100_000
+# Encoded columns beyond this make forests slow even on small tables.
+WIDE_FEATURES = 10_000
+# rows * features beyond this is too much even for histogram boosting. A linear model still needs the matrix in
+# memory, but fits it in a few passes at a fraction of the CPU time.
+MAX_TREE_CELLS = 2_000_000_000
+# Mirrors ENCODING_DEFAULTS in train.py: one-hot up to ONE_HOT_MAX distinct values, a single target-encoded
+# column below HASH_MIN, HASH_FEATURES hashed columns above, and nothing for near-unique identifier columns.
+ONE_HOT_MAX = 16
+HASH_MIN = 1000
+HASH_FEATURES = 32
+NEAR_UNIQUE = 0.9
+DEFAULT_PARAMS: Dict[str, Dict[str, Any]] = {
+    "random_forest": {"n_estimators": 200},
+    "hist_gradient_boosting": {"max_iter": 200, "learning_rate": 0.1},
+    "sgd": {"alpha": 0.0001},
+}
+
+
+def encoded_width(table: TableProfile, target: str) -> int:
+    """Columns of the matrix train.py builds from this table."""
+    width = 0
+    for column in table.columns:
+        if column.name == target:
+            continue
+        if column.kind == "numeric":
+            width += 1
+        elif column.cardinality > NEAR_UNIQUE * table.rows:
+            continue
+        elif column.cardinality <= ONE_HOT_MAX:
+            width += column.cardinality
+        else:
+            width += 1 if column.cardinality < HASH_MIN else HASH_FEATURES
+    return width
+
+
+def choose_backend(table: TableProfile, target: str) -> str:
+    features = len(table.columns) - 1
+    if table.rows * features > MAX_TREE_CELLS:
+        return "sgd"
+    if table.rows >= LARGE_ROWS or encoded_width(table, target) > WIDE_FEATURES:
+        return "hist_gradient_boosting"
+    return "random_forest"
+
+
+def backend_config(table: TableProfile, target: str, seed: int = 42) -> Dict[str, Any]:
+    """The ``model`` and ``model_params`` entries of config.json for this table."""
+    name = choose_backend(table, target)
+    return {"model": name, "model_params": {**DEFAULT_PARAMS[name], "random_state": seed}}
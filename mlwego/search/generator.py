@@ -3,23 +3,50 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
+
+import numpy as np
+
+from mlwego.search.space import DEFAULT_ESTIMATOR, search_space
 
 
 @dataclass
 class CandidateEdit:
     description: str
     updates: dict
+    parent_id: Optional[str] = None
+
 
+BASELINE_EDITS = {
+    "random_forest": [
+        ("Increase number of trees for stability", {"n_estimators": 400, "random_state": 42}),
+        ("Reduce tree depth to prevent overfitting", {"n_estimators": 200, "max_depth": 8, "random_state": 42}),
+    ],
+    "hist_gradient_boosting": [
+        ("More boosting rounds at a lower learning rate", {"max_iter": 400, "learning_rate": 0.05, "random_state": 42}),
+        ("Smaller trees with larger leaves to prevent overfitting", {"max_leaf_nodes": 15, "min_samples_leaf": 40, "random_state": 42}),
+    ],
+    "sgd": [
+        ("Weaker regularization", {"alpha": 0.00001, "random_state": 42}),
+        ("Stronger regularization", {"alpha": 0.001, "random_state": 42}),
+    ],
+}
 
-def baseline_candidates() -> List[CandidateEdit]:
+
+def baseline_candidates(model: str = DEFAULT_ESTIMATOR) -> List[CandidateEdit]:
+    return [
+        CandidateEdit(description=description, updates={"model_params": dict(params)})
+        for description, params in BASELINE_EDITS[model]
+    ]
+
+
+def random_candidates(count: int, seed: int = 42, model: str = DEFAULT_ESTIMATOR) -> List[CandidateEdit]:
+    rng = np.random.default_rng(seed)
+    space = search_space({"model": model, "seed": seed})
     return [
         CandidateEdit(
-            description="Increase number of trees for stability",
-            updates={"model_params": {"n_estimators": 400, "random_state": 42}},
-        ),
-        CandidateEdit(
-            description="Reduce tree depth to prevent overfitting",
-            updates={"model_params": {"n_estimators": 200, "max_depth": 8, "random_state": 42}},
-        ),
+            description=f"{model} hyperparameter sample",
+            updates={"model_params": {**space.fixed, **space.sample(rng)}},
+        )
+        for _ in range(count)
     ]
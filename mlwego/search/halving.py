@@ -0,0 +1,30 @@
+"""Successive-halving schedule over fidelity levels."""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Sequence
+
+from mlwego.search.policy import SearchPolicy
+
+
+def fidelity_levels(policy: SearchPolicy) -> List[float]:
+    return [float(policy.eta) ** -rung for rung in reversed(range(max(policy.rungs, 1)))]
+
+
+def fidelity_updates(fidelity: float, n_splits: int = 5) -> Dict[str, Dict[str, float]]:
+    if fidelity >= 1.0:
+        return {}
+    return {
+        "fidelity": {
+            "subsample": round(fidelity, 4),
+            "n_splits": max(2, min(n_splits, int(math.ceil(n_splits * fidelity)))),
+            "estimator_scale": round(fidelity, 4),
+        }
+    }
+
+
+def promote(scores: Sequence[float], eta: int) -> List[int]:
+    keep = max(1, int(math.ceil(len(scores) / eta)))
+    ranked = sorted(range(len(scores)), key=lambda idx: (-scores[idx], idx))
+    return sorted(ranked[:keep])
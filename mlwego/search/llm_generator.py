@@ -0,0 +1,188 @@
+"""LLM-proposed candidate edits, built from the solution tree so far."""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence
+
+from mlwego.llm.ollama_client import OllamaResponse
+from mlwego.llm.token_budget import PromptBudget, compact_log
+from mlwego.search.generator import CandidateEdit
+from mlwego.search.solution_tree import SolutionNode
+from mlwego.workspace.profiler import DatasetProfile
+
+TEMPLATES = Path(__file__).resolve().parent.parent / "llm" / "prompt_templates"
+# Config sections the LLM may change; paths, seeds and fold counts stay fixed so scores remain comparable.
+EDITABLE_KEYS = ["model_params", "preprocessing"]
+RECENT_NODES = 8
+PROPOSE_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "propose_edit",
+        "description": "Propose one change to config.json, to be trained and scored by mlwego.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "description": {"type": "string", "description": "What the change does and its expected impact."},
+                "updates": {"type": "object", "description": f"New values for top-level keys among {EDITABLE_KEYS}."},
+            },
+            "required": ["description", "updates"],
+        },
+    },
+}
+_JSON_BLOCK = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+class ChatModel(Protocol):
+    def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.0,
+    ) -> OllamaResponse: ...
+
+
+def profile_summary(profile: DatasetProfile, table: str = "train") -> str:
+    lines = []
+    train = profile.tables.get(table)
+    if train is None:
+        return ""
+    lines.append(f"{train.name}: {train.rows} rows, {len(train.columns)} columns")
+    for column in train.columns:
+        line = f"- {column.name}: {column.dtype}, {column.nulls} nulls, ~{column.cardinality} distinct"
+        if column.min is not None:
+            line += f", range [{column.min:g}, {column.max:g}]"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class LLMGenerator:
+    def __init__(
+        self,
+        client: ChatModel,
+        model: str,
+        task_description: str,
+        schema_summary: str = "",
+        logs_dir: Optional[Path] = None,
+        budget: Optional[PromptBudget] = None,
+        temperature: float = 0.0,
+    ) -> None:
+        self.client = client
+        self.model = model
+        self.task_description = task_description
+        self.schema_summary = schema_summary
+        self.logs_dir = logs_dir
+        self.budget = budget or PromptBudget()
+        self.temperature = temperature
+
+    def propose(
+        self,
+        nodes: List[SolutionNode],
+        parent: SolutionNode,
+        parent_config: str,
+        count: int,
+        pending: Sequence[CandidateEdit] = (),
+    ) -> List[CandidateEdit]:
+        """Ask for up to ``count`` edits of ``parent``; ``nodes`` are the tree's nodes, oldest first.
+
+        ``pending`` are edits queued or training, which the model is told not to propose again.
+        """
+        messages = self.messages(nodes, parent, parent_config, count, pending)
+        response = self.client.chat(self.model, messages, tools=[PROPOSE_TOOL], temperature=self.temperature)
+        config = json.loads(parent_config)
+        edits = parse_edits(response)[:count]
+        for edit in edits:
+            edit.parent_id = parent.node_id
+            # A partial dict (say one model parameter) is merged into the parent's, since edits replace top-level keys.
+            edit.updates = {
+                key: {**config[key], **value} if isinstance(value, dict) and isinstance(config.get(key), dict) else value
+                for key, value in edit.updates.items()
+            }
+        return edits
+
+    def messages(
+        self,
+        nodes: List[SolutionNode],
+        parent: SolutionNode,
+        parent_config: str,
+        count: int,
+        pending: Sequence[CandidateEdit] = (),
+    ) -> List[Dict[str, Any]]:
+        sections = self.budget.fit(
+            {
+                "task": self.task_description,
+                "profile": self.schema_summary,
+                "code": parent_config,
+                "logs": self._run_log(nodes, pending),
+            }
+        )
+        user = (TEMPLATES / "role.txt").read_text(encoding="utf-8").format(
+            task_description=sections["task"],
+            schema_summary=sections["profile"],
+            run_summaries=sections["logs"],
+        )
+        user += (
+            f"\nconfig.json of node {parent.node_id[:8]} (score {_score(parent)}), the node to improve:\n"
+            f"{sections['code']}\n"
+            f"Call propose_edit up to {count} times with distinct changes to {', '.join(EDITABLE_KEYS)}."
+        )
+        system = (TEMPLATES / "system.txt").read_text(encoding="utf-8").strip()
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+    def _run_log(self, nodes: List[SolutionNode], pending: Sequence[CandidateEdit] = ()) -> str:
+        lines = [
+            f"{node.node_id[:8]} parent={(node.parent_id or '-')[:8]} status={node.status} "
+            f"score={_score(node)}±{node.score_std:.2g} fidelity={node.fidelity:g} diff={node.diff}"
+            for node in nodes[-RECENT_NODES:]
+        ]
+        # Edits still training have no node yet; listing them keeps the model from proposing them again.
+        lines += [
+            f"training parent={(edit.parent_id or '-')[:8]} updates={json.dumps(edit.updates, sort_keys=True)}"
+            for edit in pending
+        ]
+        failed = next((node for node in reversed(nodes) if node.status in ("error", "oom")), None)
+        if failed is not None and self.logs_dir is not None and (self.logs_dir / f"{failed.node_id}.log").exists():
+            log = (self.logs_dir / f"{failed.node_id}.log").read_text(encoding="utf-8", errors="replace")
+            lines.append(f"Latest failure ({failed.node_id[:8]}):")
+            lines.append(compact_log(log, self.budget.max_tokens // 8, self.budget.tokens))
+        return "\n".join(lines)
+
+
+def _score(node: SolutionNode) -> str:
+    return "none" if node.score is None else f"{node.score:.5g}"
+
+
+def parse_edits(response: OllamaResponse) -> List[CandidateEdit]:
+    """Edits from ``propose_edit`` tool calls, or from JSON in the reply when the model answered in text."""
+    payloads: List[Any] = []
+    for call in response.message.get("tool_calls", []):
+        function = call.get("function", {})
+        if function.get("name") == "propose_edit":
+            arguments = function.get("arguments", {})
+            if isinstance(arguments, str):
+                try:
+                    arguments = json.loads(arguments)
+                except ValueError:
+                    continue
+            payloads.append(arguments)
+    if not payloads:
+        content = response.message.get("content", "")
+        for block in _JSON_BLOCK.findall(content) or [content]:
+            try:
+                data = json.loads(block)
+            except ValueError:
+                continue
+            payloads.extend(data if isinstance(data, list) else [data])
+    return list(_valid_edits(payloads))
+
+
+def _valid_edits(payloads: Iterable[Any]) -> Iterable[CandidateEdit]:
+    for payload in payloads:
+        if not isinstance(payload, dict) or not isinstance(payload.get("updates"), dict):
+            continue
+        updates = {key: value for key, value in payload["updates"].items() if key in EDITABLE_KEYS}
+        if updates:
+            yield CandidateEdit(description=str(payload.get("description", "")), updates=updates)
@@ -8,3 +8,8 @@ class SearchPolicy:
     budget: int = 10
     branch_factor: int = 2
     early_stop_rounds: int = 3
+    mode: str = "greedy"
+    eta: int = 3
+    rungs: int = 3
+    early_abort: bool = True
+    queue_size: int = 2
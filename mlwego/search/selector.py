@@ -2,11 +2,35 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional
 
-from mlwego.search.solution_tree import SolutionTree
+from mlwego.search.solution_tree import SolutionNode, SolutionTree
 
 
 def select_best(tree: SolutionTree) -> Optional[str]:
     best = tree.best_node()
     return best.node_id if best else None
+
+
+def select_top_k(tree: SolutionTree, k: int) -> List[str]:
+    return [node.node_id for node in tree.top_k(k)]
+
+
+def select_frontier(tree: SolutionTree, k: int = 1) -> List[str]:
+    """Nodes to expand next, ranked by ``score + tree.ucb_c * score_std`` so uncertain nodes get explored."""
+    return [node.node_id for node in tree.frontier(k)]
+
+
+def pareto_front(tree: SolutionTree) -> List[SolutionNode]:
+    """Nodes for which no other node scores at least as well for less CPU time, best score first."""
+    nodes = sorted(
+        (n for n in tree.nodes.values() if n.status == "ok"),
+        key=lambda n: (-n.fidelity, -n.score, n.cpu_time),
+    )
+    front: List[SolutionNode] = []
+    for node in nodes:
+        if node.fidelity != nodes[0].fidelity:
+            break
+        if not front or node.cpu_time < front[-1].cpu_time:
+            front.append(node)
+    return front
@@ -2,30 +2,138 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import List, Optional
+import bisect
+import itertools
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
 @dataclass
 class SolutionNode:
     node_id: str
     parent_id: Optional[str]
-    score: float
+    score: Optional[float]
     score_std: float
     diff: str
+    fidelity: float = 1.0
+    fold_scores: List[float] = field(default_factory=list)
+    status: str = "ok"
+    runtime: float = 0.0
+    cpu_time: float = 0.0
+    peak_rss_mb: float = 0.0
+    metric: str = ""
+    metrics: Dict[str, float] = field(default_factory=dict)
+    ci_low: Optional[float] = None
+    ci_high: Optional[float] = None
+    p_vs_best: Optional[float] = None
     children: List[str] = field(default_factory=list)
 
 
+class RankIndex:
+    """Sorted keys: O(log n) lookup on insert/remove, O(k) reads of the top k."""
+
+    def __init__(self) -> None:
+        self._keys: List[Tuple[Any, ...]] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Tuple[Any, ...]) -> None:
+        bisect.insort(self._keys, key)
+
+    def remove(self, key: Tuple[Any, ...]) -> None:
+        idx = bisect.bisect_left(self._keys, key)
+        if idx < len(self._keys) and self._keys[idx] == key:
+            del self._keys[idx]
+
+    def top(self, k: int) -> List[str]:
+        return [key[-1] for key in self._keys[:k]]
+
+
 @dataclass
 class SolutionTree:
     nodes: dict[str, SolutionNode] = field(default_factory=dict)
+    journal: Optional[Path] = None
+    ucb_c: float = 1.0
+    _by_score: RankIndex = field(default_factory=RankIndex, repr=False)
+    _by_ucb: RankIndex = field(default_factory=RankIndex, repr=False)
+    _keys: dict[str, Tuple[Tuple[Any, ...], Tuple[Any, ...]]] = field(default_factory=dict, repr=False)
+    _sequence: Iterator[int] = field(default_factory=itertools.count, repr=False)
+
+    @classmethod
+    def load(cls, journal: Path, ucb_c: float = 1.0) -> "SolutionTree":
+        """Replay a checkpoint journal, dropping a torn final line left by a crash."""
+        tree = cls(ucb_c=ucb_c)
+        if journal.exists():
+            valid = 0
+            with journal.open("rb") as handle:
+                for line in handle:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        break
+                    tree.add_node(SolutionNode(**data))
+                    valid += len(line)
+            os.truncate(journal, valid)
+        tree.journal = journal
+        return tree
 
     def add_node(self, node: SolutionNode) -> None:
+        previous = self.nodes.get(node.node_id)
+        if previous is not None:
+            # Re-evaluating the same source updates the node in place; it keeps its place in the tree.
+            node.parent_id = previous.parent_id
+            node.children = previous.children
+            self._unindex(node.node_id)
+        elif node.parent_id == node.node_id:
+            raise ValueError(f"Node {node.node_id} cannot be its own parent")
         self.nodes[node.node_id] = node
-        if node.parent_id and node.parent_id in self.nodes:
+        if previous is None and node.parent_id and node.parent_id in self.nodes:
             self.nodes[node.parent_id].children.append(node.node_id)
+        if node.status == "ok":
+            seq = next(self._sequence)
+            keys = (
+                (-node.fidelity, -node.score, seq, node.node_id),
+                (-node.fidelity, -(node.score + self.ucb_c * node.score_std), seq, node.node_id),
+            )
+            self._by_score.add(keys[0])
+            self._by_ucb.add(keys[1])
+            self._keys[node.node_id] = keys
+        if self.journal is not None:
+            self._checkpoint(node)
+
+    def root(self) -> Optional[SolutionNode]:
+        return next((n for n in self.nodes.values() if n.parent_id is None), None)
 
     def best_node(self) -> Optional[SolutionNode]:
-        if not self.nodes:
-            return None
-        return max(self.nodes.values(), key=lambda n: n.score)
+        top = self.top_k(1)
+        return top[0] if top else None
+
+    def top_k(self, k: int) -> List[SolutionNode]:
+        """The ``k`` best ``ok`` nodes, highest fidelity first and then by score."""
+        return [self.nodes[node_id] for node_id in self._by_score.top(k)]
+
+    def frontier(self, k: int) -> List[SolutionNode]:
+        """The ``k`` most promising nodes to expand by upper confidence bound ``score + ucb_c * score_std``."""
+        return [self.nodes[node_id] for node_id in self._by_ucb.top(k)]
+
+    def _unindex(self, node_id: str) -> None:
+        keys = self._keys.pop(node_id, None)
+        if keys is not None:
+            self._by_score.remove(keys[0])
+            self._by_ucb.remove(keys[1])
+
+    def _checkpoint(self, node: SolutionNode) -> None:
+        assert self.journal is not None
+        record = asdict(node)
+        record.pop("children")
+        self.journal.parent.mkdir(parents=True, exist_ok=True)
+        with self.journal.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
@@ -0,0 +1,150 @@
+"""Declarative hyperparameter search spaces for the estimators train.py can build."""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_ESTIMATOR = "random_forest"
+
+
+@dataclass
+class IntParam:
+    low: int
+    high: int
+    default: int
+    log: bool = False
+
+    def encode(self, value: Any) -> float:
+        return _to_unit(float(value), self.low, self.high, self.log)
+
+    def decode(self, unit: float) -> int:
+        return int(np.clip(round(_from_unit(unit, self.low, self.high, self.log)), self.low, self.high))
+
+
+@dataclass
+class FloatParam:
+    low: float
+    high: float
+    default: float
+    log: bool = False
+
+    def encode(self, value: Any) -> float:
+        return _to_unit(float(value), self.low, self.high, self.log)
+
+    def decode(self, unit: float) -> float:
+        return float(np.clip(_from_unit(unit, self.low, self.high, self.log), self.low, self.high))
+
+
+@dataclass
+class Choice:
+    options: List[Any]
+    default: Any
+
+    def index(self, value: Any) -> Optional[int]:
+        return next((idx for idx, option in enumerate(self.options) if option == value), None)
+
+
+Param = Any
+
+
+@dataclass
+class SearchSpace:
+    """``params`` are searched; ``fixed`` values are added to every suggestion."""
+
+    params: Dict[str, Param]
+    fixed: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.params)
+
+    def sample(self, rng: np.random.Generator) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        for name, param in self.params.items():
+            if isinstance(param, Choice):
+                values[name] = param.options[int(rng.integers(len(param.options)))]
+            else:
+                values[name] = param.decode(float(rng.random()))
+        return values
+
+    def encode(self, values: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Unit-interval coordinates (option indices for choices), or None when a choice is off the grid."""
+        coords = []
+        for name, param in self.params.items():
+            value = values.get(name, param.default)
+            if isinstance(param, Choice):
+                idx = param.index(value)
+                if idx is None:
+                    return None
+                coords.append(float(idx))
+            else:
+                try:
+                    coords.append(float(np.clip(param.encode(value), 0.0, 1.0)))
+                except (TypeError, ValueError):
+                    return None
+        return np.array(coords)
+
+    def decode(self, coords: np.ndarray) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        for (name, param), coord in zip(self.params.items(), coords):
+            values[name] = param.options[int(coord)] if isinstance(param, Choice) else param.decode(float(coord))
+        return values
+
+    def key(self, values: Dict[str, Any]) -> str:
+        return json.dumps({name: values.get(name, param.default) for name, param in self.params.items()}, sort_keys=True)
+
+
+SEARCH_SPACES: Dict[str, SearchSpace] = {
+    "random_forest": SearchSpace(
+        {
+            "n_estimators": IntParam(50, 1000, default=100, log=True),
+            "max_depth": Choice([None, 4, 6, 8, 12, 16, 24], default=None),
+            "min_samples_leaf": IntParam(1, 16, default=1, log=True),
+            "max_features": Choice(["sqrt", "log2", 0.5, None], default="sqrt"),
+        }
+    ),
+    "hist_gradient_boosting": SearchSpace(
+        {
+            "learning_rate": FloatParam(0.01, 0.3, default=0.1, log=True),
+            "max_iter": IntParam(50, 1000, default=100, log=True),
+            "max_leaf_nodes": IntParam(8, 256, default=31, log=True),
+            "min_samples_leaf": IntParam(5, 200, default=20, log=True),
+            "l2_regularization": FloatParam(1e-6, 10.0, default=1e-6, log=True),
+        }
+    ),
+    "sgd": SearchSpace(
+        {
+            "alpha": FloatParam(1e-6, 1e-2, default=1e-4, log=True),
+            "penalty": Choice(["l2", "l1", "elasticnet"], default="l2"),
+            "l1_ratio": FloatParam(0.0, 1.0, default=0.15),
+        }
+    ),
+}
+
+
+def search_space(config: Dict[str, Any]) -> SearchSpace:
+    """The search space of the estimator ``config`` trains, seeded like ``config``."""
+    name = config.get("model", DEFAULT_ESTIMATOR)
+    if name not in SEARCH_SPACES:
+        raise ValueError(f"No search space for estimator {name!r}; known: {sorted(SEARCH_SPACES)}")
+    space = SEARCH_SPACES[name]
+    # A suggestion replaces model_params whole, so it must carry the run's own random_state.
+    seed = config.get("model_params", {}).get("random_state", config.get("seed", 42))
+    return replace(space, fixed={**space.fixed, "random_state": seed})
+
+
+def _to_unit(value: float, low: float, high: float, log: bool) -> float:
+    if log:
+        return (math.log(value) - math.log(low)) / (math.log(high) - math.log(low))
+    return (value - low) / (high - low)
+
+
+def _from_unit(unit: float, low: float, high: float, log: bool) -> float:
+    if log:
+        return math.exp(math.log(low) + unit * (math.log(high) - math.log(low)))
+    return low + unit * (high - low)
@@ -0,0 +1,116 @@
+"""Tree-structured Parzen estimator over a SearchSpace, in numpy."""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from mlwego.search.space import Choice, SearchSpace
+
+MIN_BANDWIDTH = 0.03
+PRIOR_BANDWIDTH = 0.25
+# Draws per suggest() before giving up on finding parameters that were never suggested; the second half are random.
+SUGGEST_ATTEMPTS = 16
+
+
+class TPE:
+    """Suggests parameters whose density under the best ``gamma`` share of scores beats the rest.
+
+    Scores are maximised; an observation with score None (a failed run) counts among the bad ones. Suggestions
+    not yet observed are treated as bad too (a pessimistic "constant liar"), so parallel workers get spread out.
+    Parameters already observed or pending are not suggested again while the space has anything else to offer.
+    """
+
+    def __init__(
+        self,
+        space: SearchSpace,
+        gamma: float = 0.25,
+        n_startup: int = 5,
+        n_candidates: int = 24,
+        prior_weight: float = 1.0,
+        seed: int = 42,
+    ) -> None:
+        self.space = space
+        self.gamma = gamma
+        self.n_startup = n_startup
+        self.n_candidates = n_candidates
+        self.prior_weight = prior_weight
+        self.rng = np.random.default_rng(seed)
+        self.observations: List[tuple] = []
+        self.pending: Dict[str, np.ndarray] = {}
+        self.observed: Set[str] = set()
+
+    def observe(self, params: Dict[str, Any], score: Optional[float]) -> bool:
+        """Record a result; False when ``params`` fall outside the space and were ignored."""
+        key = self.space.key(params)
+        self.pending.pop(key, None)
+        self.observed.add(key)
+        coords = self.space.encode(params)
+        if coords is None:
+            return False
+        if score is not None and not math.isfinite(score):
+            score = None
+        self.observations.append((coords, score))
+        return True
+
+    def suggest(self) -> Dict[str, Any]:
+        """New parameters, or a repeat (not tracked as pending) when the space seems exhausted."""
+        scored = [(score, coords) for coords, score in self.observations if score is not None]
+        for attempt in range(SUGGEST_ATTEMPTS):
+            if len(scored) < self.n_startup or attempt >= SUGGEST_ATTEMPTS // 2:
+                params = self.space.sample(self.rng)
+            else:
+                params = self.space.decode(self._best_candidate(scored))
+            key = self.space.key(params)
+            if key not in self.pending and key not in self.observed:
+                self.pending[key] = self.space.encode(params)
+                break
+        return {**self.space.fixed, **params}
+
+    def _best_candidate(self, scored: List[tuple]) -> np.ndarray:
+        scored.sort(key=lambda item: item[0], reverse=True)
+        n_good = max(1, math.ceil(self.gamma * len(scored)))
+        good = np.array([coords for _, coords in scored[:n_good]])
+        failed = [coords for coords, score in self.observations if score is None]
+        bad_rows = [coords for _, coords in scored[n_good:]] + failed + list(self.pending.values())
+        bad = np.array(bad_rows) if bad_rows else np.empty((0, len(self.space.names)))
+        candidates = np.column_stack(
+            [self._sample_dim(param, good[:, dim]) for dim, param in enumerate(self.space.params.values())]
+        )
+        log_ratio = np.zeros(len(candidates))
+        for dim, param in enumerate(self.space.params.values()):
+            log_ratio += np.log(self._density(param, good[:, dim], candidates[:, dim]))
+            log_ratio -= np.log(self._density(param, bad[:, dim], candidates[:, dim]))
+        return candidates[int(np.argmax(log_ratio))]
+
+    def _sample_dim(self, param: Any, points: np.ndarray) -> np.ndarray:
+        if isinstance(param, Choice):
+            weights = self._choice_weights(param, points)
+            return self.rng.choice(len(param.options), size=self.n_candidates, p=weights).astype(float)
+        # Each draw comes from the uniform prior or from a Gaussian around one of the points.
+        from_prior = self.rng.random(self.n_candidates) < self.prior_weight / (self.prior_weight + len(points))
+        centers = points[self.rng.integers(len(points), size=self.n_candidates)]
+        draws = np.clip(self.rng.normal(centers, _bandwidth(points)), 0.0, 1.0)
+        return np.where(from_prior, self.rng.random(self.n_candidates), draws)
+
+    def _density(self, param: Any, points: np.ndarray, values: np.ndarray) -> np.ndarray:
+        if isinstance(param, Choice):
+            return self._choice_weights(param, points)[values.astype(int)]
+        if len(points) == 0:
+            return np.ones(len(values))
+        sigma = _bandwidth(points)
+        kernels = np.exp(-0.5 * ((values[:, None] - points[None, :]) / sigma) ** 2) / (sigma * math.sqrt(2 * math.pi))
+        return (self.prior_weight + kernels.sum(axis=1)) / (self.prior_weight + len(points))
+
+    def _choice_weights(self, param: Choice, points: np.ndarray) -> np.ndarray:
+        counts = np.bincount(points.astype(int), minlength=len(param.options)).astype(float)
+        weights = counts + self.prior_weight / len(param.options)
+        return weights / weights.sum()
+
+
+def _bandwidth(points: np.ndarray) -> float:
+    # Scott's rule, floored at 1 / (n + 1) of the range so a cluster of near-identical points keeps exploring.
+    spread = float(np.std(points)) if len(points) > 1 else PRIOR_BANDWIDTH
+    return max(MIN_BANDWIDTH, 1.0 / (len(points) + 1), spread * len(points) ** -0.2)
@@ -4,12 +4,23 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 from pathlib import Path
+from typing import Optional
 
 from mlwego.agent.controller import finalize_best, run_search
+from mlwego.evaluation.ensemble import PredictionMatrix, caruana_select, write_submission
 from mlwego.evaluation.evaluator import run_predict, validate_submission
+from mlwego.execution.resources import ResourceManager
+from mlwego.execution.sandbox import configure_warm_pool
+from mlwego.llm.ollama_client import OllamaClient
+from mlwego.llm.response_cache import ResponseCache, default_cache_path
+from mlwego.search.llm_generator import LLMGenerator, profile_summary
 from mlwego.search.policy import SearchPolicy
+from mlwego.search.solution_tree import SolutionTree
+from mlwego.workspace.profiler import load_profile
 from mlwego.workspace.project_init import init_workspace
+from mlwego.workspace.run_store import ORDER_COLUMNS, RunStore, default_db_path, run_id_for
 
 
 def cmd_init(args: argparse.Namespace) -> None:
@@ -19,53 +30,152 @@ def cmd_init(args: argparse.Namespace) -> None:
 
 def cmd_run(args: argparse.Namespace) -> None:
     run_dir = Path(args.out)
-    policy = SearchPolicy(budget=args.budget)
-    tree, summaries = run_search(run_dir, policy, timeout=args.timeout)
-    finalize_best(run_dir, tree)
-    (run_dir / "logs").mkdir(parents=True, exist_ok=True)
-    summary_path = run_dir / "logs" / "summary.json"
-    summary_path.write_text(json.dumps([s.__dict__ for s in summaries], indent=2), encoding="utf-8")
+    policy = SearchPolicy(
+        budget=args.budget,
+        mode=args.mode,
+        eta=args.eta,
+        rungs=args.rungs,
+        early_abort=not args.no_early_abort,
+        queue_size=args.queue_size,
+    )
+    generator = _llm_generator(args, run_dir) if args.mode == "llm" else None
+    if not args.cold_start:
+        configure_warm_pool(args.jobs)
+    with _open_store(args, run_dir) as store:
+        tree, _ = run_search(
+            run_dir,
+            policy,
+            timeout=args.timeout,
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            resources=None if args.no_limits else ResourceManager(memory_mb=args.memory_mb),
+            store=store,
+            resume=args.resume,
+            generator=generator,
+        )
+        finalize_best(run_dir, tree)
+
+
+def _llm_generator(args: argparse.Namespace, run_dir: Path) -> LLMGenerator:
+    client = OllamaClient(host=args.llm_host, cache=ResponseCache(default_cache_path(run_dir)))
+    task = json.loads((run_dir / "task.json").read_text(encoding="utf-8"))["task"]
+    profile = load_profile(run_dir / "data", run_dir / "cache" / "data")
+    return LLMGenerator(client, args.llm_model, task, profile_summary(profile), logs_dir=run_dir / "logs")
 
 
 def cmd_best(args: argparse.Namespace) -> None:
     run_dir = Path(args.out)
-    summary_path = run_dir / "logs" / "summary.json"
-    if not summary_path.exists():
-        raise SystemExit("summary.json not found")
-    summaries = json.loads(summary_path.read_text(encoding="utf-8"))
-    best = max(summaries, key=lambda item: item["score"])
-    print(json.dumps(best, indent=2))
+    with _open_store(args, run_dir) as store:
+        best = store.best(run_id_for(run_dir))
+    if best is None:
+        # Runs recorded before the run store existed only have summary.json, whose rows may lack fidelity.
+        summary_path = run_dir / "logs" / "summary.json"
+        summaries = json.loads(summary_path.read_text(encoding="utf-8")) if summary_path.exists() else []
+        scored = [item for item in summaries if item.get("score") is not None]
+        if not scored:
+            raise SystemExit("No scored nodes found for this run")
+        best = max(scored, key=lambda item: (item.get("fidelity", 1.0), item["score"]))
+    print(json.dumps({key: best.get(key) for key in ("node_id", "score", "metric", "fidelity")}, indent=2))
+
+
+def cmd_query(args: argparse.Namespace) -> None:
+    run_dir = Path(args.out) if args.out else None
+    with _open_store(args, run_dir) as store:
+        if args.sql:
+            rows = store.sql(args.sql)
+        else:
+            rows = store.query(
+                run_id=run_id_for(run_dir) if run_dir else None,
+                status=args.status,
+                metric=args.metric,
+                min_fidelity=args.min_fidelity,
+                order_by=args.order_by,
+                limit=args.limit,
+            )
+    print(json.dumps(rows, indent=2))
+
+
+def cmd_leaderboard(args: argparse.Namespace) -> None:
+    with _open_store(args, None) as store:
+        rows = store.leaderboard(task=args.task, limit=args.limit)
+    print(json.dumps(rows, indent=2))
+
+
+def cmd_ensemble(args: argparse.Namespace) -> None:
+    run_dir = Path(args.out)
+    tree = SolutionTree.load(run_dir / "logs" / "tree.jsonl")
+    node_ids = [node.node_id for node in tree.top_k(len(tree.nodes)) if node.fidelity >= 1.0]
+    dest = run_dir / "artifacts" / "ensemble"
+    try:
+        matrix = PredictionMatrix.build(run_dir, node_ids, dest)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    result = caruana_select(matrix, rounds=args.rounds)
+    weights = {node_id: float(w) for node_id, w in zip(matrix.node_ids, result.weights) if w > 0}
+    submission = write_submission(run_dir / "data", matrix.blend_test(result.weights), dest / "submission.csv")
+    report = {
+        "metric": matrix.metric,
+        "score": result.score,
+        "best_single": float(result.single_scores.max()),
+        "weights": weights,
+        "submission": str(submission),
+    }
+    (dest / "weights.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    from mlwego.ui.server import PredictionServer
+
+    run_dir = Path(args.out)
+    server = PredictionServer(
+        run_dir,
+        _open_store(args, run_dir),
+        host=args.host,
+        port=args.port,
+        socket_path=Path(args.socket) if args.socket else None,
+        max_batch_rows=args.max_batch_rows,
+        max_wait_ms=args.max_wait_ms,
+        reload_interval=args.reload_interval,
+    )
+    print(f"Serving node {server.handle.node_id} on {server.address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def _open_store(args: argparse.Namespace, run_dir: Optional[Path]) -> RunStore:
+    return RunStore(Path(args.db) if args.db else default_db_path(run_dir))
 
 
 def cmd_submit(args: argparse.Namespace) -> None:
     run_dir = Path(args.out)
-    run_predict(run_dir)
-    error = validate_submission(run_dir)
-    if error:
-        raise SystemExit(error)
-    print(str(run_dir / "artifacts" / "submission.csv"))
+    best = SolutionTree.load(run_dir / "logs" / "tree.jsonl").best_node()
+    if best is None:
+        raise SystemExit("No trained node to submit; run mlwego run first")
+    _predict_node(run_dir, best.node_id)
 
 
 def cmd_replay(args: argparse.Namespace) -> None:
     run_dir = Path(args.out)
-    node_dir = run_dir / "artifacts" / args.node / "src"
-    if not node_dir.exists():
+    if not (run_dir / "artifacts" / args.node / "src").exists():
         raise SystemExit("Snapshot not found")
-    src_dir = run_dir / "src"
-    backup_dir = run_dir / "src_backup"
-    if backup_dir.exists():
-        for item in backup_dir.iterdir():
-            if item.is_dir():
-                for sub in item.rglob("*"):
-                    if sub.is_file():
-                        sub.unlink()
-                item.rmdir()
-            else:
-                item.unlink()
-        backup_dir.rmdir()
-    src_dir.replace(backup_dir)
-    node_dir.replace(src_dir)
-    run_predict(run_dir)
+    _predict_node(run_dir, args.node)
+
+
+def _predict_node(run_dir: Path, node_id: str) -> None:
+    # Predicts from the node's snapshot and stored model; run_dir/src is left untouched.
+    try:
+        result = run_predict(run_dir, node_id=node_id)
+    except FileNotFoundError as exc:
+        raise SystemExit(str(exc))
+    if result.exit_code != 0:
+        raise SystemExit(f"predict.py failed with exit code {result.exit_code}:\n{result.stderr}")
+    error = validate_submission(run_dir)
+    if error:
+        raise SystemExit(error)
+    print(str(run_dir / "artifacts" / "submission.csv"))
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -81,12 +191,60 @@ def build_parser() -> argparse.ArgumentParser:
     run_parser.add_argument("--out", required=True)
     run_parser.add_argument("--budget", type=int, default=10)
     run_parser.add_argument("--timeout", type=int, default=1200)
+    run_parser.add_argument("--jobs", type=int, default=1)
+    run_parser.add_argument("--cold-start", action="store_true")
+    run_parser.add_argument("--no-cache", action="store_true")
+    run_parser.add_argument("--mode", choices=["greedy", "halving", "llm", "tpe"], default="greedy")
+    run_parser.add_argument("--eta", type=int, default=3)
+    run_parser.add_argument("--rungs", type=int, default=3)
+    run_parser.add_argument("--no-early-abort", action="store_true")
+    run_parser.add_argument("--memory-mb", type=int, default=None)
+    run_parser.add_argument("--no-limits", action="store_true")
+    run_parser.add_argument("--db")
+    run_parser.add_argument("--resume", action="store_true")
+    run_parser.add_argument("--llm-model", default=os.environ.get("OLLAMA_MODEL", "llama3.1"))
+    run_parser.add_argument("--llm-host")
+    run_parser.add_argument("--queue-size", type=int, default=2)
     run_parser.set_defaults(func=cmd_run)
 
     best_parser = sub.add_parser("best")
     best_parser.add_argument("--out", required=True)
+    best_parser.add_argument("--db")
     best_parser.set_defaults(func=cmd_best)
 
+    query_parser = sub.add_parser("query")
+    query_parser.add_argument("--out")
+    query_parser.add_argument("--db")
+    query_parser.add_argument("--status")
+    query_parser.add_argument("--metric")
+    query_parser.add_argument("--min-fidelity", type=float, default=0.0)
+    query_parser.add_argument("--order-by", choices=ORDER_COLUMNS, default="score")
+    query_parser.add_argument("--limit", type=int, default=20)
+    query_parser.add_argument("--sql")
+    query_parser.set_defaults(func=cmd_query)
+
+    leaderboard_parser = sub.add_parser("leaderboard")
+    leaderboard_parser.add_argument("--db")
+    leaderboard_parser.add_argument("--task")
+    leaderboard_parser.add_argument("--limit", type=int, default=20)
+    leaderboard_parser.set_defaults(func=cmd_leaderboard)
+
+    ensemble_parser = sub.add_parser("ensemble")
+    ensemble_parser.add_argument("--out", required=True)
+    ensemble_parser.add_argument("--rounds", type=int, default=50)
+    ensemble_parser.set_defaults(func=cmd_ensemble)
+
+    serve_parser = sub.add_parser("serve")
+    serve_parser.add_argument("--out", required=True)
+    serve_parser.add_argument("--db")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--socket")
+    serve_parser.add_argument("--max-batch-rows", type=int, default=1024)
+    serve_parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    serve_parser.add_argument("--reload-interval", type=float, default=5.0)
+    serve_parser.set_defaults(func=cmd_serve)
+
     submit_parser = sub.add_parser("submit")
     submit_parser.add_argument("--out", required=True)
     submit_parser.set_defaults(func=cmd_submit)
@@ -0,0 +1,292 @@
+"""Prediction server for the best node of a run, with micro-batching and hot-swapping."""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from mlwego.workspace.artifacts import node_model_path
+from mlwego.workspace.run_store import RunStore, run_id_for
+
+LATENCY_WINDOW = 10_000
+
+
+def load_feature_hook(src_dir: Path) -> Optional[Callable[[pd.DataFrame], pd.DataFrame]]:
+    path = src_dir / "features.py"
+    if not path.exists():
+        return None
+    spec = importlib.util.spec_from_file_location(f"mlwego_features_{abs(hash(str(path)))}", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, "add_features", None)
+
+
+class ModelHandle:
+    """The best node's fitted pipeline; ``refresh`` swaps it when the run store reports a better node."""
+
+    def __init__(self, run_dir: Path, store: RunStore) -> None:
+        self.run_dir = run_dir
+        self.store = store
+        self.node_id: Optional[str] = None
+        self.model: Any = None
+        self.hook: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+        self.swaps = 0
+
+    def refresh(self) -> bool:
+        best = self.store.best(run_id_for(self.run_dir))
+        if best is None or best["node_id"] == self.node_id:
+            return False
+        path = node_model_path(self.run_dir, best["node_id"])
+        if path is None:
+            return False
+        model = joblib.load(path, mmap_mode="r")
+        hook = load_feature_hook(self.run_dir / "artifacts" / best["node_id"] / "src")
+        # Swap references together; in-flight batches keep the model they started with.
+        self.model, self.hook, self.node_id = model, hook, best["node_id"]
+        self.swaps += 1
+        return True
+
+    def predict(self, frame: pd.DataFrame) -> Tuple[np.ndarray, Optional[str]]:
+        model, hook, node_id = self.model, self.hook, self.node_id
+        if model is None:
+            raise RuntimeError("No scored node with a model is available yet")
+        if hook is not None:
+            frame = hook(frame)
+        return model.predict(frame), node_id
+
+
+class ServerStats:
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record_request(self, rows: int, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.rows += rows
+            self.errors += 0 if ok else 1
+            self._latencies.append(latency)
+
+    def record_batch(self) -> None:
+        with self._lock:
+            self.batches += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000.0
+            elapsed = max(time.time() - self.started, 1e-9)
+            percentiles = np.percentile(latencies, [50, 90, 99]).tolist() if len(latencies) else [0.0, 0.0, 0.0]
+            return {
+                "uptime_s": elapsed,
+                "requests": self.requests,
+                "rows": self.rows,
+                "batches": self.batches,
+                "errors": self.errors,
+                "requests_per_s": self.requests / elapsed,
+                "rows_per_s": self.rows / elapsed,
+                "mean_batch_requests": self.requests / self.batches if self.batches else 0.0,
+                "latency_ms": dict(zip(["p50", "p90", "p99"], percentiles)),
+            }
+
+
+class MicroBatcher:
+    """Coalesce concurrent requests into one ``predict`` call per batch."""
+
+    def __init__(self, handle: ModelHandle, stats: ServerStats, max_batch_rows: int = 1024, max_wait_ms: float = 5.0):
+        self.handle = handle
+        self.stats = stats
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[pd.DataFrame, Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame: pd.DataFrame) -> "Future[Tuple[np.ndarray, Optional[str]]]":
+        future: Future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            rows = len(item[0])
+            deadline = time.time() + self.max_wait
+            while rows < self.max_batch_rows:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.time(), 0.0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._run(batch)
+
+    def _run(self, batch: List[Tuple[pd.DataFrame, Future]]) -> None:
+        self.stats.record_batch()
+        try:
+            preds, node_id = self.handle.predict(pd.concat([frame for frame, _ in batch], ignore_index=True))
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        offset = 0
+        for frame, future in batch:
+            future.set_result((preds[offset : offset + len(frame)], node_id))
+            offset += len(frame)
+
+
+def parse_rows(body: bytes, content_type: str) -> pd.DataFrame:
+    if "csv" in content_type:
+        return pd.read_csv(io.BytesIO(body))
+    payload = json.loads(body.decode("utf-8"))
+    rows = payload.get("rows", []) if isinstance(payload, dict) else payload
+    return pd.DataFrame(rows)
+
+
+def _make_handler(server: "PredictionServer") -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            if self.path == "/metrics":
+                self._reply(200, {**server.stats.snapshot(), "node_id": server.handle.node_id, "swaps": server.handle.swaps})
+            elif self.path == "/health":
+                self._reply(200, {"status": "ok", "node_id": server.handle.node_id})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self) -> None:
+            if self.path != "/predict":
+                self._reply(404, {"error": "not found"})
+                return
+            start = time.perf_counter()
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            rows = 0
+            try:
+                frame = parse_rows(body, self.headers.get("Content-Type", "application/json"))
+                rows = len(frame)
+                preds, node_id = server.batcher.submit(frame).result(timeout=server.request_timeout)
+            except Exception as exc:
+                server.stats.record_request(rows, time.perf_counter() - start, ok=False)
+                self._reply(400, {"error": str(exc)})
+                return
+            server.stats.record_request(rows, time.perf_counter() - start, ok=True)
+            self._reply(200, {"node_id": node_id, "predictions": np.asarray(preds).tolist()})
+
+        def log_message(self, format: str, *args: Any) -> None:
+            return
+
+        def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):  # type: ignore[no-untyped-def]
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address.
+        return request, ("unix", 0)
+
+
+class PredictionServer:
+    def __init__(
+        self,
+        run_dir: Path,
+        store: RunStore,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        socket_path: Optional[Path] = None,
+        max_batch_rows: int = 1024,
+        max_wait_ms: float = 5.0,
+        reload_interval: float = 5.0,
+        request_timeout: float = 60.0,
+    ) -> None:
+        self.handle = ModelHandle(run_dir, store)
+        self.handle.refresh()
+        self.stats = ServerStats()
+        self.batcher = MicroBatcher(self.handle, self.stats, max_batch_rows, max_wait_ms)
+        self.reload_interval = reload_interval
+        self.request_timeout = request_timeout
+        self.socket_path = socket_path
+        handler = _make_handler(self)
+        if socket_path is not None:
+            if socket_path.exists():
+                os.unlink(socket_path)
+            self.httpd: socketserver.BaseServer = _UnixHTTPServer(str(socket_path), handler)
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), handler)
+        self._stop = threading.Event()
+        self._watcher = threading.Thread(target=self._watch, daemon=True)
+
+    @property
+    def address(self) -> str:
+        if self.socket_path is not None:
+            return str(self.socket_path)
+        host, port = self.httpd.server_address[:2]  # type: ignore[misc]
+        return f"http://{host}:{port}"
+
+    def start(self) -> threading.Thread:
+        self._watcher.start()
+        thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def serve_forever(self) -> None:
+        self._watcher.start()
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.batcher.close()
+        if self.socket_path is not None and self.socket_path.exists():
+            os.unlink(self.socket_path)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.handle.refresh()
+            except Exception:
+                continue
@@ -0,0 +1,30 @@
+"""Per-node model artifacts stored next to each node's source snapshot."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from mlwego.workspace.file_ops import ensure_dir
+
+MODEL_FILE = "model.joblib"
+
+
+def model_dir(run_dir: Path, node_id: str) -> Path:
+    return run_dir / "artifacts" / node_id / "model"
+
+
+def node_model_path(run_dir: Path, node_id: str) -> Optional[Path]:
+    path = model_dir(run_dir, node_id) / MODEL_FILE
+    return path if path.exists() else None
+
+
+def archive_model(source: Path, run_dir: Path, node_id: str) -> Optional[Path]:
+    """Move a freshly trained ``model.joblib`` into the node's model directory; a rename, never a copy."""
+    if not source.exists():
+        return None
+    ensure_dir(model_dir(run_dir, node_id))
+    dest = model_dir(run_dir, node_id) / MODEL_FILE
+    os.replace(source, dest)
+    return dest
@@ -0,0 +1,121 @@
+"""Content-addressed blob store and incremental source hashing."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from mlwego.workspace.file_ops import ensure_dir, write_text
+
+IGNORED_DIRS = {"__pycache__"}
+# Files modified this recently may change again within the same mtime tick, so their digests are not cached.
+RACY_WINDOW_NS = 2_000_000_000
+
+StatKey = Tuple[int, int, int, int]
+
+
+class SourceHasher:
+    """Merkle hashing of a source tree with a stat cache, so unchanged files are never re-read."""
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, Tuple[StatKey, str]] = {}
+
+    def file_digest(self, path: Path) -> str:
+        stat = path.stat()
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+        cached = self._stats.get(str(path))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        if time.time_ns() - stat.st_mtime_ns > RACY_WINDOW_NS:
+            self._stats[str(path)] = (key, value)
+        return value
+
+    def manifest(self, src_dir: Path) -> Dict[str, str]:
+        """Map every file below ``src_dir`` (POSIX relative path) to its content digest."""
+        files: Dict[str, str] = {}
+        for root, dirs, names in os.walk(src_dir):
+            dirs[:] = sorted(name for name in dirs if name not in IGNORED_DIRS)
+            for name in sorted(names):
+                path = Path(root) / name
+                files[path.relative_to(src_dir).as_posix()] = self.file_digest(path)
+        return files
+
+    def tree_digest(self, src_dir: Path) -> str:
+        return merkle_root(self.manifest(src_dir))
+
+
+def merkle_root(manifest: Dict[str, str]) -> str:
+    """Hash a manifest as a tree: each directory digests its sorted (kind, name, child digest) entries."""
+    tree: Dict[str, object] = {}
+    for rel, digest in manifest.items():
+        node = tree
+        *parents, name = rel.split("/")
+        for part in parents:
+            node = node.setdefault(part, {})  # type: ignore[assignment]
+        node[name] = digest
+    return _tree_digest(tree)
+
+
+def _tree_digest(tree: Dict[str, object]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(tree):
+        child = tree[name]
+        if isinstance(child, dict):
+            digest.update(f"tree {name} {_tree_digest(child)}\n".encode("utf-8"))
+        else:
+            digest.update(f"blob {name} {child}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """Files stored once by content digest; node snapshots are manifests materialized with hardlinks."""
+
+    def __init__(self, root: Path, hasher: Optional[SourceHasher] = None) -> None:
+        self.root = root
+        self.hasher = hasher or SourceHasher()
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def manifest_path(self, tree_hash: str) -> Path:
+        return self.root / "manifests" / f"{tree_hash}.json"
+
+    def put_tree(self, src_dir: Path) -> Tuple[str, Dict[str, str]]:
+        manifest = self.hasher.manifest(src_dir)
+        for rel, digest in manifest.items():
+            blob = self.blob_path(digest)
+            if blob.exists():
+                continue
+            ensure_dir(blob.parent)
+            staging = blob.with_name(f"{digest}.{os.getpid()}.tmp")
+            shutil.copyfile(src_dir / rel, staging)
+            os.chmod(staging, 0o444)
+            staging.replace(blob)
+        tree_hash = merkle_root(manifest)
+        write_text(self.manifest_path(tree_hash), json.dumps(manifest, indent=2, sort_keys=True))
+        return tree_hash, manifest
+
+    def load_manifest(self, tree_hash: str) -> Dict[str, str]:
+        return json.loads(self.manifest_path(tree_hash).read_text(encoding="utf-8"))
+
+    def materialize(self, manifest: Dict[str, str], dest: Path) -> Path:
+        if dest.exists():
+            shutil.rmtree(dest)
+        for rel, digest in manifest.items():
+            target = dest / rel
+            ensure_dir(target.parent)
+            try:
+                os.link(self.blob_path(digest), target)
+            except OSError:
+                shutil.copyfile(self.blob_path(digest), target)
+        return dest
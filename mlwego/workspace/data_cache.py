@@ -0,0 +1,62 @@
+"""Columnar cache of the input tables."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from mlwego.workspace.file_ops import ensure_dir, write_text
+
+CACHE_TABLES = ["train", "test"]
+
+
+def data_fingerprint(data_dir: Path) -> str:
+    # The generated src/data_cache.py cannot import mlwego and keeps its own copy; tests check that they agree.
+    digest = hashlib.sha256()
+    for path in sorted(data_dir.glob("*.csv")):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def build_data_cache(data_dir: Path, cache_root: Path) -> Path:
+    cache_dir = cache_root / data_fingerprint(data_dir)
+    for name in CACHE_TABLES:
+        csv_path = data_dir / f"{name}.csv"
+        table_dir = cache_dir / name
+        if not csv_path.exists() or (table_dir / "manifest.json").exists():
+            continue
+        write_table(pd.read_csv(csv_path), table_dir)
+    return cache_dir
+
+
+def write_table(frame: pd.DataFrame, table_dir: Path) -> None:
+    staging = table_dir.with_name(table_dir.name + ".tmp")
+    if staging.exists():
+        shutil.rmtree(staging)
+    ensure_dir(staging)
+    columns: List[Dict[str, Any]] = []
+    for idx, name in enumerate(frame.columns):
+        series = frame[name]
+        entry: Dict[str, Any] = {"name": name, "dtype": str(series.dtype), "file": f"{idx}.npy"}
+        if series.dtype.kind in "biuf":
+            entry["kind"] = "numeric"
+            np.save(staging / entry["file"], series.to_numpy())
+        else:
+            entry["kind"] = "categorical"
+            entry["categories"] = f"{idx}.categories.json"
+            codes, uniques = pd.factorize(series)
+            np.save(staging / entry["file"], codes.astype(np.int32))
+            write_text(staging / entry["categories"], json.dumps(list(uniques), default=str))
+        columns.append(entry)
+    manifest = {"rows": int(len(frame)), "columns": columns}
+    write_text(staging / "manifest.json", json.dumps(manifest, indent=2))
+    if table_dir.exists():
+        shutil.rmtree(table_dir)
+    staging.replace(table_dir)
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import difflib
+import os
+import threading
 from pathlib import Path
 from typing import Iterable, Tuple
 
@@ -16,8 +18,11 @@ def read_text(path: Path) -> str:
 
 
 def write_text(path: Path, content: str) -> None:
+    # Replace rather than truncate: the old file may be a hardlink into the snapshot blob store.
     ensure_dir(path.parent)
-    path.write_text(content, encoding="utf-8")
+    staging = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    staging.write_text(content, encoding="utf-8")
+    staging.replace(path)
 
 
 def apply_patch(path: Path, new_content: str) -> Tuple[str, str]:
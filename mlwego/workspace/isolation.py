@@ -0,0 +1,49 @@
+"""Isolated per-candidate workspaces."""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+
+from mlwego.workspace.file_ops import ensure_dir
+
+SHARED_DIRS = ["data", "cache"]
+
+
+def create_workspace(run_dir: Path, dest: Path) -> Path:
+    if dest.exists():
+        shutil.rmtree(dest)
+    ensure_dir(dest)
+    shutil.copytree(run_dir / "src", dest / "src")
+    ensure_dir(dest / "artifacts")
+    for name in SHARED_DIRS:
+        source = run_dir / name
+        if source.exists():
+            _link_shared(source, dest / name)
+    return dest
+
+
+def collect_artifacts(workspace: Path, dest: Path) -> Path:
+    ensure_dir(dest)
+    for item in (workspace / "artifacts").iterdir():
+        target = dest / item.name
+        if target.exists():
+            if target.is_dir():
+                shutil.rmtree(target)
+            else:
+                target.unlink()
+        shutil.move(str(item), str(target))
+    return dest
+
+
+def remove_workspace(workspace: Path) -> None:
+    if workspace.exists():
+        shutil.rmtree(workspace)
+
+
+def _link_shared(source: Path, target: Path) -> None:
+    try:
+        os.symlink(source.resolve(), target, target_is_directory=True)
+    except OSError:
+        shutil.copytree(source, target)
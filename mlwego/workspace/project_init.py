@@ -9,7 +9,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from mlwego.evaluation.infer_task import TaskInfo, infer_task
+from mlwego.search.backends import backend_config
+from mlwego.workspace.data_cache import build_data_cache
 from mlwego.workspace.file_ops import ensure_dir, write_text
+from mlwego.workspace.profiler import TableProfile, load_profile
 from mlwego.workspace.snapshot import write_baseline_src
 
 
@@ -18,17 +22,28 @@ def init_workspace(task_path: str, data_path: str, out_dir: Optional[str] = None
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     root = Path(out_dir) if out_dir else Path("runs") / f"{timestamp}_{task_name}"
     ensure_dir(root)
-    for name in ["data", "src", "artifacts", "logs"]:
+    for name in ["data", "src", "artifacts", "logs", "cache"]:
         ensure_dir(root / name)
     task_text = Path(task_path).read_text(encoding="utf-8")
     task_meta = {"task": task_text, "task_path": str(Path(task_path).resolve())}
     write_text(root / "task.json", json.dumps(task_meta, indent=2))
     _link_or_copy_data(Path(data_path), root / "data")
+    build_data_cache(root / "data", root / "cache" / "data")
+    profile = load_profile(root / "data", root / "cache" / "data")
     write_baseline_src(root / "src")
+    info = infer_task(root / "data", task_text, profile=profile)
+    _configure_task(root / "src" / "config.json", info, profile.tables["train"])
     write_text(root / "report.md", f"# mlwego run\n\nTask: {task_name}\n")
     return root
 
 
+def _configure_task(config_path: Path, info: TaskInfo, train: TableProfile) -> None:
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    config.update(target=info.target, task_type=info.task_type)
+    config.update(backend_config(train, info.target, seed=config.get("seed", 42)))
+    write_text(config_path, json.dumps(config, indent=2))
+
+
 def _link_or_copy_data(source: Path, target: Path) -> None:
     if target.exists() and any(target.iterdir()):
         return
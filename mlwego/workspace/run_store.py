@@ -0,0 +1,200 @@
+"""Indexed SQLite store of runs, nodes and fold scores."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+DB_NAME = "mlwego.sqlite"
+NODE_COLUMNS = [
+    "run_id",
+    "node_id",
+    "parent_id",
+    "score",
+    "score_std",
+    "metric",
+    "fidelity",
+    "status",
+    "cached",
+    "runtime",
+    "cpu_time",
+    "peak_rss_mb",
+    "diff",
+    "artifact_dir",
+    "log_path",
+    "created",
+]
+ORDER_COLUMNS = ["score", "runtime", "cpu_time", "peak_rss_mb", "created"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    node_id TEXT NOT NULL,
+    parent_id TEXT,
+    score REAL,
+    score_std REAL,
+    metric TEXT,
+    fidelity REAL NOT NULL DEFAULT 1.0,
+    status TEXT NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    runtime REAL,
+    cpu_time REAL,
+    peak_rss_mb REAL,
+    diff TEXT,
+    artifact_dir TEXT,
+    log_path TEXT,
+    created REAL NOT NULL,
+    PRIMARY KEY (run_id, node_id)
+);
+CREATE TABLE IF NOT EXISTS fold_scores (
+    run_id TEXT NOT NULL,
+    node_id TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (run_id, node_id, fold)
+);
+CREATE INDEX IF NOT EXISTS nodes_best ON nodes (run_id, status, fidelity DESC, score DESC);
+CREATE INDEX IF NOT EXISTS nodes_leaderboard ON nodes (status, metric, fidelity DESC, score DESC);
+"""
+
+
+def default_db_path(run_dir: Optional[Path] = None) -> Path:
+    """``$MLWEGO_DB`` if set, else a database shared by all runs next to ``run_dir``."""
+    env_path = os.environ.get("MLWEGO_DB")
+    if env_path:
+        return Path(env_path)
+    parent = run_dir.resolve().parent if run_dir is not None else Path("runs")
+    return parent / DB_NAME
+
+
+def run_id_for(run_dir: Path) -> str:
+    return str(run_dir.resolve())
+
+
+class RunStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL lets several mlwego processes write while readers keep querying.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RunStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def record_run(self, run_dir: Path, task: str) -> str:
+        run_id = run_id_for(run_dir)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, task, created) VALUES (?, ?, ?)",
+                (run_id, task, time.time()),
+            )
+        return run_id
+
+    def record_node(self, node: Dict[str, Any], fold_scores: Sequence[float] = ()) -> None:
+        row = {name: node.get(name) for name in NODE_COLUMNS}
+        row["created"] = row["created"] or time.time()
+        row["cached"] = int(bool(row["cached"]))
+        placeholders = ", ".join(f":{name}" for name in NODE_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO nodes ({', '.join(NODE_COLUMNS)}) VALUES ({placeholders})", row
+            )
+            self._conn.execute(
+                "DELETE FROM fold_scores WHERE run_id = ? AND node_id = ?", (row["run_id"], row["node_id"])
+            )
+            self._conn.executemany(
+                "INSERT INTO fold_scores (run_id, node_id, fold, score) VALUES (?, ?, ?, ?)",
+                [(row["run_id"], row["node_id"], fold, score) for fold, score in enumerate(fold_scores)],
+            )
+
+    def best(self, run_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT * FROM nodes WHERE run_id = ? AND status = 'ok' ORDER BY fidelity DESC, score DESC LIMIT 1",
+            (run_id,),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def query(
+        self,
+        run_id: Optional[str] = None,
+        status: Optional[str] = None,
+        metric: Optional[str] = None,
+        min_fidelity: float = 0.0,
+        order_by: str = "score",
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Cannot order by {order_by!r}; choose from {ORDER_COLUMNS}")
+        clauses = ["fidelity >= ?"]
+        params: List[Any] = [min_fidelity]
+        for column, value in (("run_id", run_id), ("status", status), ("metric", metric)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        direction = "DESC" if order_by == "score" else "ASC"
+        sql = (
+            f"SELECT * FROM nodes WHERE {' AND '.join(clauses)} "
+            f"ORDER BY fidelity DESC, {order_by} {direction} LIMIT ?"
+        )
+        return [dict(row) for row in self._conn.execute(sql, (*params, limit))]
+
+    def leaderboard(self, task: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Best full-fidelity node of every run, ranked by score."""
+        sql = """
+            SELECT runs.task, nodes.* FROM nodes JOIN runs USING (run_id)
+            WHERE nodes.status = 'ok' AND nodes.fidelity >= 1.0 AND (? IS NULL OR runs.task = ?)
+              AND nodes.score = (
+                SELECT MAX(best.score) FROM nodes AS best
+                WHERE best.run_id = nodes.run_id AND best.status = 'ok' AND best.fidelity >= 1.0
+              )
+            GROUP BY nodes.run_id
+            ORDER BY runs.task, nodes.score DESC
+            LIMIT ?
+        """
+        return [dict(row) for row in self._conn.execute(sql, (task, task, limit))]
+
+    def fold_scores(self, run_id: str, node_id: str) -> List[float]:
+        rows = self._conn.execute(
+            "SELECT score FROM fold_scores WHERE run_id = ? AND node_id = ? ORDER BY fold", (run_id, node_id)
+        )
+        return [row[0] for row in rows]
+
+    def sql(self, statement: str) -> List[Dict[str, Any]]:
+        """Run a read-only statement against a separate connection."""
+        conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(statement)]
+        finally:
+            conn.close()
+
+
+def task_name(run_dir: Path) -> str:
+    meta_path = run_dir / "task.json"
+    if meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("task_path"):
+            return Path(meta["task_path"]).stem
+    return run_dir.name
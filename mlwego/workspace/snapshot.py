@@ -2,29 +2,38 @@
 
 from __future__ import annotations
 
-import hashlib
 import json
 import shutil
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
+from mlwego.workspace.blob_store import BlobStore, SourceHasher
 from mlwego.workspace.file_ops import ensure_dir, write_text
 
+_HASHER = SourceHasher()
+
 BASELINE_FILES: Dict[str, str] = {
-    "train.py": """from __future__ import annotations\n\nimport json\nfrom pathlib import Path\n\nimport joblib\nimport numpy as np\nimport pandas as pd\nfrom sklearn.compose import ColumnTransformer\nfrom sklearn.ensemble import RandomForestClassifier, RandomForestRegressor\nfrom sklearn.impute import SimpleImputer\nfrom sklearn.metrics import accuracy_score, mean_squared_error\nfrom sklearn.model_selection import KFold, StratifiedKFold\nfrom sklearn.pipeline import Pipeline\nfrom sklearn.preprocessing import OneHotEncoder\n\n\nROOT = Path(__file__).resolve().parent\nRUN_ROOT = ROOT.parent\n\n\ndef load_config() -> dict:\n    with open(ROOT / \"config.json\", \"r\", encoding=\"utf-8\") as handle:\n        return json.load(handle)\n\n\ndef load_data(config: dict) -> tuple[pd.DataFrame, pd.DataFrame]:\n    data_dir = (ROOT / config[\"data_dir\"]).resolve()\n    train = pd.read_csv(data_dir / \"train.csv\")\n    test = pd.read_csv(data_dir / \"test.csv\")\n    return train, test\n\n\ndef infer_target(train: pd.DataFrame, test: pd.DataFrame, config: dict) -> str:\n    if config.get(\"target\"):\n        return config[\"target\"]\n    candidates = [c for c in train.columns if c not in test.columns]\n    if candidates:\n        return candidates[0]\n    return train.columns[-1]\n\n\ndef build_pipeline(task_type: str, numeric: list[str], categorical: list[str], config: dict):\n    numeric_pipe = Pipeline([("imputer", SimpleImputer(strategy=\"median\"))])\n    categorical_pipe = Pipeline([\n        (\"imputer\", SimpleImputer(strategy=\"most_frequent\")),\n        (\"onehot\", OneHotEncoder(handle_unknown=\"ignore\")),\n    ])\n    preprocessor = ColumnTransformer([\n        (\"num\", numeric_pipe, numeric),\n        (\"cat\", categorical_pipe, categorical),\n    ])\n    if task_type == \"classification\":\n        model = RandomForestClassifier(**config.get(\"model_params\", {}))\n    else:\n        model = RandomForestRegressor(**config.get(\"model_params\", {}))\n    return Pipeline([(\"preprocessor\", preprocessor), (\"model\", model)])\n\n\ndef evaluate(train: pd.DataFrame, test: pd.DataFrame, config: dict) -> tuple[dict, np.ndarray]:\n    target = infer_target(train, test, config)\n    y = train[target]\n    X = train.drop(columns=[target])\n    numeric = X.select_dtypes(include=[\"number\"]).columns.tolist()\n    categorical = [c for c in X.columns if c not in numeric]\n    task_type = config.get(\"task_type\") or (\"classification\" if y.nunique() <= 20 else \"regression\")\n    n_splits = config.get(\"n_splits\", 5)\n    if task_type == \"classification\":\n        cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=config.get(\"seed\", 42))\n    else:\n        cv = KFold(n_splits=n_splits, shuffle=True, random_state=config.get(\"seed\", 42))\n    oof = np.zeros(len(train))\n    scores: list[float] = []\n    for train_idx, valid_idx in cv.split(X, y):\n        X_train, X_valid = X.iloc[train_idx], X.iloc[valid_idx]\n        y_train, y_valid = y.iloc[train_idx], y.iloc[valid_idx]\n        pipeline = build_pipeline(task_type, numeric, categorical, config)\n        pipeline.fit(X_train, y_train)\n        preds = pipeline.predict(X_valid)\n        oof[valid_idx] = preds\n        if task_type == \"classification\":\n            score = accuracy_score(y_valid, preds)\n        else:\n            score = -mean_squared_error(y_valid, preds, squared=False)\n        scores.append(score)\n    score_mean = float(sum(scores) / max(len(scores), 1))\n    score_std = float(np.std(scores))\n    metrics = {\n        \"metric\": \"accuracy\" if task_type == \"classification\" else \"rmse\",\n        \"score\": score_mean,\n        \"score_std\": score_std,\n        \"task_type\": task_type,\n        \"target\": target,\n    }\n    return metrics, oof\n\n\ndef main() -> None:\n    config = load_config()\n    train, test = load_data(config)\n    metrics, oof = evaluate(train, test, config)\n    artifacts = RUN_ROOT / \"artifacts\"\n    artifacts.mkdir(parents=True, exist_ok=True)\n    np.save(artifacts / \"oof.npy\", oof)\n    with open(artifacts / \"metrics.json\", \"w\", encoding=\"utf-8\") as handle:\n        json.dump(metrics, handle, indent=2)\n    target = metrics[\"target\"]\n    X_full = train.drop(columns=[target])\n    y_full = train[target]\n    numeric = X_full.select_dtypes(include=[\"number\"]).columns.tolist()\n    categorical = [c for c in X_full.columns if c not in numeric]\n    model = build_pipeline(metrics[\"task_type\"], numeric, categorical, config)\n    model.fit(X_full, y_full)\n    joblib.dump(model, artifacts / \"model.joblib\")\n\n\nif __name__ == \"__main__\":\n    main()\n""",
-    "predict.py": """from __future__ import annotations\n\nimport json\nfrom pathlib import Path\n\nimport joblib\nimport pandas as pd\n\n\nROOT = Path(__file__).resolve().parent\nRUN_ROOT = ROOT.parent\n\n\ndef load_config() -> dict:\n    with open(ROOT / \"config.json\", \"r\", encoding=\"utf-8\") as handle:\n        return json.load(handle)\n\n\ndef main() -> None:\n    config = load_config()\n    data_dir = (ROOT / config[\"data_dir\"]).resolve()\n    test = pd.read_csv(data_dir / \"test.csv\")\n    artifacts = RUN_ROOT / \"artifacts\"\n    model = joblib.load(artifacts / \"model.joblib\")\n    preds = model.predict(test)\n    sample_path = data_dir / \"sample_submission.csv\"\n    if sample_path.exists():\n        submission = pd.read_csv(sample_path)\n        target_cols = [c for c in submission.columns if c != submission.columns[0]]\n        if len(target_cols) == 1:\n            submission[target_cols[0]] = preds\n        else:\n            for idx, col in enumerate(target_cols):\n                submission[col] = preds[:, idx]\n    else:\n        submission = pd.DataFrame({\"prediction\": preds})\n    output_path = artifacts / \"submission.csv\"\n    submission.to_csv(output_path, index=False)\n\n\nif __name__ == \"__main__\":\n    main()\n""",
+    "train.py": """from __future__ import annotations\n\nimport json\nfrom pathlib import Path\n\nimport joblib\nimport numpy as np\nimport pandas as pd\nfrom sklearn.compose import ColumnTransformer\nfrom sklearn.ensemble import (\n    HistGradientBoostingClassifier,\n    HistGradientBoostingRegressor,\n    RandomForestClassifier,\n    RandomForestRegressor,\n)\nfrom sklearn.feature_extraction import FeatureHasher\nfrom sklearn.impute import SimpleImputer\nfrom sklearn.linear_model import SGDClassifier, SGDRegressor\nfrom sklearn.metrics import accuracy_score, mean_squared_error\nfrom sklearn.model_selection import KFold, StratifiedKFold\nfrom sklearn.pipeline import Pipeline\nfrom sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler, TargetEncoder\n\nimport features\nfrom data_cache import data_fingerprint, load_profile, load_table\nfrom feature_cache import FeatureCache, file_digest\n\n\nROOT = Path(__file__).resolve().parent\nRUN_ROOT = ROOT.parent\nOUTPUT_FILES = [\"oof.npy\", \"oof_target.npy\", \"oof_proba.npy\", \"test_pred.npy\", \"test_proba.npy\", \"model.joblib\"]\n# config[\"model\"] selects a backend. \"size\" is the parameter scaled down at low fidelity; \"ordinal\" backends get\n# dense ordinal-coded categoricals instead of sparse one-hot columns; \"scale\" standardizes numeric columns.\nMODEL_BACKENDS = {\n    \"random_forest\": {\n        \"classification\": (RandomForestClassifier, {\"n_jobs\": -1}),\n        \"regression\": (RandomForestRegressor, {\"n_jobs\": -1}),\n        \"size\": \"n_estimators\",\n    },\n    \"hist_gradient_boosting\": {\n        \"classification\": (HistGradientBoostingClassifier, {}),\n        \"regression\": (HistGradientBoostingRegressor, {}),\n        \"size\": \"max_iter\",\n        \"ordinal\": True,\n    },\n    \"sgd\": {\n        \"classification\": (SGDClassifier, {\"loss\": \"log_loss\"}),\n        \"regression\": (SGDRegressor, {}),\n        \"scale\": True,\n    },\n}\n# Categorical encoding by distinct-value count, overridable in config[\"preprocessing\"]: one-hot up to\n# one_hot_max, target (or ordinal) encoding up to hash_min, feature hashing above, and columns whose values are\n# nearly all distinct (identifiers, free text) are dropped.\nENCODING_DEFAULTS = {\"one_hot_max\": 16, \"hash_min\": 1000, \"near_unique\": 0.9, \"hash_features\": 32, \"medium\": \"target\"}\n# Histogram boosting bins a native categorical feature into at most this many categories.\nMAX_NATIVE_CATEGORIES = 255\n\n\ndef load_config() -> dict:\n    with open(ROOT / \"config.json\", \"r\", encoding=\"utf-8\") as handle:\n        return json.load(handle)\n\n\ndef data_paths(config: dict) -> tuple[Path, Path]:\n    return (ROOT / config[\"data_dir\"]).resolve(), (ROOT / config.get(\"cache_dir\", \"../cache/data\")).resolve()\n\n\ndef load_data(config: dict) -> tuple[pd.DataFrame, pd.DataFrame]:\n    data_dir, cache_dir = data_paths(config)\n    train = load_table(data_dir, cache_dir, \"train\")\n    test = load_table(data_dir, cache_dir, \"test\")\n    hook = getattr(features, \"add_features\", None)\n    if hook is not None:\n        train, test = hook(train), hook(test)\n    return train, test\n\n\ndef infer_target(train: pd.DataFrame, test: pd.DataFrame, config: dict) -> str:\n    if config.get(\"target\"):\n        return config[\"target\"]\n    candidates = [c for c in train.columns if c not in test.columns]\n    if candidates:\n        return candidates[0]\n    return train.columns[-1]\n\n\ndef profile_column(profile: dict | None, name: str) -> dict | None:\n    columns = (profile or {}).get(\"tables\", {}).get(\"train\", {}).get(\"columns\", [])\n    return next((column for column in columns if column[\"name\"] == name), None)\n\n\ndef split_columns(X: pd.DataFrame, profile: dict | None) -> tuple[list[str], list[str]]:\n    \"\"\"Numeric and categorical columns, from the init-time profile wherever it still describes the column.\"\"\"\n    numeric = []\n    for col in X.columns:\n        entry = profile_column(profile, col)\n        if entry is not None and entry[\"dtype\"] == str(X[col].dtype):\n            is_numeric = entry[\"kind\"] == \"numeric\"\n        else:\n            is_numeric = X[col].dtype.kind in \"iuf\"\n        if is_numeric:\n            numeric.append(col)\n    return numeric, [c for c in X.columns if c not in numeric]\n\n\ndef infer_task_type(y: pd.Series, target: str, profile: dict | None, config: dict) -> str:\n    if config.get(\"task_type\"):\n        return config[\"task_type\"]\n    entry = profile_column(profile, target)\n    cardinality = entry[\"cardinality\"] if entry is not None else y.nunique()\n    return \"classification\" if cardinality <= 20 else \"regression\"\n\n\ndef plan_encodings(X: pd.DataFrame, categorical: list[str], profile: dict | None, config: dict) -> dict[str, str]:\n    \"\"\"Encoding per categorical column: onehot, ordinal, target, hash or drop.\"\"\"\n    settings = {**ENCODING_DEFAULTS, **config.get(\"preprocessing\", {})}\n    rows = (profile or {}).get(\"tables\", {}).get(\"train\", {}).get(\"rows\") or len(X)\n    low = \"ordinal\" if model_backend(config).get(\"ordinal\") else \"onehot\"\n    encodings = {}\n    for col in categorical:\n        entry = profile_column(profile, col)\n        cardinality = entry[\"cardinality\"] if entry is not None else X[col].nunique()\n        if cardinality > settings[\"near_unique\"] * rows:\n            encodings[col] = \"drop\"\n        elif cardinality <= settings[\"one_hot_max\"]:\n            encodings[col] = low\n        elif cardinality < settings[\"hash_min\"]:\n            encodings[col] = settings[\"medium\"]\n        else:\n            encodings[col] = \"hash\"\n    return encodings\n\n\ndef matrix_size(matrix) -> dict:\n    if hasattr(matrix, \"nnz\"):\n        size = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes\n        return {\"rows\": matrix.shape[0], \"columns\": matrix.shape[1], \"sparse\": True, \"nnz\": int(matrix.nnz), \"bytes\": int(size)}\n    return {\"rows\": matrix.shape[0], \"columns\": matrix.shape[1], \"sparse\": False, \"bytes\": int(np.asarray(matrix).nbytes)}\n\n\ndef model_backend(config: dict) -> dict:\n    name = config.get(\"model\", \"random_forest\")\n    if name not in MODEL_BACKENDS:\n        raise ValueError(f\"Unknown model {name!r}; choose one of {sorted(MODEL_BACKENDS)}\")\n    return MODEL_BACKENDS[name]\n\n\ndef build_encoder(kind: str, config: dict):\n    settings = {**ENCODING_DEFAULTS, **config.get(\"preprocessing\", {})}\n    if kind == \"onehot\":\n        return OneHotEncoder(handle_unknown=\"ignore\")\n    if kind == \"ordinal\":\n        return OrdinalEncoder(handle_unknown=\"use_encoded_value\", unknown_value=-1)\n    if kind == \"target\":\n        # fit_transform cross-fits, so each training row is encoded by statistics from the other folds.\n        return TargetEncoder(cv=KFold(n_splits=5, shuffle=True, random_state=config.get(\"seed\", 42)))\n    return FeatureHasher(n_features=settings[\"hash_features\"], input_type=\"string\")\n\n\ndef build_preprocessor(numeric: list[str], encodings: dict[str, str], config: dict) -> ColumnTransformer:\n    preprocessing = config.get(\"preprocessing\", {})\n    backend = model_backend(config)\n    numeric_steps = [(\"imputer\", SimpleImputer(strategy=preprocessing.get(\"numeric_imputer\", \"median\")))]\n    if backend.get(\"scale\"):\n        numeric_steps.append((\"scaler\", StandardScaler()))\n    transformers = [(\"num\", Pipeline(numeric_steps), numeric)]\n    groups: dict[str, list[str]] = {}\n    for col, kind in encodings.items():\n        if kind == \"hash\":\n            # One hasher per column, so equal values in different columns do not collide.\n            groups[f\"hash_{col}\"] = [col]\n        elif kind != \"drop\":\n            groups.setdefault(kind, []).append(col)\n    for name, cols in groups.items():\n        kind = \"hash\" if name.startswith(\"hash_\") else name\n        categorical_pipe = Pipeline([\n            (\"imputer\", SimpleImputer(strategy=preprocessing.get(\"categorical_imputer\", \"most_frequent\"))),\n            (\"encoder\", build_encoder(kind, config)),\n        ])\n        transformers.append((name, categorical_pipe, cols))\n    return ColumnTransformer(transformers, sparse_threshold=0.0 if backend.get(\"ordinal\") else 0.3)\n\n\ndef categorical_mask(preprocessor: ColumnTransformer, width: int) -> np.ndarray:\n    \"\"\"Columns of the transformed matrix holding ordinal codes that the model can split on as categories.\"\"\"\n    mask = np.zeros(width, dtype=bool)\n    columns = preprocessor.output_indices_.get(\"ordinal\")\n    if columns is not None:\n        encoder = preprocessor.named_transformers_[\"ordinal\"].named_steps[\"encoder\"]\n        mask[columns] = [len(categories) <= MAX_NATIVE_CATEGORIES for categories in encoder.categories_]\n    return mask\n\n\ndef build_model(task_type: str, config: dict, categorical: np.ndarray | None = None):\n    backend = model_backend(config)\n    estimator, defaults = backend[task_type]\n    params = {**defaults, **config.get(\"model_params\", {})}\n    if backend.get(\"ordinal\") and categorical is not None and categorical.any():\n        # Without the mask, ordinal codes are split on as if their order meant something.\n        params.setdefault(\"categorical_features\", np.array(categorical, dtype=bool))\n    scale = config.get(\"fidelity\", {}).get(\"estimator_scale\", 1.0)\n    size = backend.get(\"size\")\n    if scale < 1.0 and size in params:\n        params[size] = max(10, int(params[size] * scale))\n    return estimator(**params)\n\n\ndef build_pipeline(task_type: str, numeric: list[str], encodings: dict[str, str], config: dict):\n    preprocessor = build_preprocessor(numeric, encodings, config)\n    return Pipeline([(\"preprocessor\", preprocessor), (\"model\", build_model(task_type, config))])\n\n\ndef fold_count(config: dict) -> int:\n    return config.get(\"fidelity\", {}).get(\"n_splits\") or config.get(\"n_splits\", 5)\n\n\ndef subsample(train: pd.DataFrame, config: dict) -> pd.DataFrame:\n    fraction = config.get(\"fidelity\", {}).get(\"subsample\", 1.0)\n    if fraction >= 1.0:\n        return train\n    return train.sample(frac=fraction, random_state=config.get(\"seed\", 42)).reset_index(drop=True)\n\n\ndef feature_cache(config: dict, target: str, task_type: str, numeric: list[str], encodings: dict[str, str]) -> FeatureCache:\n    cache_dir = config.get(\"feature_cache_dir\", \"../cache/features\")\n    data_dir, _ = data_paths(config)\n    key_parts = {\n        \"data\": data_fingerprint(data_dir),\n        \"train_py\": file_digest(ROOT / \"train.py\"),\n        \"features_py\": file_digest(ROOT / \"features.py\"),\n        \"preprocessing\": config.get(\"preprocessing\", {}),\n        \"model\": config.get(\"model\", \"random_forest\"),\n        \"target\": target,\n        \"task_type\": task_type,\n        \"columns\": [numeric, encodings],\n        \"seed\": config.get(\"seed\", 42),\n        \"n_splits\": fold_count(config),\n        \"subsample\": config.get(\"fidelity\", {}).get(\"subsample\", 1.0),\n    }\n    max_bytes = int(config.get(\"feature_cache_max_mb\", 4096)) * 1024 * 1024\n    return FeatureCache((ROOT / cache_dir).resolve() if cache_dir else None, key_parts, max_bytes=max_bytes)\n\n\ndef transform_fold(cache: FeatureCache, fold: str, numeric: list[str], encodings: dict[str, str], config: dict, X_train, y_train, X_valid=None):\n    cached = cache.load(fold)\n    if cached is not None:\n        return cached\n    preprocessor = build_preprocessor(numeric, encodings, config)\n    matrices = {\"train\": preprocessor.fit_transform(X_train, y_train)}\n    if X_valid is not None:\n        matrices[\"valid\"] = preprocessor.transform(X_valid)\n    matrices[\"categorical\"] = categorical_mask(preprocessor, matrices[\"train\"].shape[1])\n    cache.store(fold, matrices, preprocessor if X_valid is None else None)\n    return {**matrices, \"preprocessor\": preprocessor}\n\n\ndef report_fold(fold: int, score: float, metric: str) -> None:\n    print(\"MLWEGO_FOLD \" + json.dumps({\"fold\": fold, \"score\": score, \"metric\": metric}), flush=True)\n\n\ndef label_array(values) -> np.ndarray:\n    \"\"\"Labels that np.load reads without pickle: object (string) labels become fixed-width unicode.\"\"\"\n    values = np.asarray(values)\n    return values.astype(str) if values.dtype == object else values\n\n\ndef aligned_proba(model, X, classes: np.ndarray) -> np.ndarray:\n    proba = np.zeros((X.shape[0], len(classes)))\n    proba[:, np.searchsorted(classes, label_array(model.classes_))] = model.predict_proba(X)\n    return proba\n\n\ndef evaluate(train: pd.DataFrame, test: pd.DataFrame, config: dict, profile: dict | None = None) -> tuple[dict, dict]:\n    target = infer_target(train, test, config)\n    train = subsample(train, config)\n    y = train[target]\n    X = train.drop(columns=[target])\n    numeric, categorical = split_columns(X, profile)\n    encodings = plan_encodings(X, categorical, profile, config)\n    task_type = infer_task_type(y, target, profile, config)\n    n_splits = fold_count(config)\n    if task_type == \"classification\":\n        cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=config.get(\"seed\", 42))\n    else:\n        cv = KFold(n_splits=n_splits, shuffle=True, random_state=config.get(\"seed\", 42))\n    metric = \"accuracy\" if task_type == \"classification\" else \"rmse\"\n    cache = feature_cache(config, target, task_type, numeric, encodings)\n    target_values = label_array(y)\n    classes = np.unique(target_values) if task_type == \"classification\" else None\n    oof = np.zeros(len(train), dtype=target_values.dtype if classes is not None else float)\n    oof_proba = np.zeros((len(train), len(classes))) if classes is not None else None\n    scores: list[float] = []\n    for fold, (train_idx, valid_idx) in enumerate(cv.split(X, y)):\n        X_train, X_valid = X.iloc[train_idx], X.iloc[valid_idx]\n        y_train, y_valid = y.iloc[train_idx], y.iloc[valid_idx]\n        matrices = transform_fold(cache, f\"fold_{fold}\", numeric, encodings, config, X_train, y_train, X_valid)\n        if fold == 0:\n            matrix = matrix_size(matrices[\"train\"])\n        model = build_model(task_type, config, matrices.get(\"categorical\"))\n        model.fit(matrices[\"train\"], y_train)\n        preds = model.predict(matrices[\"valid\"])\n        oof[valid_idx] = preds\n        if oof_proba is not None:\n            if hasattr(model, \"predict_proba\"):\n                oof_proba[valid_idx] = aligned_proba(model, matrices[\"valid\"], classes)\n            else:\n                oof_proba = None\n        if task_type == \"classification\":\n            score = float(accuracy_score(y_valid, preds))\n        else:\n            score = -float(np.sqrt(mean_squared_error(y_valid, preds)))\n        scores.append(score)\n        report_fold(fold, score, metric)\n    score_mean = float(sum(scores) / max(len(scores), 1))\n    score_std = float(np.std(scores))\n    metrics = {\n        \"metric\": metric,\n        \"score\": score_mean,\n        \"score_std\": score_std,\n        \"fold_scores\": scores,\n        \"task_type\": task_type,\n        \"target\": target,\n        \"model\": config.get(\"model\", \"random_forest\"),\n        \"encodings\": encodings,\n        \"matrix\": matrix,\n        \"fidelity\": config.get(\"fidelity\", {}).get(\"subsample\", 1.0),\n        \"classes\": classes.tolist() if classes is not None else None,\n    }\n    return metrics, {\"oof\": oof, \"oof_target\": target_values, \"oof_proba\": oof_proba}\n\n\ndef main() -> None:\n    config = load_config()\n    train, test = load_data(config)\n    profile = load_profile(*data_paths(config))\n    metrics, predictions = evaluate(train, test, config, profile)\n    artifacts = RUN_ROOT / \"artifacts\"\n    artifacts.mkdir(parents=True, exist_ok=True)\n    for name in OUTPUT_FILES:\n        (artifacts / name).unlink(missing_ok=True)\n    for name, values in predictions.items():\n        if values is not None:\n            np.save(artifacts / f\"{name}.npy\", values)\n    with open(artifacts / \"metrics.json\", \"w\", encoding=\"utf-8\") as handle:\n        json.dump(metrics, handle, indent=2)\n    if config.get(\"fidelity\"):\n        return\n    target = metrics[\"target\"]\n    X_full = train.drop(columns=[target])\n    y_full = train[target]\n    numeric, categorical = split_columns(X_full, profile)\n    encodings = plan_encodings(X_full, categorical, profile, config)\n    cache = feature_cache(config, target, metrics[\"task_type\"], numeric, encodings)\n    matrices = transform_fold(cache, \"full\", numeric, encodings, config, X_full, y_full)\n    estimator = build_model(metrics[\"task_type\"], config, matrices.get(\"categorical\"))\n    estimator.fit(matrices[\"train\"], y_full)\n    model = Pipeline([(\"preprocessor\", matrices[\"preprocessor\"]), (\"model\", estimator)])\n    # Uncompressed so that numpy arrays inside the model can be memory-mapped by joblib.load(mmap_mode=\"r\").\n    joblib.dump(model, artifacts / \"model.joblib\", compress=0)\n    # Test predictions let mlwego ensemble blend nodes without refitting them.\n    np.save(artifacts / \"test_pred.npy\", label_array(model.predict(test)))\n    if metrics[\"classes\"] is not None and hasattr(model, \"predict_proba\"):\n        np.save(artifacts / \"test_proba.npy\", aligned_proba(model, test, np.asarray(metrics[\"classes\"])))\n\n\nif __name__ == \"__main__\":\n    main()\n""",
+    "predict.py": """from __future__ import annotations\n\nimport json\nimport os\nfrom collections import deque\nfrom concurrent.futures import ThreadPoolExecutor\nfrom pathlib import Path\n\nimport joblib\nimport numpy as np\nimport pandas as pd\n\nimport features\nfrom data_cache import iter_table\n\n\nROOT = Path(__file__).resolve().parent\n# mlwego runs a node's snapshot (artifacts/<node>/src) against the run directory and that node's model.\nRUN_ROOT = Path(os.environ.get(\"MLWEGO_RUN_ROOT\", ROOT.parent)).resolve()\nMODEL_PATH = Path(os.environ.get(\"MLWEGO_MODEL_PATH\", RUN_ROOT / \"artifacts\" / \"model.joblib\"))\n# Preprocessing (imputation, one-hot) inflates a chunk well beyond its raw size.\nEXPANSION = 8\nMIN_CHUNK_ROWS = 1000\n\n\ndef load_config() -> dict:\n    with open(ROOT / \"config.json\", \"r\", encoding=\"utf-8\") as handle:\n        return json.load(handle)\n\n\ndef worker_count(settings: dict) -> int:\n    if settings.get(\"workers\"):\n        return int(settings[\"workers\"])\n    if hasattr(os, \"sched_getaffinity\"):\n        return max(len(os.sched_getaffinity(0)), 1)\n    return os.cpu_count() or 1\n\n\ndef chunk_size(settings: dict, sample: pd.DataFrame, in_flight: int) -> int:\n    \"\"\"Rows per chunk so that ``in_flight`` chunks stay within ``memory_mb``.\"\"\"\n    if settings.get(\"chunk_rows\"):\n        return int(settings[\"chunk_rows\"])\n    row_bytes = max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1.0)\n    budget = settings.get(\"memory_mb\", 1024) * 1024 * 1024\n    return max(int(budget / (row_bytes * EXPANSION * in_flight)), MIN_CHUNK_ROWS)\n\n\ndef predict_chunk(model, frame: pd.DataFrame) -> np.ndarray:\n    hook = getattr(features, \"add_features\", None)\n    if hook is not None:\n        frame = hook(frame)\n    return model.predict(frame)\n\n\ndef write_chunk(handle, preds: np.ndarray, sample_chunk, first: bool) -> None:\n    if sample_chunk is not None:\n        target_cols = [c for c in sample_chunk.columns if c != sample_chunk.columns[0]]\n        if len(target_cols) == 1:\n            sample_chunk[target_cols[0]] = preds\n        else:\n            for idx, col in enumerate(target_cols):\n                sample_chunk[col] = preds[:, idx]\n        frame = sample_chunk\n    else:\n        frame = pd.DataFrame({\"prediction\": preds})\n    frame.to_csv(handle, index=False, header=first)\n\n\ndef main() -> None:\n    config = load_config()\n    settings = config.get(\"predict\", {})\n    data_dir = (RUN_ROOT / \"src\" / config[\"data_dir\"]).resolve()\n    cache_dir = (RUN_ROOT / \"src\" / config.get(\"cache_dir\", \"../cache/data\")).resolve()\n    artifacts = RUN_ROOT / \"artifacts\"\n    # Memory-mapped arrays are shared by every worker thread instead of being copied onto the heap.\n    model = joblib.load(MODEL_PATH, mmap_mode=\"r\")\n    workers = worker_count(settings)\n    in_flight = 2 * workers\n    sample = next(iter_table(data_dir, cache_dir, \"test\", MIN_CHUNK_ROWS), pd.DataFrame())\n    chunk_rows = chunk_size(settings, sample, in_flight)\n    sample_path = data_dir / \"sample_submission.csv\"\n    sample_chunks = pd.read_csv(sample_path, chunksize=chunk_rows) if sample_path.exists() else None\n    output_path = artifacts / \"submission.csv\"\n    staging_path = output_path.with_name(\"submission.csv.tmp\")\n    pending = deque()\n    with ThreadPoolExecutor(max_workers=workers) as pool, open(staging_path, \"w\", encoding=\"utf-8\", newline=\"\") as handle:\n        first = True\n\n        def flush_one() -> None:\n            nonlocal first\n            preds = pending.popleft().result()\n            sample_chunk = next(sample_chunks) if sample_chunks is not None else None\n            write_chunk(handle, preds, sample_chunk, first)\n            first = False\n\n        for frame in iter_table(data_dir, cache_dir, \"test\", chunk_rows):\n            pending.append(pool.submit(predict_chunk, model, frame))\n            if len(pending) >= in_flight:\n                flush_one()\n        while pending:\n            flush_one()\n    os.replace(staging_path, output_path)\n\n\nif __name__ == \"__main__\":\n    main()\n""",
     "config.json": json.dumps(
         {
             "data_dir": "../data",
+            "cache_dir": "../cache/data",
+            "feature_cache_dir": "../cache/features",
             "seed": 42,
             "n_splits": 5,
+            "preprocessing": {"numeric_imputer": "median", "categorical_imputer": "most_frequent"},
+            "model": "random_forest",
             "model_params": {"n_estimators": 200, "random_state": 42},
+            "predict": {"chunk_rows": 0, "memory_mb": 1024, "workers": 0},
             "task_type": "",
             "target": "",
         },
         indent=2,
     ),
-    "features.py": """\"\"\"Feature hooks.\"\"\"\n""",
+    "features.py": """\"\"\"Feature hooks.\"\"\"\n\nfrom __future__ import annotations\n\nimport pandas as pd\n\n\ndef add_features(frame: pd.DataFrame) -> pd.DataFrame:\n    return frame\n""",
+    "data_cache.py": """\"\"\"Load input tables from the columnar cache built by `mlwego init`.\"\"\"\n\nfrom __future__ import annotations\n\nimport hashlib\nimport json\nfrom pathlib import Path\n\nimport numpy as np\nimport pandas as pd\n\n\ndef data_fingerprint(data_dir: Path) -> str:\n    digest = hashlib.sha256()\n    for path in sorted(data_dir.glob(\"*.csv\")):\n        stat = path.stat()\n        digest.update(f\"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\\n\".encode(\"utf-8\"))\n    return digest.hexdigest()[:16]\n\n\ndef load_profile(data_dir: Path, cache_root: Path):\n    \"\"\"The dataset profile written by `mlwego init`, or None if the data changed since.\"\"\"\n    path = cache_root / data_fingerprint(data_dir) / \"profile.json\"\n    if not path.exists():\n        return None\n    with open(path, \"r\", encoding=\"utf-8\") as handle:\n        return json.load(handle)\n\n\ndef load_table(data_dir: Path, cache_root: Path, name: str) -> pd.DataFrame:\n    table_dir = cache_root / data_fingerprint(data_dir) / name\n    if not (table_dir / \"manifest.json\").exists():\n        return pd.read_csv(data_dir / f\"{name}.csv\")\n    return ColumnarTable(table_dir).slice(0, None)\n\n\ndef iter_table(data_dir: Path, cache_root: Path, name: str, chunk_rows: int):\n    \"\"\"Yield the table in row order, ``chunk_rows`` rows at a time, without loading it whole.\"\"\"\n    table_dir = cache_root / data_fingerprint(data_dir) / name\n    if not (table_dir / \"manifest.json\").exists():\n        yield from pd.read_csv(data_dir / f\"{name}.csv\", chunksize=chunk_rows)\n        return\n    table = ColumnarTable(table_dir)\n    for start in range(0, table.n_rows, chunk_rows):\n        yield table.slice(start, start + chunk_rows)\n\n\nclass ColumnarTable:\n    def __init__(self, table_dir: Path) -> None:\n        with open(table_dir / \"manifest.json\", \"r\", encoding=\"utf-8\") as handle:\n            self.manifest = json.load(handle)\n        self.arrays = {}\n        self.categories = {}\n        for entry in self.manifest[\"columns\"]:\n            self.arrays[entry[\"name\"]] = np.load(table_dir / entry[\"file\"], mmap_mode=\"r\")\n            if entry[\"kind\"] != \"numeric\":\n                with open(table_dir / entry[\"categories\"], \"r\", encoding=\"utf-8\") as handle:\n                    self.categories[entry[\"name\"]] = json.load(handle)\n        self.n_rows = len(next(iter(self.arrays.values()))) if self.arrays else 0\n\n    def slice(self, start: int, stop) -> pd.DataFrame:\n        columns = {}\n        for entry in self.manifest[\"columns\"]:\n            values = np.asarray(self.arrays[entry[\"name\"]][start:stop])\n            if entry[\"kind\"] == \"numeric\":\n                columns[entry[\"name\"]] = pd.Series(values, copy=False)\n                continue\n            series = pd.Series(pd.Categorical.from_codes(values, categories=self.categories[entry[\"name\"]]))\n            columns[entry[\"name\"]] = series.astype(entry[\"dtype\"])\n        frame = pd.DataFrame(columns, copy=False)\n        frame.index = pd.RangeIndex(start, start + len(frame))\n        return frame\n""",
+    "feature_cache.py": """\"\"\"Cache preprocessed fold matrices so model-only changes skip preprocessing.\"\"\"\n\nfrom __future__ import annotations\n\nimport hashlib\nimport json\nimport os\nimport shutil\nfrom pathlib import Path\nfrom typing import Any, Dict, Optional\n\nimport joblib\nimport numpy as np\nfrom scipy import sparse\n\n# Least recently used keys are evicted beyond either limit; the key being written is never evicted.\nMAX_KEYS = 64\nMAX_BYTES = 4 * 1024**3\n\n\ndef file_digest(path: Path) -> str:\n    if not path.exists():\n        return \"\"\n    return hashlib.sha256(path.read_bytes()).hexdigest()\n\n\nclass FeatureCache:\n    def __init__(\n        self, root: Optional[Path], key_parts: Dict[str, Any], max_keys: int = MAX_KEYS, max_bytes: int = MAX_BYTES\n    ) -> None:\n        self.root = root\n        self.max_keys = max_keys\n        self.max_bytes = max_bytes\n        payload = json.dumps(key_parts, sort_keys=True, default=str)\n        self.key = hashlib.sha256(payload.encode(\"utf-8\")).hexdigest()[:24]\n\n    def load(self, fold: str) -> Optional[Dict[str, Any]]:\n        if self.root is None:\n            return None\n        entry = self.root / self.key / fold\n        manifest_path = entry / \"manifest.json\"\n        if not manifest_path.exists():\n            return None\n        with open(manifest_path, \"r\", encoding=\"utf-8\") as handle:\n            manifest = json.load(handle)\n        os.utime(self.root / self.key)\n        loaded: Dict[str, Any] = {}\n        for name, layout in manifest[\"matrices\"].items():\n            if layout[\"format\"] == \"csr\":\n                parts = [np.load(entry / f\"{name}.{part}.npy\", mmap_mode=\"r\") for part in (\"data\", \"indices\", \"indptr\")]\n                loaded[name] = sparse.csr_matrix(tuple(parts), shape=tuple(layout[\"shape\"]), copy=False)\n            else:\n                loaded[name] = np.load(entry / f\"{name}.npy\", mmap_mode=\"r\")\n        if manifest.get(\"preprocessor\"):\n            loaded[\"preprocessor\"] = joblib.load(entry / \"preprocessor.joblib\")\n        return loaded\n\n    def store(self, fold: str, matrices: Dict[str, Any], preprocessor: Any = None) -> None:\n        if self.root is None:\n            return\n        entry = self.root / self.key / fold\n        staging = entry.with_name(f\"{fold}.{os.getpid()}.tmp\")\n        if staging.exists():\n            shutil.rmtree(staging)\n        staging.mkdir(parents=True)\n        manifest: Dict[str, Any] = {\"matrices\": {}, \"preprocessor\": preprocessor is not None}\n        for name, matrix in matrices.items():\n            if sparse.issparse(matrix):\n                matrix = sparse.csr_matrix(matrix)\n                for part in (\"data\", \"indices\", \"indptr\"):\n                    np.save(staging / f\"{name}.{part}.npy\", getattr(matrix, part))\n                manifest[\"matrices\"][name] = {\"format\": \"csr\", \"shape\": list(matrix.shape)}\n            else:\n                np.save(staging / f\"{name}.npy\", np.asarray(matrix))\n                manifest[\"matrices\"][name] = {\"format\": \"dense\", \"shape\": list(np.shape(matrix))}\n        if preprocessor is not None:\n            joblib.dump(preprocessor, staging / \"preprocessor.joblib\")\n        with open(staging / \"manifest.json\", \"w\", encoding=\"utf-8\") as handle:\n            json.dump(manifest, handle)\n        try:\n            staging.replace(entry)\n        except OSError:\n            shutil.rmtree(staging, ignore_errors=True)\n        os.utime(self.root / self.key)\n        self.evict()\n\n    def evict(self) -> list[str]:\n        if self.root is None or not self.root.exists():\n            return []\n        entries = []\n        for entry in self.root.iterdir():\n            if entry.is_dir() and entry.name != self.key:\n                entries.append((entry.stat().st_mtime, _tree_size(entry), entry))\n        entries.sort()\n        total = sum(size for _, size, _ in entries) + _tree_size(self.root / self.key)\n        removed = []\n        while entries and (len(entries) + 1 > self.max_keys or total > self.max_bytes):\n            _, size, entry = entries.pop(0)\n            shutil.rmtree(entry, ignore_errors=True)\n            total -= size\n            removed.append(entry.name)\n        return removed\n\n\ndef _tree_size(path: Path) -> int:\n    total = 0\n    for root, _, files in os.walk(path):\n        for name in files:\n            try:\n                total += os.stat(os.path.join(root, name)).st_size\n            except OSError:\n                continue\n    return total\n""",
 }
 
 
@@ -34,18 +43,22 @@ def write_baseline_src(dest: Path) -> None:
         write_text(dest / name, content)
 
 
-def snapshot_src(src_dir: Path, snapshot_dir: Path) -> Path:
+def snapshot_src(src_dir: Path, snapshot_dir: Path, store: Optional[BlobStore] = None) -> Path:
     ensure_dir(snapshot_dir)
     target = snapshot_dir / "src"
-    if target.exists():
-        shutil.rmtree(target)
-    shutil.copytree(src_dir, target)
-    return target
+    if store is None:
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.copytree(src_dir, target)
+        return target
+    _, manifest = store.put_tree(src_dir)
+    return store.materialize(manifest, target)
 
 
 def hash_src(src_dir: Path) -> str:
-    digest = hashlib.sha256()
-    for path in sorted(src_dir.rglob("*")):
-        if path.is_file():
-            digest.update(path.read_bytes())
-    return digest.hexdigest()
+    """Merkle root over (path, content) of ``src_dir``; unchanged files are served from a stat cache."""
+    return _HASHER.tree_digest(src_dir)
+
+
+def blob_store(run_dir: Path) -> BlobStore:
+    return BlobStore(run_dir / "store", hasher=_HASHER)
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from mlwego.evaluation.evaluator import run_predict
+from mlwego.ui.cli import build_parser
+from mlwego.workspace.artifacts import MODEL_FILE, archive_model, node_model_path
+
+
+def test_archived_model_loads_memory_mapped(tmp_path: Path) -> None:
+    model = LinearRegression().fit(np.arange(20.0).reshape(10, 2), np.arange(10.0))
+    source = tmp_path / "artifacts" / MODEL_FILE
+    source.parent.mkdir(parents=True)
+    joblib.dump(model, source, compress=0)
+    assert node_model_path(tmp_path, "abc") is None
+
+    dest = archive_model(source, tmp_path, "abc")
+
+    assert dest == tmp_path / "artifacts" / "abc" / "model" / MODEL_FILE
+    assert not source.exists()
+    assert node_model_path(tmp_path, "abc") == dest
+    loaded = joblib.load(dest, mmap_mode="r")
+    assert isinstance(loaded.coef_, np.memmap)
+    assert archive_model(source, tmp_path, "abc") is None
+
+
+def test_run_predict_requires_node_model(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError, match="abc"):
+        run_predict(tmp_path, node_id="abc")
+
+
+def test_submit_without_a_trained_node_exits(tmp_path: Path) -> None:
+    args = build_parser().parse_args(["submit", "--out", str(tmp_path)])
+    with pytest.raises(SystemExit, match="No trained node"):
+        args.func(args)
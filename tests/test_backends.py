@@ -0,0 +1,41 @@
+from mlwego.search.backends import backend_config, choose_backend, encoded_width
+from mlwego.search.generator import baseline_candidates, random_candidates
+from mlwego.search.space import SEARCH_SPACES, search_space
+from mlwego.workspace.profiler import ColumnProfile, TableProfile
+
+
+def table(rows: int, numeric: int = 5, categories: tuple = ()) -> TableProfile:
+    columns = [ColumnProfile(f"x{idx}", "float64", "numeric", 0, rows) for idx in range(numeric)]
+    columns += [ColumnProfile(f"c{idx}", "object", "categorical", 0, card) for idx, card in enumerate(categories)]
+    columns.append(ColumnProfile("target", "int64", "numeric", 0, 2))
+    return TableProfile("train", rows, 0, 0, columns)
+
+
+def test_small_tables_get_a_random_forest() -> None:
+    assert choose_backend(table(5_000, categories=(12, 300)), "target") == "random_forest"
+    assert backend_config(table(5_000), "target", seed=7) == {
+        "model": "random_forest",
+        "model_params": {"n_estimators": 200, "random_state": 7},
+    }
+
+
+def test_large_or_wide_tables_get_histogram_boosting() -> None:
+    assert choose_backend(table(2_000_000), "target") == "hist_gradient_boosting"
+    assert choose_backend(table(20_000, numeric=12_000), "target") == "hist_gradient_boosting"
+
+
+def test_width_follows_the_categorical_encoding() -> None:
+    # One-hot, target-encoded, hashed and dropped (identifier) columns.
+    assert encoded_width(table(20_000, categories=(10, 300, 5_000, 19_990)), "target") == 5 + 10 + 1 + 32
+    assert choose_backend(table(20_000, categories=(15_000,)), "target") == "random_forest"
+
+
+def test_huge_tables_get_a_linear_model() -> None:
+    assert choose_backend(table(5_000_000, numeric=1_000), "target") == "sgd"
+
+
+def test_every_backend_has_candidates_in_its_space() -> None:
+    for model in SEARCH_SPACES:
+        space = search_space({"model": model})
+        for candidate in baseline_candidates(model) + random_candidates(3, model=model):
+            assert set(candidate.updates["model_params"]) <= set(space.params) | set(space.fixed)
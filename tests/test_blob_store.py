@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from mlwego.workspace.blob_store import BlobStore, SourceHasher
+from mlwego.workspace.file_ops import write_text
+
+
+def test_rename_changes_tree_hash(tmp_path: Path) -> None:
+    hasher = SourceHasher()
+    src = tmp_path / "src"
+    write_text(src / "a.py", "x = 1\n")
+    before = hasher.tree_digest(src)
+    (src / "a.py").rename(src / "b.py")
+    assert hasher.tree_digest(src) != before
+
+
+def test_snapshots_share_blobs_and_survive_edits(tmp_path: Path) -> None:
+    store = BlobStore(tmp_path / "store")
+    src = tmp_path / "src"
+    write_text(src / "train.py", "print('hi')\n")
+    write_text(src / "config.json", "{}")
+    first_hash, first = store.put_tree(src)
+    store.materialize(first, tmp_path / "node1")
+    write_text(src / "config.json", '{"seed": 1}')
+    second_hash, second = store.put_tree(src)
+    store.materialize(second, tmp_path / "node2")
+    assert first_hash != second_hash
+    assert len([path for path in (tmp_path / "store" / "blobs").rglob("*") if path.is_file()]) == 3
+    assert (tmp_path / "node1" / "train.py").stat().st_ino == (tmp_path / "node2" / "train.py").stat().st_ino
+    write_text(tmp_path / "node2" / "train.py", "print('edited')\n")
+    assert (tmp_path / "node1" / "train.py").read_text(encoding="utf-8") == "print('hi')\n"
+    assert store.load_manifest(first_hash) == first
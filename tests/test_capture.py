@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from mlwego.execution.capture import BoundedCapture, LogSink
+
+
+def test_bounded_capture_keeps_head_and_tail(tmp_path: Path) -> None:
+    sink = LogSink(tmp_path / "node.log")
+    capture = BoundedCapture(sink, head_chars=10, tail_chars=10)
+    for idx in range(100):
+        capture.write(f"line {idx:03d}\n")
+    sink.close()
+    text = capture.text()
+    assert capture.truncated
+    assert text.startswith("line 000\nl")
+    assert text.endswith("line 099\n")
+    assert "truncated" in text
+    assert (tmp_path / "node.log").read_text(encoding="utf-8").count("\n") == 100
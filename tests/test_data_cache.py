@@ -0,0 +1,52 @@
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mlwego.workspace.data_cache import build_data_cache, data_fingerprint
+from mlwego.workspace.snapshot import write_baseline_src
+
+
+def _generated_data_cache(tmp_path: Path):
+    write_baseline_src(tmp_path / "src")
+    spec = importlib.util.spec_from_file_location("data_cache", tmp_path / "src" / "data_cache.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _data(tmp_path: Path) -> Path:
+    data = tmp_path / "data"
+    data.mkdir()
+    pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "x": [0.5, np.nan, 2.0, -1.25],
+            "flag": [True, False, True, True],
+            "color": ["red", None, "blue", "red"],
+            "code": ["007", "010", "007", "x"],
+            "y": [0, 1, 1, 0],
+        }
+    ).to_csv(data / "train.csv", index=False)
+    return data
+
+
+def test_generated_fingerprint_matches_the_package(tmp_path: Path) -> None:
+    # train.py cannot import mlwego, so it carries its own copy of data_fingerprint; both must name the same cache.
+    generated = _generated_data_cache(tmp_path)
+    data = _data(tmp_path)
+    assert generated.data_fingerprint(data) == data_fingerprint(data)
+    (data / "test.csv").write_text("id\n5\n", encoding="utf-8")
+    assert generated.data_fingerprint(data) == data_fingerprint(data)
+
+
+def test_cached_table_round_trips(tmp_path: Path) -> None:
+    generated = _generated_data_cache(tmp_path)
+    data = _data(tmp_path)
+    build_data_cache(data, tmp_path / "cache")
+    assert (tmp_path / "cache" / data_fingerprint(data) / "train" / "manifest.json").exists()
+    cached = generated.load_table(data, tmp_path / "cache", "train")
+    pd.testing.assert_frame_equal(cached, pd.read_csv(data / "train.csv"))
+    chunks = list(generated.iter_table(data, tmp_path / "cache", "train", 3))
+    pd.testing.assert_frame_equal(pd.concat(chunks), pd.read_csv(data / "train.csv"))
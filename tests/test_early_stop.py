@@ -0,0 +1,29 @@
+import json
+
+from mlwego.evaluation.early_stop import FOLD_PREFIX, FoldMonitor
+
+
+def _line(fold: int, score: float) -> str:
+    return FOLD_PREFIX + json.dumps({"fold": fold, "score": score, "metric": "accuracy"}) + "\n"
+
+
+def test_monitor_aborts_only_when_confidently_worse() -> None:
+    reference = [0.90, 0.91, 0.89, 0.90, 0.92]
+    worse = FoldMonitor(lambda: reference)
+    assert worse("epoch 1\n") is False
+    assert worse(_line(0, 0.70)) is False
+    assert worse(_line(1, 0.72)) is True
+    assert worse.scores == [0.70, 0.72]
+    close = FoldMonitor(lambda: reference)
+    assert close(_line(0, 0.91)) is False
+    assert close(_line(1, 0.89)) is False
+
+
+def test_monitor_never_aborts_a_finished_cv() -> None:
+    reference = [0.90, 0.91, 0.89]
+    scores = [0.70, 0.80, 0.70]
+    unbounded = FoldMonitor(lambda: reference)
+    assert [unbounded(_line(fold, score)) for fold, score in enumerate(scores)] == [False, False, True]
+    # The last fold tips the test, but the CV is finished and train.py is about to write its metrics.
+    finished = FoldMonitor(lambda: reference, n_folds=3)
+    assert [finished(_line(fold, score)) for fold, score in enumerate(scores)] == [False, False, False]
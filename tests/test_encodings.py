@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from mlwego.evaluation.evaluator import evaluate_solution
+from mlwego.workspace.project_init import init_workspace
+
+ROWS = 3000
+
+
+def _run(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(0)
+    frames = {}
+    for name, rows in (("train", ROWS), ("test", 200)):
+        frames[name] = pd.DataFrame(
+            {
+                "x1": rng.normal(size=rows),
+                "color": rng.choice([f"c{idx}" for idx in range(5)], size=rows),
+                "city": rng.choice([f"city{idx}" for idx in range(50)], size=rows),
+                "street": rng.choice([f"street{idx}" for idx in range(1500)], size=rows),
+                "uid": [f"{name}-{idx}" for idx in range(rows)],
+            }
+        )
+    train = frames["train"]
+    train["target"] = ((train["x1"] > 0) ^ (train["color"] == "c0")).astype(int)
+    data = tmp_path / "data"
+    data.mkdir()
+    for name, frame in frames.items():
+        frame.to_csv(data / f"{name}.csv", index=False)
+    (tmp_path / "task.txt").write_text("Predict target.", encoding="utf-8")
+    return init_workspace(str(tmp_path / "task.txt"), str(data), str(tmp_path / "run"))
+
+
+def _train(run_dir: Path, **updates) -> dict:
+    config_path = run_dir / "src" / "config.json"
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    config.update(n_splits=2, **updates)
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+    evaluate_solution(run_dir, timeout=300)
+    return json.loads((run_dir / "artifacts" / "metrics.json").read_text(encoding="utf-8"))
+
+
+def test_train_encodes_categorical_columns_by_cardinality(tmp_path: Path) -> None:
+    run_dir = _run(tmp_path)
+    metrics = _train(run_dir, model_params={"n_estimators": 20, "random_state": 0})
+    assert metrics["encodings"] == {"color": "onehot", "city": "target", "street": "hash", "uid": "drop"}
+    # x1, five one-hot columns, one target-encoded column and 32 hashed columns; uid contributes nothing.
+    assert metrics["matrix"]["columns"] == 1 + 5 + 1 + 32
+    assert metrics["matrix"]["rows"] == ROWS // 2
+    assert metrics["score"] > 0.9
+
+    metrics = _train(run_dir, model="hist_gradient_boosting", model_params={"max_iter": 50, "random_state": 0})
+    assert metrics["encodings"]["color"] == "ordinal"
+    assert metrics["matrix"]["columns"] == 1 + 1 + 1 + 32
+    assert metrics["matrix"]["sparse"] is False
+    # The ordinal-coded column is split on as a category, not as a number.
+    model = joblib.load(run_dir / "artifacts" / "model.joblib").named_steps["model"]
+    assert model.is_categorical_.tolist() == [False, True] + [False] * 33
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mlwego.agent.controller import run_search
+from mlwego.evaluation.ensemble import PredictionMatrix, caruana_select
+from mlwego.search.policy import SearchPolicy
+from mlwego.workspace.project_init import init_workspace
+
+
+def _write_node(artifacts: Path, node_id: str, y_true: np.ndarray, oof: np.ndarray, test: np.ndarray) -> None:
+    node_dir = artifacts / node_id
+    node_dir.mkdir(parents=True)
+    (node_dir / "metrics.json").write_text(json.dumps({"metric": "rmse", "classes": None}), encoding="utf-8")
+    np.save(node_dir / "oof_target.npy", y_true)
+    np.save(node_dir / "oof.npy", oof)
+    np.save(node_dir / "test_pred.npy", test)
+
+
+def test_blend_of_offsetting_errors_beats_single_nodes(tmp_path: Path) -> None:
+    y_true = np.linspace(0.0, 1.0, 100)
+    artifacts = tmp_path / "artifacts"
+    _write_node(artifacts, "high", y_true, y_true + 0.2, np.full(10, 1.0))
+    _write_node(artifacts, "low", y_true, y_true - 0.2, np.full(10, 3.0))
+    _write_node(artifacts, "noisy", y_true, y_true + 0.5, np.full(10, 9.0))
+    matrix = PredictionMatrix.build(tmp_path, ["high", "low", "noisy"], tmp_path / "ensemble")
+    assert matrix.oof.shape == (3, 100, 1)
+    result = caruana_select(matrix, rounds=10)
+    assert np.allclose(result.weights, [0.5, 0.5, 0.0])
+    assert result.score > result.single_scores.max()
+    assert np.allclose(matrix.blend_test(result.weights), 2.0)
+
+
+def test_string_labels_are_rescored_and_blended(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    data = tmp_path / "data"
+    data.mkdir()
+    train = pd.DataFrame({"x1": rng.normal(size=150), "x2": rng.normal(size=150)})
+    train["target"] = np.where(train["x1"] + 0.5 * rng.normal(size=150) > 0, "yes", "no")
+    train.to_csv(data / "train.csv", index=False)
+    train.drop(columns="target").head(20).to_csv(data / "test.csv", index=False)
+    (tmp_path / "task.txt").write_text("Predict target.", encoding="utf-8")
+    run_dir = init_workspace(str(tmp_path / "task.txt"), str(data), str(tmp_path / "run"))
+    config_path = run_dir / "src" / "config.json"
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    config.update(n_splits=2, model_params={"n_estimators": 20, "random_state": 0})
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+
+    tree, _ = run_search(run_dir, SearchPolicy(budget=1, early_abort=False), timeout=300, use_cache=False)
+    node_ids = [node.node_id for node in tree.nodes.values() if node.status == "ok"]
+    # The targets and predictions load without pickle, so every node is re-scored from its OOF predictions.
+    assert len(node_ids) == 2 and all(tree.nodes[node_id].metrics for node_id in node_ids)
+    matrix = PredictionMatrix.build(run_dir, node_ids, run_dir / "ensemble")
+    assert set(matrix.y_true) == {"yes", "no"}
+    assert set(matrix.blend_test(caruana_select(matrix, rounds=3).weights)) <= {"yes", "no"}
@@ -0,0 +1,49 @@
+import importlib.util
+import os
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from mlwego.workspace.snapshot import write_baseline_src
+
+
+def _feature_cache(tmp_path: Path):
+    write_baseline_src(tmp_path / "src")
+    spec = importlib.util.spec_from_file_location("feature_cache", tmp_path / "src" / "feature_cache.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.FeatureCache
+
+
+def test_hit_and_miss_after_a_key_change(tmp_path: Path) -> None:
+    FeatureCache = _feature_cache(tmp_path)
+    root = tmp_path / "features"
+    cache = FeatureCache(root, {"preprocessing": {}, "seed": 42})
+    assert cache.load("fold_0") is None
+    dense = np.arange(12.0).reshape(4, 3)
+    cache.store("fold_0", {"train": dense, "valid": sparse.csr_matrix(np.eye(3))})
+    loaded = FeatureCache(root, {"preprocessing": {}, "seed": 42}).load("fold_0")
+    assert np.array_equal(loaded["train"], dense)
+    assert np.array_equal(loaded["valid"].toarray(), np.eye(3))
+    assert FeatureCache(root, {"preprocessing": {"numeric_imputer": "mean"}, "seed": 42}).load("fold_0") is None
+
+
+def test_least_recently_used_keys_are_evicted(tmp_path: Path) -> None:
+    FeatureCache = _feature_cache(tmp_path)
+    root = tmp_path / "features"
+    caches = [FeatureCache(root, {"seed": seed}, max_keys=2) for seed in range(3)]
+    for cache in caches[:2]:
+        cache.store("fold_0", {"train": np.ones((10, 2))})
+    os.utime(root / caches[0].key, (0, 0))
+    os.utime(root / caches[1].key, (1, 1))
+    # Loading marks caches[0] as used, leaving caches[1] the oldest.
+    assert caches[0].load("fold_0") is not None
+    caches[2].store("fold_0", {"train": np.ones((10, 2))})
+    assert caches[1].load("fold_0") is None
+    assert caches[0].load("fold_0") is not None and caches[2].load("fold_0") is not None
+
+    small = FeatureCache(root, {"seed": 3}, max_bytes=1)
+    small.store("fold_0", {"train": np.ones((10, 2))})
+    # A size limit below one entry keeps only the key just written.
+    assert sorted(path.name for path in root.iterdir()) == [small.key]
@@ -0,0 +1,10 @@
+from mlwego.search.halving import fidelity_levels, fidelity_updates, promote
+from mlwego.search.policy import SearchPolicy
+
+
+def test_halving_schedule_promotes_top_fraction() -> None:
+    levels = fidelity_levels(SearchPolicy(eta=3, rungs=3))
+    assert levels == [1 / 9, 1 / 3, 1.0]
+    assert fidelity_updates(1.0) == {}
+    assert fidelity_updates(1 / 3, n_splits=5)["fidelity"]["n_splits"] == 2
+    assert promote([0.1, 0.9, 0.5, 0.9, 0.2, 0.3], eta=3) == [1, 3]
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mlwego.llm.ollama_client import OllamaClient
+from mlwego.llm.response_cache import ResponseCache
+
+WORDS = ["Use ", "gradient ", "boosting."]
+
+
+class FakeOllama(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.connections = 0
+        self.payloads: list = []
+        super().__init__(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def host(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.payloads.append(payload)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        lines = [{"message": {"role": "assistant", "content": word}, "done": False} for word in WORDS]
+        if payload.get("tools"):
+            lines.append({"message": {"role": "assistant", "content": "", "tool_calls": [{"function": {"name": "run"}}]}, "done": False})
+        lines.append({"message": {"role": "assistant", "content": ""}, "done": True, "eval_count": 3, "eval_duration": 30_000_000})
+        for line in lines:
+            time.sleep(self.server.delay)
+            data = (json.dumps(line) + "\n").encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+@pytest.fixture()
+def server():
+    fake = FakeOllama()
+    yield fake
+    fake.shutdown()
+    fake.server_close()
+
+
+def test_chat_streams_tokens_over_one_kept_alive_connection(server: FakeOllama) -> None:
+    client = OllamaClient(host=server.host)
+    tokens: list = []
+    for _ in range(3):
+        response = client.chat("m", [{"role": "user", "content": "hi"}], on_token=tokens.append)
+        assert response.message == {"role": "assistant", "content": "".join(WORDS)}
+    assert tokens == WORDS * 3
+    assert server.connections == 1 and client.pool.opened == 1
+    assert server.payloads[0]["stream"] is True
+    metrics = response.metrics
+    assert metrics is not None and 0 < metrics.ttft <= metrics.total
+    assert metrics.tokens_per_s == pytest.approx(100.0)
+    response = client.chat("m", [], tools=[{"type": "function"}])
+    assert client.format_tool_calls(response) == [{"function": {"name": "run"}}]
+    client.close()
+
+
+def test_abandoned_stream_does_not_poison_the_pool(server: FakeOllama) -> None:
+    client = OllamaClient(host=server.host, pool_size=1)
+    with client.stream("m", []) as chat_stream:
+        assert next(iter(chat_stream)) == WORDS[0]
+    assert client.chat("m", []).message["content"] == "".join(WORDS)
+    client.close()
+
+
+def test_async_chats_run_concurrently(server: FakeOllama) -> None:
+    server.delay = 0.05
+    client = OllamaClient(host=server.host, pool_size=4)
+
+    async def main():
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.achat("m", [{"role": "user", "content": str(i)}]) for i in range(4)))
+        elapsed = time.perf_counter() - start
+        streamed = [token async for token in client.astream("m", [])]
+        return responses, elapsed, streamed
+
+    responses, elapsed, streamed = asyncio.run(main())
+    assert all(r.message["content"] == "".join(WORDS) for r in responses)
+    # Each chat takes at least 4 x 50 ms; run one after another they would need 0.8 s.
+    assert elapsed < 0.6
+    assert streamed == WORDS
+    client.close()
+
+
+def test_deterministic_chats_are_served_from_the_cache(server: FakeOllama, tmp_path) -> None:
+    client = OllamaClient(host=server.host, cache=ResponseCache(tmp_path / "llm.sqlite"))
+    messages = [{"role": "user", "content": "hi"}]
+    first = client.chat("m", messages)
+    tokens: list = []
+    second = client.chat("m", messages, on_token=tokens.append)
+    client.chat("m", messages, temperature=0.7)
+    assert not first.cached and second.cached
+    assert second.message == first.message and tokens == ["".join(WORDS)]
+    assert len(server.payloads) == 2
+    stats = client.cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bypassed"]) == (1, 1, 1)
+    client.close()
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlwego.agent import controller
+from mlwego.agent.controller import EvalContext, run_search
+from mlwego.search.generator import CandidateEdit
+from mlwego.search.policy import SearchPolicy
+from mlwego.workspace.project_init import init_workspace
+
+
+def _run(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(0)
+    data = tmp_path / "data"
+    data.mkdir()
+    train = pd.DataFrame({"x1": rng.normal(size=150), "x2": rng.normal(size=150)})
+    train["target"] = (train["x1"] + 0.5 * rng.normal(size=150) > 0).astype(int)
+    train.to_csv(data / "train.csv", index=False)
+    train.drop(columns="target").head(20).to_csv(data / "test.csv", index=False)
+    (tmp_path / "task.txt").write_text("Predict target.", encoding="utf-8")
+    run_dir = init_workspace(str(tmp_path / "task.txt"), str(data), str(tmp_path / "run"))
+    config_path = run_dir / "src" / "config.json"
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    config.update(n_splits=2, model_params={"n_estimators": 20, "random_state": 0})
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+    return run_dir
+
+
+def test_parallel_candidates_train_in_isolated_workspaces(tmp_path: Path) -> None:
+    run_dir = _run(tmp_path)
+    tree, _ = run_search(run_dir, SearchPolicy(budget=2, early_abort=False), timeout=300, jobs=2, use_cache=False)
+    assert len(tree.nodes) == 3
+    for node in tree.nodes.values():
+        # Each node's artifacts come from its own workspace, not from a neighbour that finished at the same time.
+        metrics = json.loads((run_dir / "artifacts" / node.node_id / "metrics.json").read_text(encoding="utf-8"))
+        assert metrics["score"] == node.score
+    assert not any((run_dir / "workspaces").iterdir())
+
+
+def test_failed_parallel_evaluation_removes_every_workspace(tmp_path: Path, monkeypatch) -> None:
+    run_dir = _run(tmp_path)
+    real_evaluate = controller._evaluate
+
+    def evaluate(workspace, node_hash, context, fidelity):
+        if workspace.name == "candidate_001":
+            raise RuntimeError("disk full")
+        return real_evaluate(workspace, node_hash, context, fidelity)
+
+    monkeypatch.setattr(controller, "_evaluate", evaluate)
+    candidates = [CandidateEdit(f"{trees} trees", {"model_params": {"n_estimators": trees}}) for trees in (10, 30, 40)]
+    baseline = (run_dir / "src" / "config.json").read_text(encoding="utf-8")
+    with pytest.raises(RuntimeError, match="disk full"):
+        controller._evaluate_parallel(run_dir, baseline, candidates, EvalContext(timeout=300, jobs=2), 1.0)
+    assert not any((run_dir / "workspaces").iterdir())
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+
+import pytest
+
+from mlwego.agent.pipeline import Pipeline
+from mlwego.llm.ollama_client import OllamaResponse
+from mlwego.search.llm_generator import LLMGenerator, parse_edits
+from mlwego.search.solution_tree import SolutionNode
+
+STEP = 0.15
+
+
+def test_pipeline_overlaps_proposal_with_evaluation():
+    counter = iter(range(100))
+    recorded = []
+
+    def propose(count, pending):
+        time.sleep(STEP)
+        return [next(counter) for _ in range(count)]
+
+    def evaluate(worker, item):
+        time.sleep(STEP)
+        return item * 2
+
+    pipeline = Pipeline(propose, evaluate, lambda item, result: recorded.append(result))
+    start = time.perf_counter()
+    stats = pipeline.run(budget=6, batch_size=1)
+    elapsed = time.perf_counter() - start
+    assert recorded == [0, 2, 4, 6, 8, 10]
+    assert stats.proposed == stats.evaluated == 6
+    # Proposing and evaluating one after the other would take 12 steps.
+    assert elapsed < 10 * STEP
+
+
+def test_pipeline_producer_stays_within_queue_bound():
+    counter = iter(range(100))
+    proposed = []
+    recorded = []
+    leads = []
+
+    def propose(count, pending):
+        leads.append(len(proposed) - len(recorded))
+        items = [next(counter) for _ in range(count)]
+        proposed.extend(items)
+        return items
+
+    def evaluate(worker, item):
+        time.sleep(0.02)
+        return item
+
+    pipeline = Pipeline(propose, evaluate, lambda item, result: recorded.append(item), queue_size=2)
+    stats = pipeline.run(budget=12, batch_size=1)
+    assert stats.evaluated == 12
+    # At most queue_size items wait in the queue and one is being evaluated.
+    assert max(leads) <= 3
+
+
+def test_pipeline_skips_duplicates_and_stops_when_out_of_ideas():
+    recorded = []
+    pipeline = Pipeline(lambda count, pending: ["same"], lambda worker, item: item, lambda item, result: recorded.append(item))
+    stats = pipeline.run(budget=5)
+    assert recorded == ["same"]
+    assert stats.duplicates >= pipeline.max_idle_rounds
+
+
+def test_deterministic_proposer_waits_for_results_and_uses_the_budget():
+    recorded = []
+
+    def propose(count, pending):
+        # Like an LLM at temperature 0: the same state gives the same proposals, so most rounds repeat themselves.
+        done = len(recorded)
+        return [f"edit-{done + offset}" for offset in range(count)]
+
+    def evaluate(worker, item):
+        time.sleep(0.02)
+        return item
+
+    pipeline = Pipeline(propose, evaluate, lambda item, result: recorded.append(item), workers=2)
+    stats = pipeline.run(budget=10, batch_size=2)
+    assert stats.proposed == stats.evaluated == 10
+    assert len(set(recorded)) == 10
+    assert stats.duplicates > 0
+
+
+def test_pipeline_propagates_evaluation_errors():
+    def evaluate(worker, item):
+        raise RuntimeError("boom")
+
+    counter = iter(range(100))
+    pipeline = Pipeline(lambda count, pending: [next(counter)], evaluate, lambda item, result: None, workers=2)
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run(budget=10, batch_size=1)
+
+
+class ScriptedChat:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def chat(self, model, messages, tools=None, temperature=0.0):
+        with self.lock:
+            self.calls.append(messages)
+            return OllamaResponse(message=self.replies.pop(0), raw={})
+
+
+def _tool_call(description, updates):
+    return {"function": {"name": "propose_edit", "arguments": {"description": description, "updates": updates}}}
+
+
+def test_llm_generator_merges_tool_call_edits_into_parent_config():
+    parent = SolutionNode(node_id="a" * 64, parent_id=None, score=0.9, score_std=0.01, diff="")
+    config = json.dumps({"seed": 42, "model_params": {"n_estimators": 200, "random_state": 42}})
+    chat = ScriptedChat(
+        [
+            {
+                "content": "",
+                "tool_calls": [
+                    _tool_call("More trees", {"model_params": {"n_estimators": 500}}),
+                    _tool_call("Change the seed", {"seed": 1}),
+                ],
+            }
+        ]
+    )
+    generator = LLMGenerator(chat, "fake", "Predict the target.", "train: 10 rows")
+    edits = generator.propose([parent], parent, config, count=2)
+    assert len(edits) == 1
+    assert edits[0].parent_id == parent.node_id
+    assert edits[0].updates == {"model_params": {"n_estimators": 500, "random_state": 42}}
+    user = chat.calls[0][1]["content"]
+    assert "Predict the target." in user and '"n_estimators": 200' in user
+
+    chat.replies.append({"content": "[]"})
+    generator.propose([parent], parent, config, count=2, pending=edits)
+    assert '"n_estimators": 500' in chat.calls[1][1]["content"]
+
+
+def test_parse_edits_reads_json_from_text_replies():
+    content = 'Try this:\n```json\n[{"description": "Shallower", "updates": {"model_params": {"max_depth": 6}}}]\n```'
+    edits = parse_edits(OllamaResponse(message={"role": "assistant", "content": content}, raw={}))
+    assert [edit.updates for edit in edits] == [{"model_params": {"max_depth": 6}}]
+    assert parse_edits(OllamaResponse(message={"content": "no idea"}, raw={})) == []
+
+
+def test_parse_edits_skips_malformed_tool_calls():
+    calls = [
+        {"function": {"name": "propose_edit", "arguments": '{"description": "Deeper", "updates": {"model_params": '}},
+        {"function": {"name": "propose_edit", "arguments": '{"updates": {"model_params": {"max_depth": 8}}}'}},
+    ]
+    edits = parse_edits(OllamaResponse(message={"role": "assistant", "content": "", "tool_calls": calls}, raw={}))
+    assert [edit.updates for edit in edits] == [{"model_params": {"max_depth": 8}}]
+    assert parse_edits(OllamaResponse(message={"content": "", "tool_calls": calls[:1]}, raw={})) == []
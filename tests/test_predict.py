@@ -0,0 +1,50 @@
+import json
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from mlwego.evaluation.evaluator import evaluate_solution, run_predict
+from mlwego.workspace.project_init import init_workspace
+
+
+def _frame(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    frame = pd.DataFrame(
+        {
+            "id": rng.permutation(np.arange(1000, 1000 + rows)),
+            "x1": rng.normal(size=rows),
+            "x2": rng.normal(size=rows),
+            "color": rng.choice(["red", "green", "blue"], size=rows),
+        }
+    )
+    frame.loc[frame.sample(frac=0.1, random_state=0).index, "x2"] = np.nan
+    return frame
+
+
+def test_chunked_parallel_predict_matches_whole_table_predict(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    data = tmp_path / "data"
+    data.mkdir()
+    train = _frame(120, rng)
+    train["target"] = (train["x1"] + (train["color"] == "red") > 0.5).astype(int)
+    test = _frame(53, rng)
+    train.to_csv(data / "train.csv", index=False)
+    test.to_csv(data / "test.csv", index=False)
+    test[["id"]].assign(target=0).to_csv(data / "sample_submission.csv", index=False)
+    (tmp_path / "task.txt").write_text("Predict target.", encoding="utf-8")
+    run_dir = init_workspace(str(tmp_path / "task.txt"), str(data), str(tmp_path / "run"))
+
+    config_path = run_dir / "src" / "config.json"
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    config["model_params"]["n_estimators"] = 20
+    # Eight chunks of at most 7 rows, predicted by three threads and written back in order.
+    config["predict"] = {"chunk_rows": 7, "workers": 3}
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+    evaluate_solution(run_dir, timeout=300)
+    assert run_predict(run_dir).exit_code == 0
+
+    submission = pd.read_csv(run_dir / "artifacts" / "submission.csv")
+    model = joblib.load(run_dir / "artifacts" / "model.joblib")
+    assert submission["id"].tolist() == test["id"].tolist()
+    assert submission["target"].tolist() == model.predict(test).tolist()
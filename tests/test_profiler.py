@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlwego.agent.tools import ToolContext
+from mlwego.evaluation.infer_task import infer_task
+from mlwego.workspace.profiler import HyperLogLog, load_profile, profile_path, profile_table
+
+
+def test_hyperloglog_estimates_within_a_few_percent() -> None:
+    for n in (20, 50_000):
+        sketch = HyperLogLog()
+        values = pd.Series(np.arange(n, dtype=np.float64))
+        sketch.add_hashes(pd.util.hash_pandas_object(pd.concat([values, values]), index=False).to_numpy())
+        assert abs(sketch.estimate() / n - 1) < 0.03
+
+
+def test_chunked_profile_matches_full_read(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "count": rng.integers(0, 50, size=1000),
+        "city": rng.choice(["a", "b", "c"], size=1000),
+        "label": rng.integers(0, 2, size=1000),
+    })
+    frame.loc[900:, "count"] = np.nan
+    frame.to_csv(tmp_path / "train.csv", index=False)
+
+    table = profile_table(tmp_path / "train.csv", chunk_rows=128)
+
+    full = pd.read_csv(tmp_path / "train.csv")
+    assert table.rows == 1000
+    assert table.dtypes() == {name: str(dtype) for name, dtype in full.dtypes.items()}
+    count = table.column("count")
+    assert count.nulls == 100 and count.kind == "numeric"
+    assert (count.min, count.max) == (full["count"].min(), full["count"].max())
+    assert count.cardinality == full["count"].nunique()
+    assert table.column("city").kind == "categorical" and table.column("city").cardinality == 3
+
+
+def test_profile_is_saved_and_reused(tmp_path: Path) -> None:
+    data = tmp_path / "data"
+    data.mkdir()
+    pd.DataFrame({"id": range(50), "x": np.linspace(0, 1, 50), "y": np.linspace(0, 5, 50)}).to_csv(data / "train.csv", index=False)
+    pd.DataFrame({"id": range(10), "x": np.linspace(0, 1, 10)}).to_csv(data / "test.csv", index=False)
+    pd.DataFrame({"id": range(10), "y": 0.0}).to_csv(data / "sample_submission.csv", index=False)
+    cache = tmp_path / "cache"
+
+    profile = load_profile(data, cache)
+
+    assert profile_path(data, cache).exists()
+    info = infer_task(data, "minimise RMSE", profile=load_profile(data, cache))
+    assert (info.target, info.task_type, info.metric) == ("y", "regression", "rmse")
+    assert (info.id_column, info.target_columns) == ("id", ["y"])
+    tools = ToolContext(tmp_path, cache_root=cache)
+    assert tools.parse_csv_schema("data/train.csv") == profile.tables["train"].dtypes()
+    assert tools.describe_csv("data/test.csv")["rows"] == 10
+
+
+def test_infer_task_without_test_table_and_without_train(tmp_path: Path) -> None:
+    data = tmp_path / "data"
+    data.mkdir()
+    pd.DataFrame({"x": np.linspace(0, 1, 30), "label": [0, 1, 2] * 10}).to_csv(data / "train.csv", index=False)
+    # Without test.csv the last train column is taken as the target, as when no column is missing from test.
+    info = infer_task(data, profile=load_profile(data, tmp_path / "cache"))
+    assert (info.target, info.task_type) == ("label", "classification")
+    (data / "train.csv").unlink()
+    with pytest.raises(ValueError, match="train.csv"):
+        infer_task(data, profile=load_profile(data, tmp_path / "other"))
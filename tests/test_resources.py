@@ -0,0 +1,53 @@
+import signal
+import threading
+from pathlib import Path
+
+from mlwego.execution.resources import ResourceManager
+from mlwego.execution.sandbox import classify_failure, run_python
+
+
+def test_acquire_queues_until_budget_is_released() -> None:
+    manager = ResourceManager(cpus=[0, 1], memory_mb=1000)
+    first = manager.acquire(2, 600)
+    grant = first.__enter__()
+    assert grant.cpus == [0, 1]
+    assert grant.thread_env()["OMP_NUM_THREADS"] == "2"
+    acquired = threading.Event()
+
+    def second() -> None:
+        with manager.acquire(1, 600):
+            acquired.set()
+
+    worker = threading.Thread(target=second)
+    worker.start()
+    assert not acquired.wait(0.2)
+    first.__exit__(None, None, None)
+    worker.join(timeout=5)
+    assert acquired.is_set()
+
+
+def test_memory_cap_reports_oom(tmp_path: Path) -> None:
+    script = tmp_path / "hog.py"
+    script.write_text("import time\nblob = b'x' * (512 * 1024 * 1024)\ntime.sleep(30)\n", encoding="utf-8")
+    manager = ResourceManager(memory_mb=256)
+    with manager.acquire(1, 256) as grant:
+        result = run_python(script, cwd=tmp_path, timeout=30, grant=grant)
+    assert result.exit_code != 0
+    assert result.failure == "oom"
+    assert result.runtime < 20
+
+
+def test_memory_cap_ignores_untouched_reservations(tmp_path: Path) -> None:
+    # Address space that is reserved but never touched (thread stacks, allocator arenas) is not resident memory.
+    script = tmp_path / "reserve.py"
+    script.write_text("import mmap\narea = mmap.mmap(-1, 1024 * 1024 * 1024)\nprint('ok')\n", encoding="utf-8")
+    manager = ResourceManager(memory_mb=256)
+    with manager.acquire(1, 256) as grant:
+        result = run_python(script, cwd=tmp_path, timeout=30, grant=grant)
+    assert result.exit_code == 0 and result.stdout == "ok\n"
+
+
+def test_only_confirmed_kills_are_oom() -> None:
+    assert classify_failure(-signal.SIGKILL, "") == "error"
+    assert classify_failure(-signal.SIGKILL, "", oom_killed=True) == "oom"
+    assert classify_failure(1, "MemoryError") == "oom"
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from mlwego.llm.response_cache import ResponseCache, is_deterministic, request_key
+
+
+def test_key_ignores_transport_fields_and_dict_order() -> None:
+    first = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "options": {"temperature": 0.0}, "stream": True}
+    second = {"stream": False, "options": {"temperature": 0.0}, "messages": [{"content": "hi", "role": "user"}], "model": "m"}
+    assert request_key(first) == request_key(second)
+    assert request_key(first) != request_key({**first, "tools": [{"type": "function"}]})
+    assert is_deterministic(first)
+    assert not is_deterministic({**first, "options": {"temperature": 0.7}})
+    assert not is_deterministic({"model": "m"})
+
+
+def test_lru_eviction_and_stats(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "llm.sqlite", max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, "m", {"message": {"content": key}})
+    assert cache.get("a") == {"message": {"content": "a"}}
+    cache.put("c", "m", {"message": {"content": "c"}})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evicted"], stats["entries"]) == (3, 1, 1, 2)
+    cache.close()
+    reopened = ResponseCache(tmp_path / "llm.sqlite", max_entries=2)
+    assert reopened.stats()["hits"] == 3
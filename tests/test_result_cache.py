@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+from mlwego.evaluation.evaluator import EvalResult
+from mlwego.evaluation.result_cache import ResultCache
+from mlwego.execution.sandbox import ExecutionResult
+
+
+def _result(score: float) -> EvalResult:
+    train_result = ExecutionResult(exit_code=0, runtime=1.0, stdout="", stderr="", command=[], cwd=".")
+    return EvalResult(score=score, score_std=0.0, metric="accuracy", train_result=train_result)
+
+
+def _artifacts(path: Path, score: float) -> Path:
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "metrics.json").write_text(json.dumps({"score": score}), encoding="utf-8")
+    return path
+
+
+def test_hit_restores_result_and_artifacts(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache")
+    key = cache.key("src", "data")
+    assert cache.get(key, tmp_path / "out") is None
+    cache.put(key, _result(0.9), _artifacts(tmp_path / "a", 0.9))
+    hit = cache.get(key, tmp_path / "out")
+    assert hit is not None and hit.cached and hit.score == 0.9
+    assert json.loads((tmp_path / "out" / "metrics.json").read_text(encoding="utf-8")) == {"score": 0.9}
+    assert cache.get(cache.key("src", "other data"), tmp_path / "out") is None
+
+
+def test_eviction_drops_least_recently_used(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache", max_entries=2)
+    artifacts = _artifacts(tmp_path / "a", 0.5)
+    keys = [cache.key(f"src{idx}", "data") for idx in range(3)]
+    cache.put(keys[0], _result(0.1), artifacts)
+    cache.put(keys[1], _result(0.2), artifacts)
+    os.utime(cache._entry_dir(keys[0]), (0, 0))
+    # A hit marks the entry as used, leaving keys[1] the least recently used.
+    cache.get(keys[0], tmp_path / "out")
+    os.utime(cache._entry_dir(keys[1]), (1, 1))
+    cache.put(keys[2], _result(0.3), artifacts)
+    assert cache.get(keys[1], tmp_path / "out") is None
+    assert cache.get(keys[0], tmp_path / "out").score == 0.1
+    assert cache.get(keys[2], tmp_path / "out").score == 0.3
+
+
+def test_concurrent_puts_leave_one_complete_entry(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache")
+    key = cache.key("src", "data")
+    errors = []
+
+    def put(idx: int) -> None:
+        try:
+            for _ in range(5):
+                cache.put(key, _result(idx / 10), _artifacts(tmp_path / f"a{idx}", idx / 10))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=put, args=(idx,)) for idx in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    hit = cache.get(key, tmp_path / "out")
+    metrics = json.loads((tmp_path / "out" / "metrics.json").read_text(encoding="utf-8"))
+    assert metrics["score"] == hit.score
+    assert not list((tmp_path / "cache").glob("*/*.tmp"))
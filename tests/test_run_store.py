@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlwego.ui import cli
+from mlwego.ui.cli import build_parser
+from mlwego.workspace.project_init import init_workspace
+from mlwego.workspace.run_store import RunStore, run_id_for
+
+
+def _node(run_id: str, node_id: str, score: float, fidelity: float = 1.0, status: str = "ok") -> dict:
+    return {"run_id": run_id, "node_id": node_id, "score": score, "metric": "accuracy", "fidelity": fidelity, "status": status}
+
+
+def test_best_query_and_leaderboard(tmp_path: Path) -> None:
+    store = RunStore(tmp_path / "runs.sqlite")
+    first = store.record_run(tmp_path / "run_a", "titanic")
+    second = store.record_run(tmp_path / "run_b", "titanic")
+    store.record_node(_node(first, "a1", 0.80), [0.79, 0.81])
+    store.record_node(_node(first, "a2", 0.95, fidelity=0.33))
+    store.record_node(_node(first, "a3", 0.99, status="aborted"))
+    store.record_node(_node(second, "b1", 0.85))
+    assert store.best(first)["node_id"] == "a1"
+    assert store.fold_scores(first, "a1") == [0.79, 0.81]
+    assert [row["node_id"] for row in store.query(status="ok", min_fidelity=1.0)] == ["b1", "a1"]
+    assert [row["node_id"] for row in store.leaderboard(task="titanic")] == ["b1", "a1"]
+    assert store.sql("SELECT COUNT(*) AS n FROM nodes") == [{"n": 4}]
+
+
+def test_best_falls_back_to_legacy_summaries(tmp_path: Path, capsys) -> None:
+    run_dir = tmp_path / "run"
+    (run_dir / "logs").mkdir(parents=True)
+    # Summaries written before fidelity was recorded.
+    summaries = [{"node_id": "a", "score": 0.8, "metric": "accuracy"}, {"node_id": "b", "score": 0.9, "metric": "accuracy"}]
+    (run_dir / "logs" / "summary.json").write_text(json.dumps(summaries), encoding="utf-8")
+    args = build_parser().parse_args(["best", "--out", str(run_dir), "--db", str(tmp_path / "runs.sqlite")])
+    args.func(args)
+    assert json.loads(capsys.readouterr().out) == {"node_id": "b", "score": 0.9, "metric": "accuracy", "fidelity": None}
+
+
+def _run_dir(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(0)
+    data = tmp_path / "data"
+    data.mkdir()
+    train = pd.DataFrame({"x1": rng.normal(size=100), "x2": rng.normal(size=100)})
+    train["target"] = (train["x1"] > 0).astype(int)
+    train.to_csv(data / "train.csv", index=False)
+    train.drop(columns="target").head(10).to_csv(data / "test.csv", index=False)
+    (tmp_path / "task.txt").write_text("Predict target.", encoding="utf-8")
+    run_dir = init_workspace(str(tmp_path / "task.txt"), str(data), str(tmp_path / "run"))
+    config_path = run_dir / "src" / "config.json"
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    config.update(n_splits=2, model_params={"n_estimators": 10, "random_state": 0})
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+    return run_dir
+
+
+def test_run_records_each_node_with_its_own_artifact_dir(tmp_path: Path) -> None:
+    run_dir = _run_dir(tmp_path)
+    db = str(tmp_path / "runs.sqlite")
+    args = build_parser().parse_args(["run", "--out", str(run_dir), "--budget", "1", "--cold-start", "--db", db])
+    args.func(args)
+    with RunStore(Path(db)) as store:
+        rows = store.query(run_id=run_id_for(run_dir))
+    assert len(rows) == 2
+    for row in rows:
+        # The root included: the shared artifacts/ only holds whichever node ran last.
+        assert row["artifact_dir"] == str(run_dir.resolve() / "artifacts" / row["node_id"])
+        assert (Path(row["artifact_dir"]) / "src" / "config.json").exists()
+
+
+def test_run_closes_the_store_when_the_search_fails(tmp_path: Path, monkeypatch) -> None:
+    closed = []
+    monkeypatch.setattr(RunStore, "close", lambda store: closed.append(store))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("search failed")
+
+    monkeypatch.setattr(cli, "run_search", fail)
+    db = str(tmp_path / "runs.sqlite")
+    args = build_parser().parse_args(["run", "--out", str(tmp_path), "--cold-start", "--db", db])
+    with pytest.raises(RuntimeError, match="search failed"):
+        args.func(args)
+    assert len(closed) == 1
@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import log_loss, mean_absolute_error, roc_auc_score
+
+from mlwego.agent.controller import score_tree
+from mlwego.evaluation.scoring import bootstrap_compare, metrics_for, score_batch
+from mlwego.search.solution_tree import SolutionNode, SolutionTree
+
+
+def test_score_batch_matches_sklearn() -> None:
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, size=200)
+    preds = rng.random((3, 200))
+    batch = score_batch(y_true.astype(float), preds, ["roc_auc", "mae"])
+    for idx in range(3):
+        assert np.isclose(batch["roc_auc"][idx], roc_auc_score(y_true, preds[idx]))
+        assert np.isclose(batch["mae"][idx], -mean_absolute_error(y_true, preds[idx]))
+    assert metrics_for("regression") == ["rmse", "mae"]
+
+
+def test_bootstrap_separates_clear_winner() -> None:
+    rng = np.random.default_rng(1)
+    y_true = rng.integers(0, 2, size=500)
+    good = np.where(rng.random(500) < 0.9, y_true, 1 - y_true)
+    close = good.copy()
+    close[:3] = 1 - y_true[:3]
+    bad = np.where(rng.random(500) < 0.6, y_true, 1 - y_true)
+    result = bootstrap_compare(y_true, np.vstack([good, close, bad]), "accuracy", n_boot=500)
+    assert result.best_index == 0
+    assert np.all(result.ci_low <= result.scores) and np.all(result.scores <= result.ci_high)
+    assert result.p_vs_best[0] == 1.0
+    assert result.p_vs_best[1] > 0.05
+    assert result.p_vs_best[2] < 0.01
+
+
+def test_score_tree_adds_probability_metrics_for_binary_tasks(tmp_path: Path) -> None:
+    rng = np.random.default_rng(2)
+    y_true = rng.choice(["no", "yes"], size=300)
+    tree = SolutionTree()
+    probas = {}
+    for node_id, noise in (("root", 0.3), ("a", 0.6)):
+        positive = np.clip((y_true == "yes") * 0.6 + 0.2 + noise * rng.normal(size=300), 0.01, 0.99)
+        probas[node_id] = np.column_stack([1 - positive, positive])
+        node_dir = tmp_path / "artifacts" / node_id
+        node_dir.mkdir(parents=True)
+        np.save(node_dir / "oof_target.npy", y_true)
+        np.save(node_dir / "oof.npy", np.where(positive > 0.5, "yes", "no"))
+        np.save(node_dir / "oof_proba.npy", probas[node_id])
+        metrics = {"task_type": "classification", "classes": ["no", "yes"]}
+        (node_dir / "metrics.json").write_text(json.dumps(metrics), encoding="utf-8")
+        parent = None if node_id == "root" else "root"
+        tree.add_node(
+            SolutionNode(node_id=node_id, parent_id=parent, score=0.8, score_std=0.0, diff="", metric="accuracy")
+        )
+    assert metrics_for("classification") == ["accuracy", "roc_auc", "log_loss"]
+    score_tree(tmp_path, tree)
+    for node_id, proba in probas.items():
+        metrics = tree.nodes[node_id].metrics
+        assert set(metrics) == {"accuracy", "roc_auc", "log_loss"}
+        assert np.isclose(metrics["roc_auc"], roc_auc_score(y_true == "yes", proba[:, 1]))
+        assert np.isclose(metrics["log_loss"], -log_loss(y_true, proba, labels=["no", "yes"]))
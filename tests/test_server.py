@@ -0,0 +1,79 @@
+import http.client
+import json
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from mlwego.ui.server import PredictionServer
+from mlwego.workspace.artifacts import MODEL_FILE, model_dir
+from mlwego.workspace.run_store import RunStore
+
+
+def _add_model(run_dir: Path, store: RunStore, node_id: str, slope: float, score: float) -> None:
+    frame = pd.DataFrame({"x": np.arange(10.0)})
+    model = LinearRegression().fit(frame, slope * frame["x"])
+    model_dir(run_dir, node_id).mkdir(parents=True)
+    joblib.dump(model, model_dir(run_dir, node_id) / MODEL_FILE)
+    store.record_node({"run_id": str(run_dir.resolve()), "node_id": node_id, "score": score, "status": "ok", "fidelity": 1.0})
+
+
+def _post(port: int, rows: list) -> dict:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("POST", "/predict", body=json.dumps({"rows": rows}), headers={"Content-Type": "application/json"})
+    return json.loads(conn.getresponse().read())
+
+
+def test_batches_requests_and_hot_swaps(tmp_path: Path) -> None:
+    store = RunStore(tmp_path / "runs.sqlite")
+    run_dir = tmp_path / "run"
+    store.record_run(run_dir, "toy")
+    _add_model(run_dir, store, "first", slope=2.0, score=0.5)
+    server = PredictionServer(run_dir, store, port=0, max_wait_ms=50, reload_interval=3600)
+    server.start()
+    port = server.httpd.server_address[1]
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            replies = list(pool.map(lambda x: _post(port, [{"x": float(x)}]), range(8)))
+        assert [round(r["predictions"][0]) for r in replies] == [2 * x for x in range(8)]
+        _add_model(run_dir, store, "second", slope=3.0, score=0.9)
+        assert server.handle.refresh()
+        assert _post(port, [{"x": 2.0}])["node_id"] == "second"
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("GET", "/metrics")
+        metrics = json.loads(conn.getresponse().read())
+        assert metrics["requests"] == 9 and metrics["rows"] == 9
+        assert metrics["batches"] < 9
+        assert metrics["latency_ms"]["p99"] > 0
+    finally:
+        server.shutdown()
+
+
+def test_unix_socket(tmp_path: Path) -> None:
+    store = RunStore(tmp_path / "runs.sqlite")
+    run_dir = tmp_path / "run"
+    store.record_run(run_dir, "toy")
+    _add_model(run_dir, store, "only", slope=1.0, score=0.1)
+    server = PredictionServer(run_dir, store, socket_path=tmp_path / "mlwego.sock", reload_interval=3600)
+    server.start()
+    try:
+        body = b"x\n4\n"
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(str(tmp_path / "mlwego.sock"))
+        client.sendall(
+            b"POST /predict HTTP/1.1\r\nHost: localhost\r\nContent-Type: text/csv\r\n"
+            + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        response = b""
+        while chunk := client.recv(65536):
+            response += chunk
+        client.close()
+        payload = json.loads(response.split(b"\r\n\r\n", 1)[1])
+        assert round(payload["predictions"][0]) == 4
+    finally:
+        server.shutdown()
@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlwego.agent.controller import run_search
+from mlwego.search.policy import SearchPolicy
+from mlwego.search.selector import select_frontier, select_top_k
+from mlwego.search.solution_tree import SolutionNode, SolutionTree
+from mlwego.workspace.project_init import init_workspace
+
+
+def _node(node_id: str, score: Optional[float], std: float = 0.0, parent: str = "root", **kwargs) -> SolutionNode:
+    return SolutionNode(node_id=node_id, parent_id=parent, score=score, score_std=std, diff="", **kwargs)
+
+
+def test_top_k_and_frontier() -> None:
+    tree = SolutionTree(ucb_c=2.0)
+    tree.add_node(_node("root", 0.80, parent=None))
+    tree.add_node(_node("a", 0.90, 0.01))
+    tree.add_node(_node("b", 0.85, 0.10))
+    tree.add_node(_node("c", 0.99, fidelity=0.33))
+    tree.add_node(_node("d", 0.95, status="aborted"))
+    assert select_top_k(tree, 2) == ["a", "b"]
+    assert select_frontier(tree, 1) == ["b"]
+    tree.add_node(_node("a", 0.70, 0.01))
+    assert tree.best_node().node_id == "b"
+    assert tree.nodes["root"].children == ["a", "b", "c", "d"]
+
+
+def test_journal_replay_drops_torn_line(tmp_path: Path) -> None:
+    journal = tmp_path / "tree.jsonl"
+    tree = SolutionTree(journal=journal)
+    tree.add_node(_node("root", 0.80, parent=None))
+    tree.add_node(_node("a", 0.90))
+    with journal.open("a", encoding="utf-8") as handle:
+        handle.write('{"node_id": "b", "par')
+    resumed = SolutionTree.load(journal)
+    assert list(resumed.nodes) == ["root", "a"]
+    assert resumed.best_node().node_id == "a"
+    resumed.add_node(_node("b", 0.95))
+    assert list(SolutionTree.load(journal).nodes) == ["root", "a", "b"]
+
+
+def test_failed_nodes_are_journaled_without_a_score(tmp_path: Path) -> None:
+    journal = tmp_path / "tree.jsonl"
+    tree = SolutionTree(journal=journal)
+    tree.add_node(_node("root", 0.80, parent=None))
+    tree.add_node(_node("a", None, status="oom"))
+    assert json.loads(journal.read_text(encoding="utf-8").splitlines()[-1])["score"] is None
+    assert "Infinity" not in journal.read_text(encoding="utf-8")
+    assert SolutionTree.load(journal).best_node().node_id == "root"
+
+
+def test_re_adding_a_node_keeps_its_parent() -> None:
+    tree = SolutionTree()
+    tree.add_node(_node("root", 0.80, parent=None))
+    tree.add_node(_node("a", 0.90))
+    # A candidate that hashes to the root is the root again, not its own child.
+    tree.add_node(_node("root", 0.81, parent="root"))
+    tree.add_node(_node("a", 0.91, parent="b"))
+    assert tree.root().node_id == "root" and tree.nodes["root"].score == 0.81
+    assert tree.nodes["a"].parent_id == "root" and tree.nodes["root"].children == ["a"]
+    with pytest.raises(ValueError, match="own parent"):
+        tree.add_node(_node("c", 0.5, parent="c"))
+
+
+def test_rerun_then_resume_keeps_the_baseline_root(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    data = tmp_path / "data"
+    data.mkdir()
+    train = pd.DataFrame({"x1": rng.normal(size=120), "x2": rng.normal(size=120)})
+    train["target"] = (train["x1"] > 0).astype(int)
+    train.to_csv(data / "train.csv", index=False)
+    train.drop(columns="target").head(20).to_csv(data / "test.csv", index=False)
+    (tmp_path / "task.txt").write_text("Predict target.", encoding="utf-8")
+    run_dir = init_workspace(str(tmp_path / "task.txt"), str(data), str(tmp_path / "run"))
+    config_path = run_dir / "src" / "config.json"
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    config.update(n_splits=2, model_params={"n_estimators": 20, "random_state": 0})
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+    policy = SearchPolicy(budget=2, early_abort=False)
+
+    first, _ = run_search(run_dir, policy, timeout=300, use_cache=False)
+    # Candidates trained in run_dir/src, so the baseline config must be back in place for the next run.
+    assert json.loads(config_path.read_text(encoding="utf-8")) == config
+    rerun, _ = run_search(run_dir, policy, timeout=300, use_cache=False)
+    assert rerun.root().node_id == first.root().node_id
+    metrics_lines = len((run_dir / "logs" / "metrics.jsonl").read_text(encoding="utf-8").splitlines())
+    resumed, _ = run_search(run_dir, policy, timeout=300, use_cache=False, resume=True)
+    assert resumed.root().node_id == first.root().node_id
+    assert all(node.parent_id != node.node_id for node in resumed.nodes.values())
+    # Nothing is re-evaluated on resume, including the baseline.
+    assert len((run_dir / "logs" / "metrics.jsonl").read_text(encoding="utf-8").splitlines()) == metrics_lines
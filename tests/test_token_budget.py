@@ -0,0 +1,60 @@
+from mlwego.llm.token_budget import PromptBudget, TokenCache, compact_log, normalize_lines, truncate_logs
+
+TRACEBACK = [
+    "Traceback (most recent call last):",
+    '  File "train.py", line 210, in <module>',
+    "    main()",
+    "ValueError: could not convert string to float: 'abc'",
+]
+
+
+def test_progress_bars_and_repeats_collapse() -> None:
+    text = "start\n" + "\r".join(f" {i}%|##| {i}/100" for i in range(100)) + "\nwarn\nwarn\nwarn\n"
+    assert normalize_lines(text) == ["start", " 99%|##| 99/100", "warn [repeated 3x]", ""]
+    bars = "\n".join(f"Epoch {i}/50 loss=0.1" for i in range(1, 51))
+    assert normalize_lines(bars) == ["[... 49 progress lines collapsed ...]", "Epoch 50/50 loss=0.1"]
+
+
+def test_compaction_keeps_head_tail_and_the_final_traceback() -> None:
+    lines = ["loading data"] + [f"step {i} finished with value {i * 7}" for i in range(2000)] + TRACEBACK
+    tokens = TokenCache()
+    compacted = compact_log("\n".join(lines), 150, tokens)
+    assert tokens.count(compacted) <= 150
+    assert compacted.startswith("loading data\n")
+    assert compacted.endswith("\n".join(TRACEBACK))
+    assert "lines omitted" in compacted
+    # A budget smaller than the traceback still keeps its last, most informative lines.
+    assert compact_log("\n".join(lines), 40).endswith(TRACEBACK[-1])
+
+
+def test_truncate_logs_favours_the_latest_entry_and_reuses_counts() -> None:
+    tokens = TokenCache()
+    stdout = "\n".join(f"fold {i} score {i}" for i in range(500))
+    stderr = "\n".join(TRACEBACK)
+    kept = truncate_logs([stdout, stderr], max_tokens=100, tokens=tokens)
+    assert kept[-1] == stderr
+    misses = tokens.misses
+    truncate_logs([stdout, stderr], max_tokens=100, tokens=tokens)
+    assert tokens.misses == misses
+
+
+def test_prompt_budget_redistributes_unused_shares() -> None:
+    budget = PromptBudget(max_tokens=400, tokens=TokenCache(counter=lambda line: len(line.split()) + 1))
+    sections = {"task": "short task", "profile": "col int64\n" * 10, "code": "x = 1\n" * 300, "logs": "\n".join(TRACEBACK)}
+    allocation = budget.allocate(sections)
+    assert allocation["task"] == 3 and allocation["logs"] < 400 * 0.3
+    assert sum(allocation.values()) <= 400
+    assert allocation["code"] > 400 * 0.35
+    fitted = budget.fit(sections)
+    assert fitted["logs"] == sections["logs"]
+    assert fitted["code"].startswith("x = 1") and "lines omitted" in fitted["code"]
+
+
+def test_compaction_counts_every_gap_marker() -> None:
+    # Errors scattered through the log split the kept lines into many runs, each needing its own gap marker.
+    lines = [f"ValueError: bad row {i}" if i % 3 == 0 else f"step {i} loss {i * 0.37:.4f}" for i in range(600)]
+    tokens = TokenCache()
+    for max_tokens in (10, 60, 267, 500):
+        compacted = compact_log("\n".join(lines), max_tokens, tokens)
+        assert tokens.count(compacted) <= max_tokens
+    assert lines[-3] in compact_log("\n".join(lines), 267, tokens)
@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+import pytest
+
+from mlwego.search.generator import random_candidates
+from mlwego.search.space import SEARCH_SPACES, Choice, SearchSpace, search_space
+from mlwego.search.tpe import TPE
+
+SPACE = SEARCH_SPACES["random_forest"]
+
+
+def objective(params):
+    # Peaks at 300 trees and 4 samples per leaf with depth 8 and half the features.
+    return (
+        -((math.log(params["n_estimators"]) - math.log(300)) ** 2)
+        - (math.log(params["min_samples_leaf"]) - math.log(4)) ** 2
+        - (0.0 if params["max_depth"] == 8 else 0.5)
+        - (0.0 if params["max_features"] == 0.5 else 0.3)
+    )
+
+
+def test_space_encodes_defaults_and_rejects_off_grid_choices():
+    coords = SPACE.encode({"n_estimators": 1000})
+    assert coords[0] == pytest.approx(1.0)
+    assert SPACE.decode(coords) == {"n_estimators": 1000, "max_depth": None, "min_samples_leaf": 1, "max_features": "sqrt"}
+    assert SPACE.encode({"max_depth": 7}) is None
+    assert search_space({"model_params": {}}).params is SPACE.params
+    with pytest.raises(ValueError):
+        search_space({"model": "unknown"})
+
+
+def test_random_candidates_sample_the_space():
+    for candidate in random_candidates(5, seed=3):
+        params = candidate.updates["model_params"]
+        assert params["random_state"] == 3
+        assert SPACE.encode(params) is not None
+
+
+def test_suggestions_keep_the_run_seed():
+    # Suggestions replace the root's model_params, so the run's seed has to travel with them.
+    assert search_space({}).fixed == {"random_state": 42}
+    assert TPE(search_space({"seed": 7}), seed=7).suggest()["random_state"] == 7
+    assert search_space({"seed": 7, "model_params": {"random_state": 0}}).fixed == {"random_state": 0}
+
+
+def test_tpe_beats_random_search():
+    tpe_best, random_best = [], []
+    for seed in range(8):
+        tuner = TPE(SPACE, seed=seed)
+        scores = []
+        for _ in range(30):
+            params = tuner.suggest()
+            scores.append(objective(params))
+            tuner.observe(params, scores[-1])
+        tpe_best.append(max(scores))
+        rng = np.random.default_rng(seed)
+        random_best.append(max(objective(SPACE.sample(rng)) for _ in range(30)))
+    assert np.mean(tpe_best) > np.mean(random_best)
+
+
+def test_tpe_warm_starts_from_observations():
+    tuner = TPE(SPACE, n_startup=3, seed=0)
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        params = SPACE.sample(rng)
+        tuner.observe(params, objective(params))
+    assert not tuner.observe({"max_depth": 7}, 0.0)
+    tuner.observe({"n_estimators": 200, "random_state": 42}, None)
+    suggestions = [tuner.suggest() for _ in range(10)]
+    assert np.mean([objective(params) for params in suggestions]) > np.mean(
+        [objective(SPACE.sample(rng)) for _ in range(10)]
+    )
+    # Suggestions awaiting a result are kept apart from each other.
+    assert len({SPACE.key(params) for params in suggestions}) == len(suggestions)
+    assert len(tuner.pending) == len(suggestions)
+
+
+def test_tpe_does_not_repeat_itself_or_leak_pending_suggestions():
+    space = SearchSpace({"depth": Choice([2, 4, 8], default=2)}, fixed={"random_state": 42})
+    tuner = TPE(space, n_startup=1, seed=0)
+    suggestions = [tuner.suggest() for _ in range(3)]
+    assert sorted(params["depth"] for params in suggestions) == [2, 4, 8]
+    # The space is exhausted: a repeat comes back, but is not left pending for a result that never arrives.
+    tuner.suggest()
+    assert len(tuner.pending) == 3
+    for params in suggestions:
+        tuner.observe(params, float(params["depth"]))
+    assert tuner.pending == {}
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+
+from mlwego.execution.warm_pool import WarmPool, warm_supported
+
+
+@pytest.mark.skipif(not warm_supported(), reason="fork is not available")
+def test_warm_pool_runs_script_in_isolated_child(tmp_path: Path) -> None:
+    script = tmp_path / "job.py"
+    script.write_text("import os, sys\nprint(os.getcwd(), os.environ['TOKEN'])\nsys.exit(2)\n", encoding="utf-8")
+    pool = WarmPool(1)
+    try:
+        run = pool.run(script, tmp_path, {"TOKEN": "abc"}, timeout=30)
+    finally:
+        pool.close()
+    assert run.exit_code == 2
+    assert run.stdout.text().strip() == f"{tmp_path} abc"
+    assert run.stderr.text() == ""
+    assert run.aborted is False
+    assert run.peak_rss_mb > 0
+
+
+@pytest.mark.skipif(not warm_supported(), reason="fork is not available")
+def test_warm_output_streams_into_bounded_capture(tmp_path: Path) -> None:
+    script = tmp_path / "job.py"
+    script.write_text(
+        "import sys, time\n"
+        "for idx in range(20000):\n"
+        "    print(f'line {idx:05d}')\n"
+        "    print(f'err {idx:05d}', file=sys.stderr)\n"
+        "print('STOP', flush=True)\n"
+        "time.sleep(30)\n",
+        encoding="utf-8",
+    )
+    pool = WarmPool(1)
+    try:
+        # Both streams pass the pipe buffer size, so the run only finishes if they are read while it runs.
+        run = pool.run(
+            script, tmp_path, {}, timeout=30, on_stdout=lambda line: line == "STOP\n", log_path=tmp_path / "node.log"
+        )
+    finally:
+        pool.close()
+    assert run.aborted is True
+    assert run.stdout.truncated and run.stdout.total_chars == 20000 * 11 + 5
+    assert run.stdout.text().startswith("line 00000\n") and run.stdout.text().endswith("STOP\n")
+    assert run.stderr.text().endswith("err 19999\n")
+    log = (tmp_path / "node.log").read_text(encoding="utf-8")
+    assert log.count("\n") == 40001